@@ -0,0 +1,233 @@
+"""Per-stage throughput of the directory pipeline on a synthetic repository.
+
+Generates (or reuses) a tree with ``synthetic.py`` and times each stage of a
+run separately:
+
+    walk      listing candidates (git index or scandir walk, .gitignore applied)
+    filter    the per-file selection behind ``should_process_file``
+    read      ``load_file`` on the selected files, on the worker pool
+    tokenize  ``generate_token_tree`` (token counting plus the token table)
+    assemble  ``render_header`` and writing the output file
+
+Each stage reports files/sec, MB/sec and the process peak RSS once it is done;
+``end_to_end`` is a plain ``write_docs`` run for reference. Every stage keeps
+its best time over ``--repeat`` runs. Results can be saved with ``--json`` and
+compared with an earlier file through ``--compare``.
+
+Usage:
+    python benchmarks/bench_pipeline.py --files 20000 --json after.json \\
+        --compare before.json
+"""
+
+import argparse
+import dataclasses
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from synthetic import add_spec_arguments, generate, spec_from_args
+
+from readium import FileRecord, ReadConfig, Readium
+from readium.core import format_file_block
+from readium.utils.concurrency import ordered_map
+
+STAGES = ["walk", "filter", "read", "tokenize", "assemble"]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, in MB"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def run_stages(reader: Readium, root: Path, output: Path) -> Dict[str, Dict[str, Any]]:
+    """Run the pipeline once, stage by stage, and time every stage"""
+    results: Dict[str, Dict[str, Any]] = {}
+
+    def record(stage: str, start: float, files: int, size: int) -> None:
+        results[stage] = {
+            "seconds": time.perf_counter() - start,
+            "files": files,
+            "bytes": size,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+    start = time.perf_counter()
+    entries = list(reader.iter_candidates(root))
+    record("walk", start, len(entries), 0)
+
+    start = time.perf_counter()
+    file_filter = reader.file_filter
+    selected = [
+        entry
+        for entry in entries
+        if file_filter.select(entry.path, entry.size, False)[0] is not None
+    ]
+    record("filter", start, len(entries), 0)
+
+    # load_file filters again, a small share of the read stage
+    start = time.perf_counter()
+    files: List[FileRecord] = [
+        f
+        for f in ordered_map(reader.load_file, iter(selected), reader.worker_count())
+        if f
+    ]
+    record("read", start, len(selected), sum(e.size or 0 for e in selected))
+
+    content_bytes = sum(len(f.content.encode("utf-8")) for f in files)
+    start = time.perf_counter()
+    token_tree = reader.generate_token_tree(files, root)
+    record("tokenize", start, len(files), content_bytes)
+
+    start = time.perf_counter()
+    summary, tree = reader.render_header(root, [f.path for f in files], token_tree)
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(f"Summary:\n{summary}\n\n")
+        f.write(f"Tree:\n{tree}\n\n")
+        f.write("Content:\n")
+        f.write("\n\n".join(format_file_block(file_info) for file_info in files))
+    record("assemble", start, len(files), output.stat().st_size)
+    return results
+
+
+def end_to_end(reader: Readium, root: Path, output: Path) -> Dict[str, Any]:
+    start = time.perf_counter()
+    _, tree = reader.write_docs(root, output)
+    return {
+        "seconds": time.perf_counter() - start,
+        "files": sum(1 for line in tree.splitlines() if line.startswith("└── ")),
+        "bytes": output.stat().st_size,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def add_rates(result: Dict[str, Any]) -> None:
+    seconds = max(result["seconds"], 1e-9)
+    result["files_per_sec"] = result["files"] / seconds
+    result["mb_per_sec"] = result["bytes"] / (1024 * 1024) / seconds
+
+
+def best_of(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """The fastest run; peak RSS is monotonic, so report the highest seen"""
+    best = dict(min(runs, key=lambda r: r["seconds"]))
+    peaks = [r["peak_rss_mb"] for r in runs if r["peak_rss_mb"] is not None]
+    best["peak_rss_mb"] = max(peaks) if peaks else None
+    add_rates(best)
+    return best
+
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    header = f"{'stage':>10} {'seconds':>9} {'files/s':>11} {'MB/s':>9} {'RSS MB':>8}"
+    if baseline:
+        header += f" {'vs base':>8}"
+    print(header)
+    rows = [(s, report["stages"][s]) for s in STAGES]
+    rows.append(("end_to_end", report["end_to_end"]))
+    for name, r in rows:
+        files_per_sec = r["files_per_sec"]
+        rss = r["peak_rss_mb"]
+        line = (
+            f"{name:>10} {r['seconds']:>9.3f} "
+            f"{files_per_sec:>11,.0f} "
+            f"{r['mb_per_sec']:>9.1f} "
+            f"{rss if rss is not None else float('nan'):>8.0f}"
+        )
+        if baseline:
+            if name == "end_to_end":
+                base = baseline.get("end_to_end")
+            else:
+                base = baseline["stages"].get(name)
+            if base:
+                line += f" {base['seconds'] / max(r['seconds'], 1e-9):>7.2f}x"
+        print(line)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--root", default="/tmp/readium-bench-pipeline")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--markitdown", action="store_true")
+    parser.add_argument("--json", dest="json_path", help="Write results here")
+    parser.add_argument("--compare", help="Earlier --json output to compare with")
+    add_spec_arguments(parser)
+    args = parser.parse_args(argv)
+
+    spec = spec_from_args(args)
+    root = Path(args.root)
+    print(f"Preparing {spec.files} files under {root} ...")
+    tree_stats = generate(root, spec)
+
+    # Caches would turn every repeat after the first into a lookup benchmark
+    config = ReadConfig(
+        use_cache=False, workers=args.workers, use_markitdown=args.markitdown
+    )
+    stage_runs: Dict[str, List[Dict[str, Any]]] = {s: [] for s in STAGES}
+    total_runs: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as out_dir:
+        output = Path(out_dir) / "output.md"
+        for _ in range(args.repeat):
+            reader = Readium(config)
+            try:
+                for stage, result in run_stages(reader, root, output).items():
+                    stage_runs[stage].append(result)
+                total_runs.append(end_to_end(reader, root, output))
+            finally:
+                reader.close()
+
+    report = {
+        "benchmark": "pipeline",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "options": {
+            "repeat": args.repeat,
+            "workers": reader.worker_count(),
+            "markitdown": args.markitdown,
+        },
+        "spec": dataclasses.asdict(spec),
+        "tree": tree_stats,
+        "stages": {s: best_of(runs) for s, runs in stage_runs.items()},
+        "end_to_end": best_of(total_runs),
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
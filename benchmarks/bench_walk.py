@@ -0,0 +1,138 @@
+"""Walk-plus-filter throughput: os.scandir walker vs the legacy os.walk loop.
+
+Generates (or reuses) a tree with ``synthetic.py`` and times how fast each
+approach yields the files that pass ``ReadConfig``'s filters, binary sniff
+included, without reading whole file contents.
+
+Usage:
+    python benchmarks/bench_walk.py --files 500000 --root /tmp/readium-bench
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple, Union
+
+from synthetic import add_spec_arguments, generate, spec_from_args
+
+from readium import ReadConfig, Readium
+from readium.walker import walk_files
+
+
+def legacy_is_binary(file_path: Union[str, Path]) -> bool:
+    """``Readium.is_binary`` as it was before the scandir walker"""
+    try:
+        with open(file_path, "rb") as file:
+            chunk = file.read(1024)
+            return bool(
+                chunk.translate(
+                    None,
+                    bytes([7, 8, 9, 10, 12, 13, 27] + list(range(0x20, 0x100))),
+                )
+            )
+    except Exception:
+        return True
+
+
+def legacy_should_process_file(config: ReadConfig, file_path: Path) -> bool:
+    """``Readium.should_process_file`` as it was before the scandir walker"""
+    path = Path(file_path)
+    file_ext = os.path.splitext(str(path))[1].lower()
+
+    parts = path.parts
+    for excluded_dir in config.exclude_dirs:
+        if excluded_dir in parts:
+            return False
+
+    base_name = path.name.rstrip("@")
+    if any(pattern in base_name for pattern in config.exclude_files):
+        return False
+
+    if file_ext in {ext.lower() for ext in config.exclude_extensions}:
+        return False
+
+    if config.max_file_size >= 0:
+        try:
+            if path.stat().st_size > config.max_file_size:
+                return False
+        except FileNotFoundError:
+            return False
+
+    if (
+        config.use_markitdown
+        and config.markitdown_extensions is not None
+        and file_ext in config.markitdown_extensions
+    ):
+        return True
+
+    if file_ext not in config.include_extensions:
+        return False
+
+    return not legacy_is_binary(path)
+
+
+def legacy_walk(reader: Readium, path: Path) -> int:
+    """The os.walk loop used before the scandir walker"""
+    count = 0
+    for root, dirs, files in os.walk(path):
+        dirs[:] = [d for d in dirs if d not in reader.config.exclude_dirs]
+        for file in files:
+            file_path = Path(root) / file
+            relative_path = file_path.relative_to(path)
+            if legacy_should_process_file(reader.config, file_path):
+                count += 1
+                str(relative_path)
+    return count
+
+
+def scandir_walk(reader: Readium, path: Path) -> int:
+    """The walker used by ``Readium`` now"""
+    count = 0
+    for entry in walk_files(str(path), exclude_dirs=reader.config.exclude_dirs):
+        mode, _ = reader.file_filter.select(entry.path, entry.size, False)
+        if mode == "text" and reader.is_binary(entry.path):
+            continue
+        if mode is not None:
+            count += 1
+    return count
+
+
+def timed(func: Callable[[], int], repeat: int) -> Tuple[float, int]:
+    best = float("inf")
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = func()
+        best = min(best, time.perf_counter() - start)
+    return best, count
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--root", default="/tmp/readium-bench-walk")
+    parser.add_argument("--repeat", type=int, default=3)
+    add_spec_arguments(parser)
+    args = parser.parse_args(argv)
+
+    root = Path(args.root)
+    print(f"Preparing {args.files} files under {root} ...")
+    generate(root, spec_from_args(args))
+    reader = Readium(ReadConfig(use_cache=False))
+
+    results = {}
+    for name, func in (("os.walk + Path", legacy_walk), ("scandir", scandir_walk)):
+        seconds, count = timed(lambda: func(reader, root), args.repeat)
+        results[name] = (seconds, count)
+        print(
+            f"{name:>16}: {count} files kept, {seconds:.2f}s, "
+            f"{args.files / seconds:,.0f} files/sec"
+        )
+
+    legacy, new = results["os.walk + Path"], results["scandir"]
+    assert legacy[1] == new[1], "walkers disagree on the selected files"
+    print(f"Speed-up: {legacy[0] / new[0]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Synthetic repository generator shared by the benchmarks.
+
+The tree is fully determined by a ``TreeSpec`` (including its random seed), so
+two runs with the same parameters measure the same input. A finished tree keeps
+its spec in ``.readium-synthetic.json`` and is reused when the spec matches.
+
+Usage:
+    python benchmarks/synthetic.py /tmp/readium-synth --files 20000 --depth 4
+"""
+
+import argparse
+import dataclasses
+import json
+import math
+import random
+import shutil
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+SPEC_FILE = ".readium-synthetic.json"
+
+TEXT_EXTENSIONS = [".py", ".md", ".txt", ".js", ".json", ".rst", ".yml", ".toml"]
+# Binary files are split between extensions the filter drops and extensions it
+# keeps, so the latter reach the binary sniff
+BINARY_EXTENSIONS = [".png", ".zip", ".bin", ".dat"]
+DOC_EXTENSIONS = [".html", ".pdf"]
+
+WORDS = (
+    "readium walker token filter manifest block summary content directory "
+    "markdown convert binary ignore pattern cache worker stream output file "
+    "path index tree config value return import class def self none true"
+).split()
+
+
+@dataclass(frozen=True)
+class TreeSpec:
+    """Shape of a synthetic repository.
+
+    Attributes:
+        files: Number of regular files (ignored files are extra)
+        depth: Directory nesting depth of the leaf directories
+        files_per_dir: Files per leaf directory
+        median_size: Median text file size in bytes (sizes are log-normal)
+        size_sigma: Spread of the log-normal size distribution
+        max_size: Upper bound of a generated file size
+        binary_ratio: Fraction of files with binary content
+        doc_ratio: Fraction of MarkItDown documents (HTML and PDF)
+        gitignore_density: Fraction of leaf directories with their own
+            ``.gitignore`` plus ignored files and an ignored ``build/`` folder
+        git: Turn the tree into a git repository with every file staged
+        seed: Random seed
+    """
+
+    files: int = 20_000
+    depth: int = 4
+    files_per_dir: int = 40
+    median_size: int = 2048
+    size_sigma: float = 1.2
+    max_size: int = 256 * 1024
+    binary_ratio: float = 0.05
+    doc_ratio: float = 0.02
+    gitignore_density: float = 0.1
+    git: bool = False
+    seed: int = 42
+
+
+def _text(rng: random.Random, size: int) -> bytes:
+    lines: List[str] = []
+    total = 0
+    while total < size:
+        line = " ".join(rng.choices(WORDS, k=rng.randint(4, 14)))
+        lines.append(line)
+        total += len(line) + 1
+    return "\n".join(lines).encode("utf-8")[:size]
+
+
+def _html(rng: random.Random, size: int) -> bytes:
+    parts = ["<html><head><title>Synthetic</title></head><body>"]
+    total = 0
+    while total < size:
+        paragraph = " ".join(rng.choices(WORDS, k=rng.randint(20, 60)))
+        parts.append(f"<h2>{rng.choice(WORDS)}</h2><p>{paragraph}</p>")
+        total += len(paragraph) + 30
+    parts.append("</body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def _pdf(pages: int) -> bytes:
+    from io import BytesIO
+
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=612, height=792)
+    buffer = BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def _leaf_dirs(spec: TreeSpec) -> List[str]:
+    """Relative paths of the leaf directories, ``depth`` levels deep"""
+    count = max(1, math.ceil(spec.files / spec.files_per_dir))
+    if spec.depth <= 0:
+        return [""] * count
+    fanout = max(2, math.ceil(count ** (1 / spec.depth)))
+    dirs = []
+    for index in range(count):
+        parts = []
+        for level in range(spec.depth):
+            parts.append(f"d{level}_{index % fanout}")
+            index //= fanout
+        dirs.append("/".join(reversed(parts)))
+    return dirs
+
+
+def generate(root: Path, spec: TreeSpec) -> Dict[str, Any]:
+    """Create the tree described by ``spec`` under ``root``.
+
+    ``root`` must be missing, empty, or a tree made by this function; an
+    existing tree with the same spec is reused as is.
+
+    Returns:
+        Statistics of the tree: file counts by kind and total bytes
+    """
+    marker = root / SPEC_FILE
+    wanted = dataclasses.asdict(spec)
+    if marker.exists():
+        saved = json.loads(marker.read_text())
+        if saved.get("spec") == wanted:
+            return saved["stats"]
+        shutil.rmtree(root)
+    elif root.exists() and any(root.iterdir()):
+        raise ValueError(f"{root} is not empty and was not made by this generator")
+
+    rng = random.Random(spec.seed)
+    mu = math.log(spec.median_size)
+    stats = {"files": 0, "text": 0, "binary": 0, "docs": 0, "ignored": 0, "bytes": 0}
+    pdf_cache: Dict[int, bytes] = {}
+
+    def write(rel_path: str, data: bytes) -> None:
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        stats["bytes"] += len(data)
+
+    root.mkdir(parents=True, exist_ok=True)
+    (root / ".gitignore").write_text(f"*.log\n/dist/\n/{SPEC_FILE}\n")
+    write("dist/bundle.js", _text(rng, 4096))
+    stats["ignored"] += 1
+
+    leaf_dirs = _leaf_dirs(spec)
+    for index in range(spec.files):
+        directory = leaf_dirs[index // spec.files_per_dir]
+        if index % spec.files_per_dir == 0 and rng.random() < spec.gitignore_density:
+            prefix = f"{directory}/" if directory else ""
+            write(f"{prefix}.gitignore", b"build/\n*.tmp\n")
+            for n in range(3):
+                write(f"{prefix}build/out{n}.js", _text(rng, 1024))
+                write(f"{prefix}scratch{n}.tmp", _text(rng, 256))
+                write(f"{prefix}debug{n}.log", _text(rng, 512))
+            stats["ignored"] += 9
+
+        size = min(spec.max_size, max(1, int(rng.lognormvariate(mu, spec.size_sigma))))
+        kind = rng.random()
+        if kind < spec.binary_ratio:
+            ext = rng.choice(BINARY_EXTENSIONS)
+            data = b"\x00" + rng.randbytes(size - 1) if size > 1 else b"\x00"
+            stats["binary"] += 1
+        elif kind < spec.binary_ratio + spec.doc_ratio:
+            ext = rng.choice(DOC_EXTENSIONS)
+            if ext == ".pdf":
+                pages = 1 + size // 16384
+                if pages not in pdf_cache:
+                    pdf_cache[pages] = _pdf(pages)
+                data = pdf_cache[pages]
+            else:
+                data = _html(rng, size)
+            stats["docs"] += 1
+        else:
+            ext = rng.choice(TEXT_EXTENSIONS)
+            data = _text(rng, size)
+            stats["text"] += 1
+        prefix = f"{directory}/" if directory else ""
+        write(f"{prefix}file{index}{ext}", data)
+        stats["files"] += 1
+
+    if spec.git:
+        subprocess.run(["git", "init", "-q"], cwd=root, check=True)
+        subprocess.run(["git", "add", "-A"], cwd=root, check=True)
+
+    marker.write_text(json.dumps({"spec": wanted, "stats": stats}, indent=2))
+    return stats
+
+
+def add_spec_arguments(parser: argparse.ArgumentParser) -> None:
+    """Expose every ``TreeSpec`` field as a command line option"""
+    for spec_field in dataclasses.fields(TreeSpec):
+        option = "--" + spec_field.name.replace("_", "-")
+        if isinstance(spec_field.default, bool):
+            parser.add_argument(option, action="store_true")
+        else:
+            parser.add_argument(
+                option, type=type(spec_field.default), default=spec_field.default
+            )
+
+
+def spec_from_args(args: argparse.Namespace) -> TreeSpec:
+    """Build a ``TreeSpec`` from options added by ``add_spec_arguments``"""
+    return TreeSpec(
+        **{f.name: getattr(args, f.name) for f in dataclasses.fields(TreeSpec)}
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root")
+    add_spec_arguments(parser)
+    args = parser.parse_args(argv)
+    stats = generate(Path(args.root), spec_from_args(args))
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
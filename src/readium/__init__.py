@@ -1,4 +1,5 @@
 from .cli import main
 from .core import ReadConfig, Readium
+from .records import FileRecord
 
-__all__ = ["ReadConfig", "Readium", "main"]
+__all__ = ["FileRecord", "ReadConfig", "Readium", "main"]
@@ -0,0 +1,195 @@
+import re
+import shlex
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .core import Readium, is_git_url, is_url
+
+# Sources processed at once
+DEFAULT_BATCH_JOBS = 4
+# Clones, fetches and web page downloads running at once, over all sources
+DEFAULT_FETCH_JOBS = 4
+
+# Aggregate summary written next to the outputs
+SUMMARY_FILE = "batch-summary.md"
+
+# A source (local path, git URL or web URL) and the branch to read, if any
+BatchSource = Tuple[str, Optional[str]]
+
+
+class BatchResult:
+    """Outcome of one source of a batch.
+
+    Attributes:
+        source: Local path, git URL or web URL
+        branch: Branch, tag or commit read, if any
+        output: Output file of the source
+        files: Number of files processed (0 if the source failed)
+        seconds: Time spent on the source, including waits for shared pools
+        error: Error message, or None if the source succeeded
+    """
+
+    __slots__ = ("source", "branch", "output", "files", "seconds", "error")
+
+    def __init__(
+        self,
+        source: str,
+        branch: Optional[str],
+        output: Path,
+        files: int = 0,
+        seconds: float = 0.0,
+        error: Optional[str] = None,
+    ) -> None:
+        self.source = source
+        self.branch = branch
+        self.output = output
+        self.files = files
+        self.seconds = seconds
+        self.error = error
+
+
+class BatchReport:
+    """Results of every source of a batch, in input order"""
+
+    def __init__(self, results: List[BatchResult], wall_seconds: float) -> None:
+        self.results = results
+        self.wall_seconds = wall_seconds
+
+    @property
+    def failed(self) -> List[BatchResult]:
+        return [result for result in self.results if result.error is not None]
+
+    def format(self) -> str:
+        """Aggregate summary of the batch"""
+        failed = len(self.failed)
+        lines = [
+            f"Sources: {len(self.results)} ({len(self.results) - failed} succeeded, "
+            f"{failed} failed) in {self.wall_seconds:.1f}s",
+            f"Files processed: {sum(result.files for result in self.results)}",
+        ]
+        for result in self.results:
+            source = result.source
+            if result.branch:
+                source += f" ({result.branch})"
+            if result.error is None:
+                lines.append(
+                    f"  ok      {source} -> {result.output.name} "
+                    f"({result.files} files, {result.seconds:.1f}s)"
+                )
+            else:
+                lines.append(f"  FAILED  {source}: {result.error}")
+        return "\n".join(lines)
+
+
+def parse_sources(lines: Iterable[str]) -> List[BatchSource]:
+    """Parse a sources file: one ``<source> [branch]`` per line.
+
+    Blank lines and ``#`` comments are skipped. Paths containing spaces can be
+    quoted as in a shell.
+
+    Raises:
+        ValueError: On a line with more than two fields
+    """
+    sources: List[BatchSource] = []
+    for number, line in enumerate(lines, 1):
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        # Not shlex's own comment handling, which would cut URL fragments
+        fields = shlex.split(line)
+        for position, field in enumerate(fields):
+            if field.startswith("#"):
+                del fields[position:]
+                break
+        if len(fields) > 2:
+            raise ValueError(
+                f"Line {number}: expected '<source> [branch]', got {line.strip()!r}"
+            )
+        sources.append((fields[0], fields[1] if len(fields) == 2 else None))
+    return sources
+
+
+def output_name(index: int, source: str) -> str:
+    """File name of a source's output, unique within the batch through ``index``"""
+    if is_git_url(source):
+        # Owner and repository name
+        path = source.rstrip("/")
+        if path.endswith(".git"):
+            path = path[: -len(".git")]
+        name = "-".join(path.split("/")[-2:])
+    elif is_url(source):
+        parts = urllib.parse.urlsplit(source)
+        name = (parts.hostname or "") + parts.path
+    else:
+        name = Path(source).resolve().name
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "-", name).strip("-.")[:80]
+    return f"{index:03d}-{slug or 'source'}.md"
+
+
+def run_batch(
+    reader: Readium,
+    sources: Sequence[Union[str, BatchSource]],
+    output_dir: Union[str, Path],
+    jobs: int = DEFAULT_BATCH_JOBS,
+    fetch_jobs: int = DEFAULT_FETCH_JOBS,
+    on_done: Optional[Callable[[BatchResult], None]] = None,
+) -> BatchReport:
+    """Process many sources concurrently, each into its own output file.
+
+    Every source runs on its own reader made with ``reader.spawn()``, so the
+    MarkItDown converter, caches and tokenizer are set up once. Up to ``jobs``
+    sources run at a time; their clones, fetches and web downloads share
+    ``fetch_jobs`` slots, and their files share one pool of
+    ``reader.worker_count()`` threads. A failed source is reported and does
+    not stop the others. The aggregate summary is also written to
+    ``SUMMARY_FILE`` in ``output_dir``.
+
+    Args:
+        reader: Reader whose configuration applies to every source
+        sources: Sources, as strings or ``(source, branch)`` pairs
+        output_dir: Directory receiving one output file per source
+        jobs: Sources processed at once
+        fetch_jobs: Clones, fetches and downloads running at once
+        on_done: Called with the result of each source as it finishes
+    """
+    items = [
+        (source, None) if isinstance(source, str) else source for source in sources
+    ]
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+
+    def run(index: int, source: str, branch: Optional[str]) -> BatchResult:
+        result = BatchResult(source, branch, output_path / output_name(index, source))
+        start = time.perf_counter()
+        try:
+            source_reader = reader.spawn()
+            source_reader.write_docs(source, result.output, branch)
+            result.files = source_reader.files_processed
+        except Exception as e:
+            result.error = str(e)
+        result.seconds = time.perf_counter() - start
+        if on_done is not None:
+            on_done(result)
+        return result
+
+    reader.fetch_slots = threading.BoundedSemaphore(max(1, fetch_jobs))
+    try:
+        with ThreadPoolExecutor(max_workers=reader.worker_count()) as files_pool:
+            reader.executor = files_pool
+            with ThreadPoolExecutor(max_workers=max(1, jobs)) as sources_pool:
+                futures = [
+                    sources_pool.submit(run, index, source, branch)
+                    for index, (source, branch) in enumerate(items, 1)
+                ]
+                results = [future.result() for future in futures]
+    finally:
+        reader.executor = None
+        reader.fetch_slots = None
+
+    report = BatchReport(results, time.perf_counter() - started)
+    (output_path / SUMMARY_FILE).write_text(report.format() + "\n", encoding="utf-8")
+    return report
@@ -0,0 +1,112 @@
+import fnmatch
+import os
+import re
+from typing import Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+from .walker import WalkEntry
+
+# Longest token of the encoding in ``tokens.TOKEN_ENCODING``, in bytes (and so
+# in characters): a text of n characters has at least n / 128 tokens
+MAX_TOKEN_CHARS = 128
+# UTF-8 uses at most 4 bytes per character (a CRLF pair, read as one "\n", 2)
+MAX_CHAR_BYTES = 4
+
+# Directory names whose files form the "docs" tier
+DOC_DIRS = frozenset({"doc", "docs", "documentation"})
+
+T = TypeVar("T")
+
+
+class TokenBudget:
+    """Token budget of a run and the priority order files are admitted in.
+
+    Files are ranked in tiers: READMEs first, then files below a docs
+    directory, then files matching each of ``priority_paths`` in turn, then
+    everything else. Within a tier smaller files come first, so more of them
+    fit. A file is admitted while its token count fits in what is left of the
+    budget; files that do not fit are dropped and the next ones are still
+    tried, until nothing is left.
+
+    Args:
+        max_tokens: Total tokens the admitted files may use
+        priority_paths: Glob patterns on ``/``-separated relative paths, highest
+            priority first (``*`` also matches ``/``)
+    """
+
+    def __init__(self, max_tokens: int, priority_paths: Sequence[str] = ()) -> None:
+        self.max_tokens = max_tokens
+        self.used = 0
+        self.dropped: List[str] = []  # Read but too large for what was left
+        self.unread = 0  # Never read: the budget ran out or none of them could fit
+        self._patterns = [re.compile(fnmatch.translate(p)) for p in priority_paths]
+
+    @property
+    def remaining(self) -> int:
+        return self.max_tokens - self.used
+
+    @property
+    def exhausted(self) -> bool:
+        """No further file can be admitted, so nothing more needs to be read"""
+        return self.remaining <= 0
+
+    def tier(self, rel_path: str) -> int:
+        """Priority tier of a relative path; lower tiers are admitted first"""
+        rel_path = rel_path.replace(os.sep, "/")
+        parts = rel_path.lower().split("/")
+        if parts[-1].startswith("readme"):
+            return 0
+        if DOC_DIRS.intersection(parts[:-1]):
+            return 1
+        for index, pattern in enumerate(self._patterns):
+            if pattern.match(rel_path):
+                return 2 + index
+        return 2 + len(self._patterns)
+
+    def order(self, items: Iterable[Tuple[WalkEntry, T]]) -> List[Tuple[WalkEntry, T]]:
+        """Sort ``(entry, payload)`` pairs into admission order"""
+        return sorted(
+            items,
+            key=lambda item: (
+                self.tier(item[0].rel_path),
+                item[0].size or 0,
+                item[0].rel_path,
+            ),
+        )
+
+    def may_fit(self, text: str) -> bool:
+        """Cheap check before counting: False means ``text`` cannot fit"""
+        return len(text) <= self.remaining * MAX_TOKEN_CHARS
+
+    @staticmethod
+    def min_tokens(size: Optional[int], mode: str) -> int:
+        """Fewest tokens a file of ``size`` bytes read as ``mode`` can produce.
+
+        Valid UTF-8 decodes to at least one character per ``MAX_CHAR_BYTES``
+        bytes. Bytes that are not UTF-8 are dropped on decoding, so a text file
+        made mostly of them can produce fewer tokens and be skipped although it
+        would fit. Nothing is known of the text MarkItDown extracts, or of
+        files never stat'ed.
+        """
+        if size is None or mode != "text":
+            return 0
+        return -(-size // (MAX_CHAR_BYTES * MAX_TOKEN_CHARS))
+
+    def admit(self, rel_path: str, tokens: int) -> bool:
+        """Take ``tokens`` from the budget if they fit, else record a drop"""
+        if tokens > self.remaining:
+            self.dropped.append(rel_path)
+            return False
+        self.used += tokens
+        return True
+
+    def describe(self, limit: int = 20) -> str:
+        """Summary lines describing how the budget was spent"""
+        text = f"Token budget: {self.used:,} of {self.max_tokens:,} tokens used\n"
+        if self.dropped:
+            shown = ", ".join(self.dropped[:limit])
+            if len(self.dropped) > limit:
+                shown += f", ... {len(self.dropped) - limit} more"
+            text += f"Dropped over budget: {len(self.dropped)} files ({shown})\n"
+        if self.unread:
+            text += f"Not read after the budget ran out: {self.unread} files\n"
+        return text
@@ -0,0 +1,532 @@
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .tokens import TOKEN_ENCODING
+
+DEFAULT_CACHE_MAX_SIZE = 512 * 1024 * 1024  # 512MB
+
+# Bump when the layout or meaning of cached entries changes
+CACHE_FORMAT_VERSION = "1"
+# Layout of the token count indexes (entries are [content_hash, tokens])
+TOKEN_INDEX_VERSION = "2"
+
+
+def default_cache_dir() -> Path:
+    """Return the cache root: $READIUM_CACHE_DIR, else $XDG_CACHE_HOME/readium"""
+    env_dir = os.environ.get("READIUM_CACHE_DIR")
+    if env_dir:
+        return Path(env_dir)
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return Path(base) / "readium"
+
+
+def hash_file(file_path: Union[str, Path], chunk_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file's content"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _file_size(path: Path) -> int:
+    """Size of ``path`` in bytes, 0 if it does not exist"""
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+@functools.lru_cache(maxsize=None)
+def converter_identity() -> str:
+    """Identify the MarkItDown build producing conversions"""
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return f"markitdown-{version('markitdown')}"
+    except PackageNotFoundError:
+        return "markitdown-unknown"
+
+
+class ConversionCache:
+    """Content-addressed on-disk cache of converted Markdown.
+
+    Entries live under ``<root>/markitdown/<aa>/<key>.md`` where the key hashes the
+    source content together with the converter identity and every setting that
+    changes the result. Reading an entry refreshes its mtime, and once the cache
+    grows past ``max_size`` the least recently used entries are evicted.
+
+    Args:
+        root: Cache root directory (see ``default_cache_dir``)
+        max_size: Maximum total size of cached entries in bytes
+    """
+
+    def __init__(
+        self, root: Union[str, Path], max_size: int = DEFAULT_CACHE_MAX_SIZE
+    ) -> None:
+        self.directory = Path(root) / "markitdown"
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._total_size: Optional[int] = None
+
+    @staticmethod
+    def make_key(content_hash: str, converter: str, settings: Iterable[str]) -> str:
+        """Build a cache key from a content hash, converter id and settings"""
+        digest = hashlib.sha256()
+        for part in (CACHE_FORMAT_VERSION, content_hash, converter, *settings):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.md"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached text for ``key``, or None on a miss"""
+        entry = self._entry_path(key)
+        try:
+            with open(entry, "r", encoding="utf-8", newline="") as f:
+                text = f.read()
+            os.utime(entry)  # Mark as recently used
+            return text
+        except (FileNotFoundError, OSError):
+            return None
+
+    def put(self, key: str, text: str) -> None:
+        """Store ``text`` under ``key`` and evict old entries if over the cap"""
+        entry = self._entry_path(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        old_size = _file_size(entry)  # Replaced, not added, when the key exists
+        fd, tmp_name = tempfile.mkstemp(dir=entry.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+                f.write(text)
+            os.replace(tmp_name, entry)
+        except OSError:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            return
+
+        with self._lock:
+            if self._total_size is None:
+                self._total_size = self._scan_size()
+            else:
+                self._total_size += _file_size(entry) - old_size
+            if self._total_size > self.max_size:
+                self._evict()
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        entries: List[Tuple[float, int, Path]] = []
+        for sub in self.directory.glob("*/*.md"):
+            try:
+                st = sub.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, sub))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until below 90% of the cap"""
+        entries = sorted(self._entries(), key=lambda e: e[0])
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_size * 0.9)
+        for _, size, entry in entries:
+            if total <= target:
+                break
+            try:
+                entry.unlink()
+                total -= size
+            except FileNotFoundError:
+                total -= size
+        self._total_size = total
+
+
+class TokenIndex:
+    """Token counts of one tree, as loaded from a ``TokenCountCache``.
+
+    ``count`` may be called repeatedly (e.g. once per batch while streaming); the
+    entries seen so far replace the stored index when ``save`` is called.
+    """
+
+    def __init__(
+        self, index_path: Path, encoding: str, previous: Dict[str, List[Any]]
+    ) -> None:
+        self.index_path = index_path
+        self.encoding = encoding
+        self.previous = previous
+        self.entries: Dict[str, List[Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def count(
+        self,
+        files: Sequence[Mapping[str, str]],
+        counter: Callable[[List[str]], List[int]],
+    ) -> List[int]:
+        """Return token counts for ``files``, tokenizing only changed ones.
+
+        Args:
+            files: File entries with ``path`` and ``content`` keys
+            counter: Batch token counter used for cache misses
+
+        Returns:
+            Token counts, in the same order as ``files``
+        """
+        counts: List[Optional[int]] = []
+        missing: List[int] = []
+
+        for idx, file_info in enumerate(files):
+            rel_path = file_info["path"]
+            content_hash = hashlib.sha256(
+                file_info["content"].encode("utf-8", errors="surrogatepass")
+            ).hexdigest()
+
+            cached = self.previous.get(rel_path)
+            if cached is not None and cached[0] == content_hash:
+                counts.append(cached[1])
+            else:
+                counts.append(None)
+                missing.append(idx)
+            self.entries[rel_path] = [content_hash, counts[-1]]
+
+        if missing:
+            fresh = counter([files[idx]["content"] for idx in missing])
+            for idx, tokens in zip(missing, fresh):
+                counts[idx] = tokens
+                self.entries[files[idx]["path"]][1] = tokens
+
+        self.hits += len(files) - len(missing)
+        self.misses += len(missing)
+        return [int(tokens or 0) for tokens in counts]
+
+    def save(self) -> bool:
+        """Write the entries seen so far, dropping files that were not seen.
+
+        Returns:
+            Whether the index file was rewritten
+        """
+        if self.entries == self.previous:
+            return False
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": TOKEN_INDEX_VERSION,
+            "encoding": self.encoding,
+            "files": self.entries,
+        }
+        fd, tmp_name = tempfile.mkstemp(dir=self.index_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_name, self.index_path)
+        except OSError:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            return False
+        return True
+
+
+class TokenCountCache:
+    """Persistent per-file token counts for directory trees.
+
+    One JSON index per (tree, encoding) lives under ``<root>/tokens``. A tree is
+    identified by the caller (see ``Readium._token_tree_id``): the absolute path
+    of a local directory, or the URL and revision of a repository read from a
+    temporary checkout, so that checkout's index is found again next time. Each
+    entry maps a relative path to the hash of its processed text and its token
+    count; a file is only re-tokenized when that hash changed. Entries for files
+    not seen in the latest run are dropped. Loading an index refreshes its mtime,
+    and once the indexes grow past ``max_size`` the least recently used ones are
+    deleted.
+
+    Args:
+        root: Cache root directory (see ``default_cache_dir``)
+        encoding: Name of the tiktoken encoding the counts belong to
+        max_size: Maximum total size of the indexes in bytes
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        encoding: str = TOKEN_ENCODING,
+        max_size: int = DEFAULT_CACHE_MAX_SIZE,
+    ):
+        self.directory = Path(root) / "tokens"
+        self.encoding = encoding
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _index_path(self, tree_id: str) -> Path:
+        identity = f"{tree_id}\0{self.encoding}"
+        digest = hashlib.sha256(identity.encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def open(self, tree_id: str) -> TokenIndex:
+        """Load the index stored for the tree identified by ``tree_id``"""
+        index_path = self._index_path(tree_id)
+        previous: Dict[str, List[Any]] = {}
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            os.utime(index_path)  # Mark as recently used
+            if (
+                data.get("version") == TOKEN_INDEX_VERSION
+                and data.get("encoding") == self.encoding
+            ):
+                previous = data.get("files", {})
+        except (FileNotFoundError, OSError, ValueError):
+            pass
+        return TokenIndex(index_path, self.encoding, previous)
+
+    def save(self, index: TokenIndex) -> None:
+        """Save ``index`` and evict old indexes if over the cap"""
+        if not index.save():
+            return
+        # There is one index per tree, so listing them all stays cheap
+        with self._lock:
+            entries: List[Tuple[float, int, Path]] = []
+            for path in self.directory.glob("*.json"):
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            if total <= self.max_size:
+                return
+            target = int(self.max_size * 0.9)
+            for _, size, path in sorted(entries, key=lambda e: e[0]):
+                if total <= target:
+                    break
+                if path == index.index_path:
+                    continue  # Just written
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+    def count(
+        self,
+        tree_id: str,
+        files: Sequence[Mapping[str, str]],
+        counter: Callable[[List[str]], List[int]],
+    ) -> List[int]:
+        """Count tokens for all files of one run and save the updated index"""
+        index = self.open(tree_id)
+        counts = index.count(files, counter)
+        self.save(index)
+        self.hits, self.misses = index.hits, index.misses
+        return counts
+
+
+class HttpEntry:
+    """A web page stored in an ``HttpCache``.
+
+    Attributes:
+        url: URL the page was requested with (the cache key)
+        final_url: URL the page was served from, after redirects
+        media_type: Media type of the response, e.g. ``text/html``
+        etag: ``ETag`` validator, if the server sent one
+        last_modified: ``Last-Modified`` validator, if the server sent one
+        checked: Time the body was last downloaded or revalidated
+        extracted: ``[title, markdown]`` extracted from the body, by settings
+    """
+
+    __slots__ = (
+        "url",
+        "final_url",
+        "media_type",
+        "etag",
+        "last_modified",
+        "checked",
+        "extracted",
+    )
+
+    def __init__(
+        self,
+        url: str,
+        final_url: str,
+        media_type: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        checked: float = 0.0,
+        extracted: Optional[Dict[str, List[str]]] = None,
+    ) -> None:
+        self.url = url
+        self.final_url = final_url
+        self.media_type = media_type
+        self.etag = etag
+        self.last_modified = last_modified
+        self.checked = checked
+        self.extracted = extracted if extracted is not None else {}
+
+    def age(self) -> float:
+        """Seconds since the body was last downloaded or revalidated"""
+        return time.time() - self.checked
+
+
+class HttpCache:
+    """On-disk cache of web pages, revalidated with conditional requests.
+
+    Each URL has a record under ``<root>/http/<aa>/<key>.json`` (the key hashes
+    the URL) holding the ``HttpEntry`` fields, next to the response body in
+    ``<key>.body``. The Markdown extracted from a body is stored in its record,
+    so a page answered with ``304 Not Modified`` is not extracted again; a new
+    body drops it. Reading a record refreshes its mtime, and once the records
+    and bodies grow past ``max_size`` the least recently used pages are evicted.
+
+    Args:
+        root: Cache root directory (see ``default_cache_dir``)
+        max_size: Maximum total size of cached pages in bytes
+    """
+
+    def __init__(
+        self, root: Union[str, Path], max_size: int = DEFAULT_CACHE_MAX_SIZE
+    ) -> None:
+        self.directory = Path(root) / "http"
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._total_size: Optional[int] = None
+
+    def _record_path(self, url: str) -> Path:
+        key = hashlib.sha256(f"{CACHE_FORMAT_VERSION}\0{url}".encode()).hexdigest()
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, url: str) -> Optional[Tuple[HttpEntry, bytes]]:
+        """Return the entry and body cached for ``url``, or None on a miss"""
+        record = self._record_path(url)
+        try:
+            with open(record, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            body = record.with_suffix(".body").read_bytes()
+            os.utime(record)  # Mark as recently used
+            if data.get("version") != CACHE_FORMAT_VERSION:
+                return None
+            fields = {name: data.get(name) for name in HttpEntry.__slots__}
+            return HttpEntry(**fields), body
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def put(
+        self,
+        url: str,
+        final_url: str,
+        media_type: str,
+        body: bytes,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> HttpEntry:
+        """Store a downloaded page, replacing any previous body of ``url``"""
+        entry = HttpEntry(
+            url, final_url, media_type, etag, last_modified, checked=time.time()
+        )
+        record = self._record_path(url)
+        record.parent.mkdir(parents=True, exist_ok=True)
+        old_size = self._page_size(record)
+        if self._write(record.with_suffix(".body"), body):
+            self._write_record(entry)
+        self._account(record, old_size)
+        return entry
+
+    def refresh(self, entry: HttpEntry) -> None:
+        """Record that the cached body of ``entry`` was just revalidated"""
+        entry.checked = time.time()
+        self.save(entry)
+
+    def save(self, entry: HttpEntry) -> bool:
+        """Write the record of ``entry``, e.g. after storing extracted Markdown"""
+        record = self._record_path(entry.url)
+        old_size = self._page_size(record)
+        saved = self._write_record(entry)
+        self._account(record, old_size)
+        return saved
+
+    def _write_record(self, entry: HttpEntry) -> bool:
+        data: Dict[str, Any] = {"version": CACHE_FORMAT_VERSION}
+        data.update((name, getattr(entry, name)) for name in HttpEntry.__slots__)
+        record = self._record_path(entry.url)
+        return self._write(record, json.dumps(data).encode("utf-8"))
+
+    @staticmethod
+    def _page_size(record: Path) -> int:
+        """Bytes a page takes on disk: its record (with the extracted Markdown)
+        and its body"""
+        return _file_size(record) + _file_size(record.with_suffix(".body"))
+
+    def _account(self, record: Path, old_size: int) -> None:
+        """Track the size change of a rewritten page and evict if over the cap"""
+        with self._lock:
+            if self._total_size is None:
+                self._total_size = self._scan_size()
+            else:
+                self._total_size += self._page_size(record) - old_size
+            if self._total_size > self.max_size:
+                self._evict()
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> bool:
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_name, path)
+            return True
+        except OSError:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            return False
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        entries: List[Tuple[float, int, Path]] = []
+        for record in self.directory.glob("*/*.json"):
+            try:
+                st = record.stat()
+                size = st.st_size + record.with_suffix(".body").stat().st_size
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, size, record))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self) -> None:
+        """Delete least recently used pages until below 90% of the cap"""
+        entries = sorted(self._entries(), key=lambda e: e[0])
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_size * 0.9)
+        for _, size, record in entries:
+            if total <= target:
+                break
+            for path in (record, record.with_suffix(".body")):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            total -= size
+        self._total_size = total
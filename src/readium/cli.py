@@ -1,3 +1,4 @@
+import json
 import os
 import sys
 from pathlib import Path
@@ -9,8 +10,6 @@ from typing import (  # Adding cast, Optional and Tuple for typing
 )
 
 import click
-from rich.console import Console
-from rich.table import Table
 
 from .config import URL_MODES  # Importing URL_MODES for typing
 from .config import (
@@ -19,9 +18,33 @@ from .config import (
     MARKITDOWN_EXTENSIONS,
 )
 from .core import ReadConfig, Readium, is_url
-from .utils.error_handling import print_error
+from .tokentree import TOKEN_TREE_FORMATS
+from .utils.error_handling import LazyConsole, print_error
 
-console = Console()
+console = LazyConsole()
+
+
+def report_stats(reader: Readium, profile: bool, stats_json: Optional[str]) -> None:
+    """Print and/or save the statistics of the run that just finished"""
+    if reader.stats is None:
+        return
+    if profile:
+        click.echo(reader.stats.format(), err=True)
+    if stats_json:
+        with open(stats_json, "w", encoding="utf-8") as f:
+            json.dump(reader.stats.to_dict(), f, indent=2)
+
+
+def report_tokens(reader: Readium, token_format: str) -> None:
+    """Print the token tree of the run that just finished"""
+    from .tokentree import build_token_tree, render, render_rich
+
+    tree = reader.token_tree or build_token_tree([])
+    # A Rich table is only worth drawing for someone looking at a terminal
+    if token_format == "table" and sys.stdout.isatty():
+        render_rich(tree)
+    else:
+        click.echo(render(tree, token_format).rstrip("\n"))
 
 
 @click.command(
@@ -44,6 +67,10 @@ Examples:
     # Save output to a file
     readium /path/to/directory -o output.md
 
+    # Crawl a documentation site two links deep, or every page of its sitemap
+    readium https://example.com/docs/ --crawl -o docs.md
+    readium https://example.com/sitemap.xml --crawl --crawl-depth 0 -o docs.md
+
     # Generate split files from a webpage
     readium https://example.com/docs --split-output ./markdown-files/
 
@@ -53,6 +80,24 @@ Examples:
     # Exclude multiple directories (using -x multiple times)
     readium /path/to/directory -x dir1 -x dir2
 
+    # Keep a combined output file up to date while files change
+    readium watch /path/to/directory -o output.md
+
+    # Process every source listed in a file ("<path or URL> [branch]" per line)
+    readium batch sources.txt -o outputs/
+
+    # Estimate the token count of a large tree from a sample of its files
+    readium tokens /path/to/directory --token-estimate fast
+
+    # Export per-file token counts for a spreadsheet or another tool
+    readium tokens /path/to/directory --token-format csv > tokens.csv
+
+    # Fit the output into 100k tokens, READMEs and docs first, then src/
+    readium /path/to/directory --max-tokens 100000 --priority "src/*"
+
+    # Show where the time goes and why files were skipped
+    readium /path/to/directory -o output.md --profile --stats-json stats.json
+
 Note: Do not use empty values with -x/--exclude-dir. Each value must be a valid directory name.
 """
 )
@@ -61,7 +106,9 @@ Note: Do not use empty values with -x/--exclude-dir. Each value must be a valid
     "--target-dir", "-t", help="Target subdirectory to analyze (for directories)"
 )
 @click.option(
-    "--branch", "-b", help="Specific Git branch to clone (only for Git repositories)"
+    "--branch",
+    "-b",
+    help="Git branch, tag or commit to read (git URLs, or local repositories without touching the working tree)",
 )
 @click.option(
     "--max-size",
@@ -96,6 +143,48 @@ Note: Do not use empty values with -x/--exclude-dir. Each value must be a valid
     default="clean",
     help="URL processing mode: 'full' preserves all content, 'clean' extracts main content only (default: clean)",
 )
+@click.option(
+    "--crawl",
+    is_flag=True,
+    default=False,
+    help="Crawl a documentation site from the URL (a page or sitemap.xml), following same-origin links",
+)
+@click.option(
+    "--crawl-depth",
+    type=click.IntRange(min=0),
+    default=2,
+    help="Link hops followed from the seed pages with --crawl (default: 2)",
+)
+@click.option(
+    "--crawl-max-pages",
+    type=click.IntRange(min=1),
+    default=100,
+    help="Maximum number of pages requested with --crawl (default: 100)",
+)
+@click.option(
+    "--crawl-connections",
+    type=click.IntRange(min=1),
+    default=4,
+    help="Concurrent keep-alive connections per host with --crawl (default: 4)",
+)
+@click.option(
+    "--http-cache",
+    is_flag=True,
+    default=False,
+    help="Cache web pages and revalidate them with conditional requests on later runs",
+)
+@click.option(
+    "--http-cache-ttl",
+    type=click.FloatRange(min=0),
+    default=None,
+    help="Use cached web pages younger than this many seconds without any request (implies --http-cache)",
+)
+@click.option(
+    "--offline",
+    is_flag=True,
+    default=False,
+    help="Serve web pages from the HTTP cache only, without network access (implies --http-cache)",
+)
 @click.option(
     "--exclude-ext",
     "-e",
@@ -118,12 +207,120 @@ Note: Do not use empty values with -x/--exclude-dir. Each value must be a valid
     default=False,
     help="Show a detailed token tree with file and directory token counts (tiktoken)",
 )
+@click.option(
+    "--token-estimate",
+    type=click.Choice(["exact", "fast"]),
+    default="exact",
+    help="Token report mode: 'exact' tokenizes every file, 'fast' tokenizes a sample and extrapolates from file sizes (default: exact)",
+)
+@click.option(
+    "--token-format",
+    type=click.Choice(TOKEN_TREE_FORMATS),
+    default="table",
+    help="Token report format: 'table' draws a Rich table on a terminal and prints Markdown otherwise; 'markdown', 'json' and 'csv' always print text (default: table)",
+)
 @click.option(
     "--no-gitignore",
     is_flag=True,
     default=False,
     help="Do not respect .gitignore files (default: respect them)",
 )
+@click.option(
+    "--no-git-index",
+    is_flag=True,
+    default=False,
+    help="Walk the directory even in git checkouts instead of using 'git ls-files'",
+)
+@click.option(
+    "--git-objects",
+    is_flag=True,
+    default=False,
+    help="Read git URLs, and local repositories given a branch, from git objects without a checkout",
+)
+@click.option(
+    "--full-clone",
+    is_flag=True,
+    default=False,
+    help="Clone git URLs in full instead of only the blobs and directories that are read",
+)
+@click.option(
+    "--repo-cache",
+    is_flag=True,
+    default=False,
+    help="Keep local mirrors of git URLs in the cache directory and fetch only what changed",
+)
+@click.option(
+    "--markitdown-jobs",
+    type=click.IntRange(min=0),
+    default=0,
+    help="Worker processes for MarkItDown conversion (default: 0, convert in-process)",
+)
+@click.option(
+    "--markitdown-timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Per-file MarkItDown timeout in seconds; files that time out are skipped",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    default=False,
+    help="Do not read or write the on-disk caches (converted documents, token counts)",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Cache directory (default: $READIUM_CACHE_DIR or ~/.cache/readium)",
+)
+@click.option(
+    "--incremental",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Run manifest file; only files changed since the last run are reprocessed",
+)
+@click.option(
+    "--max-tokens",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Token budget: include files by priority until this many tokens are used",
+)
+@click.option(
+    "--priority",
+    multiple=True,
+    help="Glob on relative paths ranking files for --max-tokens, after READMEs and docs (can be repeated, highest first)",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    default=False,
+    help="Print stage timings, skipped files by reason and the slowest files (to stderr)",
+)
+@click.option(
+    "--stats-json",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Write the run statistics collected by --profile to this JSON file",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of worker threads for reading and converting files (default: auto)",
+)
+@click.option(
+    "--batch-jobs",
+    type=click.IntRange(min=1),
+    default=4,
+    help="Sources processed at once by 'readium batch' (default: 4)",
+)
+@click.option(
+    "--fetch-jobs",
+    type=click.IntRange(min=1),
+    default=4,
+    help="Clones, fetches and downloads running at once in 'readium batch' (default: 4)",
+)
 def main(
     args: Tuple[str, ...],
     target_dir: Optional[str] = None,
@@ -135,16 +332,43 @@ def main(
     include_ext: Tuple[str, ...] = (),
     exclude_ext: Tuple[str, ...] = (),
     url_mode: str = "clean",
+    crawl: bool = False,
+    crawl_depth: int = 2,
+    crawl_max_pages: int = 100,
+    crawl_connections: int = 4,
+    http_cache: bool = False,
+    http_cache_ttl: Optional[float] = None,
+    offline: bool = False,
     debug: bool = False,
     use_markitdown: bool = False,
     tokens: bool = False,
+    token_estimate: str = "exact",
+    token_format: str = "table",
     no_gitignore: bool = False,
+    no_git_index: bool = False,
+    git_objects: bool = False,
+    full_clone: bool = False,
+    repo_cache: bool = False,
+    markitdown_jobs: int = 0,
+    markitdown_timeout: Optional[float] = None,
+    no_cache: bool = False,
+    cache_dir: Optional[str] = None,
+    incremental: Optional[str] = None,
+    max_tokens: Optional[int] = None,
+    priority: Tuple[str, ...] = (),
+    profile: bool = False,
+    stats_json: Optional[str] = None,
+    jobs: Optional[int] = None,
+    batch_jobs: int = 4,
+    fetch_jobs: int = 4,
 ) -> None:
     """Read and analyze documentation from a directory, repository, or URL"""
     try:
         # Manual argument parsing
         path = None
         token_command = False
+        watch_command = False
+        batch_command = False
         # Detect 'tokens' subcommand or --tokens flag
         if len(args) > 0 and args[0] == "tokens":
             token_command = True
@@ -153,11 +377,40 @@ def main(
                 raise click.UsageError("You must provide a path after 'tokens'.")
             path = args[1]
             args = args[1:]
+        elif len(args) > 0 and args[0] == "watch":
+            watch_command = True
+            if len(args) < 2:
+                raise click.UsageError("You must provide a directory after 'watch'.")
+            if not output:
+                raise click.UsageError("'watch' requires an output file (-o).")
+            path = args[1]
+            if is_url(path) or not os.path.isdir(path):
+                raise click.UsageError("'watch' only works on a local directory.")
+            args = args[1:]
+        elif len(args) > 0 and args[0] == "batch":
+            batch_command = True
+            if len(args) < 2:
+                raise click.UsageError("You must provide a sources file after 'batch'.")
+            if not output:
+                raise click.UsageError("'batch' requires an output directory (-o).")
+            if tokens:
+                raise click.UsageError("'batch' does not support token reports.")
+            path = args[1]
+            args = args[1:]
         else:
             if len(args) == 0:
                 raise click.UsageError("Missing required argument 'path'.")
             path = args[0]
 
+        if token_estimate == "fast" and not tokens:
+            raise click.UsageError(
+                "--token-estimate fast only applies to the token report ('readium tokens' or --tokens)."
+            )
+        if token_format != "table" and not tokens:
+            raise click.UsageError(
+                "--token-format only applies to the token report ('readium tokens' or --tokens)."
+            )
+
         # Validation: do not allow empty values in --exclude-dir / -x
         sanitized_exclude = []
         for d in exclude_dir:
@@ -195,48 +448,122 @@ def main(
             show_token_tree=tokens,
             token_calculation="tiktoken",
             use_gitignore=not no_gitignore,
+            use_git_index=not no_git_index,
+            use_git_objects=git_objects,
+            partial_clone=not full_clone,
+            repo_cache=repo_cache,
+            workers=jobs,
+            markitdown_processes=markitdown_jobs,
+            markitdown_timeout=markitdown_timeout,
+            use_cache=not no_cache,
+            cache_dir=cache_dir,
+            incremental_manifest=incremental,
+            profile=profile or stats_json is not None,
+            max_tokens=max_tokens,
+            priority_paths=list(priority),
+            crawl=crawl,
+            crawl_depth=crawl_depth,
+            crawl_max_pages=crawl_max_pages,
+            crawl_host_connections=crawl_connections,
+            http_cache=http_cache,
+            http_cache_ttl=http_cache_ttl,
+            offline=offline,
         )
 
         reader = Readium(config)
         if split_output:
             reader.split_output_dir = split_output
 
-        summary, tree, content = reader.read_docs(path, branch=branch)
+        if batch_command:
+            from .batch import parse_sources, run_batch
+
+            assert output is not None
+            with open(path, "r", encoding="utf-8") as f:
+                sources = parse_sources(f)
+            try:
+                report = run_batch(
+                    reader,
+                    sources,
+                    output,
+                    jobs=batch_jobs,
+                    fetch_jobs=fetch_jobs,
+                    on_done=lambda result: console.print(
+                        f"[green]Done {result.source} -> {result.output}[/green]"
+                        if result.error is None
+                        else f"[red]Failed {result.source}: {result.error}[/red]"
+                    ),
+                )
+            finally:
+                reader.close()
+            console.print("[bold]Batch summary:[/bold]")
+            click.echo(report.format())
+            if report.failed:
+                sys.exit(1)
+            return None
+
+        if watch_command:
+            from .watch import watch
+
+            assert output is not None
+            console.print(
+                f"[yellow]Watching {path}, writing {output} (Ctrl+C to stop)[/yellow]"
+            )
+            try:
+                watch(
+                    reader,
+                    path,
+                    output,
+                    on_update=lambda count: console.print(
+                        f"[green]Updated {output} ({count} files changed)[/green]"
+                    ),
+                )
+            except KeyboardInterrupt:
+                pass
+            finally:
+                reader.close()
+            return None
+
+        try:
+            if tokens and token_estimate == "fast" and not is_url(path):
+                reader.estimate_token_tree(path, branch=branch, rich_only=True)
+                report_tokens(reader, token_format)
+                report_stats(reader, profile, stats_json)
+                return None
+            if output and not tokens:
+                # Stream file blocks straight to disk instead of building the
+                # whole content string in memory
+                reader.write_docs(path, output, branch=branch)
+                console.print(f"[green]Results saved to {output}[/green]")
+                report_stats(reader, profile, stats_json)
+                return None
+            summary, tree, content = reader.read_docs(path, branch=branch)
+        finally:
+            reader.close()
+        report_stats(reader, profile, stats_json)
 
         if tokens:
-            # Only show the token tree and exit, use rich_only=True to avoid duplication
-            token_tree = tree.split("Documentation Structure:")[0].strip()
-            if not token_tree:
-                token_tree = "# Directory Token Tree\n\n**Total Files:** 0  \n**Total Tokens:** 0"
-            click.echo(token_tree)
+            # Only show the token tree and exit
+            report_tokens(reader, token_format)
             return None
 
-        if output:
+        console.print("[bold]Summary:[/bold]")
+        console.print(summary)
+        console.print("\n[bold]Tree:[/bold]")
+        console.print(tree)
+        console.print("\n[bold]Content:[/bold]")
+        try:
+            console.print(content)
+        except Exception as e:
+            # Handle unprintable content
+            console.print(
+                "\n[red]Error displaying content on screen. Check the output file for details.[/red]"
+            )
+            output = "output.txt"
             with open(output, "w", encoding="utf-8") as f:
                 f.write(f"Summary:\n{summary}\n\n")
                 f.write(f"Tree:\n{tree}\n\n")
                 f.write(f"Content:\n{content}")
-            console.print(f"[green]Results saved to {output}[/green]")
-        else:
-            console.print("[bold]Summary:[/bold]")
-            console.print(summary)
-            console.print("\n[bold]Tree:[/bold]")
-            console.print(tree)
-            console.print("\n[bold]Content:[/bold]")
-            try:
-                console.print(content)
-            except Exception as e:
-                # Handle unprintable content
-                console.print(
-                    "\n[red]Error displaying content on screen. Check the output file for details.[/red]"
-                )
-                if not output:
-                    output = "output.txt"
-                with open(output, "w", encoding="utf-8") as f:
-                    f.write(f"Summary:\n{summary}\n\n")
-                    f.write(f"Tree:\n{tree}\n\n")
-                    f.write(f"Content:\n{content}")
-                console.print(f"[green]Content saved to {output}[/green]")
+            console.print(f"[green]Content saved to {output}[/green]")
 
     except Exception as e:
         print_error(console, str(e))
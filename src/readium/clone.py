@@ -0,0 +1,383 @@
+import contextlib
+import hashlib
+import os
+import shutil
+import subprocess
+import urllib.parse
+from pathlib import Path
+from typing import Collection, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+DEFAULT_REPO_CACHE_MAX_SIZE = 2 * 1024 * 1024 * 1024  # 2GB
+
+# ``git ls-tree`` entry: (mode, type, object id, path)
+TreeEntry = Tuple[str, str, str, str]
+
+
+def _git(
+    repo: str, *args: str, stdin: Optional[bytes] = None
+) -> "subprocess.CompletedProcess[bytes]":
+    return subprocess.run(
+        ["git", "-C", repo, *args], input=stdin, check=True, capture_output=True
+    )
+
+
+def list_tree(repo: str) -> List[TreeEntry]:
+    """All trees and blobs of ``HEAD``; needs tree objects only, no blobs"""
+    output = _git(repo, "ls-tree", "-r", "-t", "-z", "HEAD").stdout
+    entries = []
+    for record in output.split(b"\0"):
+        if not record:
+            continue
+        meta, _, path = record.partition(b"\t")
+        mode, kind, oid = meta.decode().split()
+        entries.append((mode, kind, oid, os.fsdecode(path)))
+    return entries
+
+
+def missing_blobs(repo: str) -> Set[str]:
+    """Blobs left out by the clone filter (listed without fetching them)"""
+    output = _git(repo, "rev-list", "--objects", "--missing=print", "HEAD").stdout
+    return {line[1:].decode() for line in output.splitlines() if line.startswith(b"?")}
+
+
+def sparse_cone(
+    entries: List[TreeEntry], base: str, exclude_dirs: Collection[str]
+) -> List[str]:
+    """Directories to list in a cone-mode sparse checkout.
+
+    Cone mode can only include whole directories, so a directory is listed as
+    is when nothing below it is excluded; otherwise its subdirectories are
+    considered one by one, leaving out excluded ones. A directory whose own
+    files would be lost that way (it has files but no listed subdirectory) is
+    listed whole, since excluded directories are pruned again when walking.
+
+    Args:
+        entries: Output of ``list_tree``
+        base: Directory to restrict the checkout to ("" for the whole tree)
+        exclude_dirs: Directory names excluded wherever they appear
+
+    Returns:
+        Directories relative to the repository root; ``[""]`` means everything
+    """
+    children: Dict[str, List[str]] = {}
+    has_files: Set[str] = set()
+    excluded_below: Set[str] = set()  # Directories with an excluded descendant
+    for _, kind, _, path in entries:
+        parent = path.rpartition("/")[0]
+        if kind == "tree":
+            children.setdefault(parent, []).append(path)
+            if path.rpartition("/")[2] in exclude_dirs:
+                ancestor = parent
+                while ancestor not in excluded_below:
+                    excluded_below.add(ancestor)
+                    if not ancestor:
+                        break
+                    ancestor = ancestor.rpartition("/")[0]
+        elif kind == "blob":
+            has_files.add(parent)
+
+    def cover(directory: str) -> List[str]:
+        if directory not in excluded_below:
+            return [directory]
+        listed: List[str] = []
+        for child in children.get(directory, []):
+            if child.rpartition("/")[2] not in exclude_dirs:
+                listed.extend(cover(child))
+        if directory and directory in has_files and not listed:
+            return [directory]
+        return listed
+
+    return cover(base)
+
+
+def in_cone(path: str, cone: List[str]) -> bool:
+    """Whether a file is checked out by a cone-mode sparse checkout of ``cone``.
+
+    Besides everything below the listed directories, cone mode includes the
+    files directly inside the root and inside every ancestor of a listed
+    directory.
+    """
+    directory = path.rpartition("/")[0]
+    if not directory:
+        return True
+    for listed in cone:
+        if not listed or directory == listed or directory.startswith(listed + "/"):
+            return True
+        if listed.startswith(directory + "/"):
+            return True
+    return False
+
+
+def partial_checkout(
+    repo: str,
+    sparse_dir: Optional[str],
+    exclude_dirs: Collection[str],
+) -> None:
+    """Check out a ``--no-checkout`` partial clone without fetching anything.
+
+    The cone of ``sparse_dir`` minus excluded directories is recorded with
+    ``git sparse-checkout set --cone``. The index is then built from the files
+    in that cone whose blobs were downloaded, and written with ``git
+    checkout-index``, so ``git ls-files`` lists exactly the checked out files.
+    Files left out by the clone's size filter are skipped rather than fetched
+    lazily (as ``git checkout`` would do): they are too large to be read anyway.
+    """
+    entries = list_tree(repo)
+    base = (sparse_dir or "").replace(os.sep, "/").strip("/")
+    cone = sparse_cone(entries, base, exclude_dirs)
+    if cone != [""]:
+        # Run while the index is still empty, so nothing is checked out here
+        _git(repo, "sparse-checkout", "set", "--cone", *cone)
+
+    missing = missing_blobs(repo)
+    index_info = b"".join(
+        f"{mode} {oid}\t".encode() + os.fsencode(path) + b"\0"
+        for mode, kind, oid, path in entries
+        if kind == "blob" and oid not in missing and in_cone(path, cone)
+    )
+    _git(repo, "update-index", "-z", "--index-info", stdin=index_info)
+    _git(repo, "checkout-index", "--all")
+
+
+def normalize_repo_url(url: str) -> str:
+    """Credential-free canonical form of a repository URL, used as cache key.
+
+    Userinfo (``user:token@``) is dropped, scheme and host are lowercased, and
+    a trailing ``/`` or ``.git`` is removed, so every spelling of one
+    repository maps to the same mirror.
+    """
+    parts = urllib.parse.urlsplit(url)
+    netloc = (parts.hostname or "").lower()
+    if parts.port is not None:
+        netloc += f":{parts.port}"
+    path = parts.path.rstrip("/")
+    if path.endswith(".git"):
+        path = path[: -len(".git")]
+    return urllib.parse.urlunsplit((parts.scheme.lower(), netloc, path, "", ""))
+
+
+class RepoCache:
+    """Persistent bare mirrors of remote repositories.
+
+    Each mirror lives under ``<root>/repos/<key>.git``, keyed by the
+    normalized URL (see ``normalize_repo_url``) and the blob size filter.
+    ``open`` fetches the requested branch into the mirror with a shallow
+    incremental fetch (see ``fetch_commit``) for reading it in place;
+    ``checkout`` builds a working tree that borrows the mirror's objects
+    (``objects/info/alternates``) instead of copying them.
+
+    The repository URL is passed to git on the command line for each fetch and
+    never stored, so credentials embedded in it stay out of the cache. A
+    ``<key>.lock`` file per mirror is held with ``flock`` while it is used
+    or evicted, which makes concurrent runs on one cache safe; its mtime
+    records the last use. Once the mirrors grow past ``max_size`` the least
+    recently used ones that are not locked are deleted.
+
+    Args:
+        root: Cache root directory (see ``cache.default_cache_dir``)
+        max_size: Maximum total size of the mirrors in bytes
+    """
+
+    def __init__(
+        self, root: Union[str, Path], max_size: int = DEFAULT_REPO_CACHE_MAX_SIZE
+    ) -> None:
+        self.directory = Path(root) / "repos"
+        self.max_size = max_size
+
+    def mirror_path(self, url: str, max_blob_size: Optional[int] = None) -> Path:
+        """Location of the mirror holding ``url`` fetched with this size filter"""
+        identity = f"{normalize_repo_url(url)}\0{_blob_filter(max_blob_size)}"
+        digest = hashlib.sha256(identity.encode("utf-8")).hexdigest()[:32]
+        return self.directory / f"{digest}.git"
+
+    @contextlib.contextmanager
+    def open(
+        self,
+        url: str,
+        branch: Optional[str] = None,
+        max_blob_size: Optional[int] = None,
+    ) -> Iterator[Tuple[str, str]]:
+        """Fetch ``branch`` (default: the remote HEAD) into the mirror.
+
+        The mirror stays locked, and so safe to read from, until the block
+        exits; mirrors over the size cap are evicted afterwards, even if the
+        fetch or the block failed.
+
+        Yields:
+            ``(mirror directory, commit id)``
+        """
+        mirror = self.mirror_path(url, max_blob_size)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        try:
+            with _locked(mirror.with_suffix(".lock")):
+                if not mirror.exists():
+                    # Set up aside and rename, so an interrupted run leaves no mirror
+                    staging = mirror.with_suffix(".new")
+                    shutil.rmtree(staging, ignore_errors=True)
+                    _git(str(self.directory), "init", "-q", "--bare", staging.name)
+                    staging.rename(mirror)
+                yield str(mirror), fetch_commit(str(mirror), url, branch, max_blob_size)
+        finally:
+            # Failed fetches may have grown the cache as well
+            self.evict(keep=mirror)
+
+    def checkout(
+        self,
+        url: str,
+        target_dir: str,
+        branch: Optional[str] = None,
+        sparse_dir: Optional[str] = None,
+        exclude_dirs: Collection[str] = (),
+        max_blob_size: Optional[int] = None,
+    ) -> None:
+        """Fetch ``branch`` (default: the remote HEAD) and check it out.
+
+        ``target_dir`` must be an empty or missing directory. The arguments
+        mean the same as for ``core.clone_repository``.
+        """
+        with self.open(url, branch, max_blob_size) as (mirror, commit):
+            try:
+                Path(target_dir).mkdir(parents=True, exist_ok=True)
+                _git(target_dir, "init", "-q")
+                git_dir = Path(target_dir) / ".git"
+                alternates = git_dir / "objects" / "info" / "alternates"
+                alternates.write_text(f"{Path(mirror).resolve() / 'objects'}\n")
+                shutil.copyfile(Path(mirror) / "shallow", git_dir / "shallow")
+                _git(target_dir, "update-ref", "HEAD", commit)
+                partial_checkout(target_dir, sparse_dir, exclude_dirs)
+            except subprocess.CalledProcessError as e:
+                raise ValueError(f"Failed to check out repository: {e.stderr.decode()}")
+
+    def _mirrors(self) -> List[Tuple[float, int, Path]]:
+        """``(last use, size, path)`` of every mirror"""
+        mirrors = []
+        for mirror in self.directory.glob("*.git"):
+            try:
+                last_used = mirror.with_suffix(".lock").stat().st_mtime
+            except FileNotFoundError:
+                last_used = 0.0
+            mirrors.append((last_used, _tree_size(mirror), mirror))
+        return mirrors
+
+    def evict(self, keep: Optional[Path] = None) -> None:
+        """Delete least recently used mirrors until below the size cap"""
+        mirrors = sorted(self._mirrors(), key=lambda m: m[0])
+        total = sum(size for _, size, _ in mirrors)
+        for _, size, mirror in mirrors:
+            if total <= self.max_size:
+                break
+            if mirror == keep:
+                continue
+            lock_path = mirror.with_suffix(".lock")
+            try:
+                with _locked(lock_path, blocking=False):
+                    shutil.rmtree(mirror, ignore_errors=True)
+                    if not mirror.exists():
+                        # Runs waiting on this lock file notice it is gone
+                        # (see ``_locked``), so it can go while still held
+                        try:
+                            lock_path.unlink()
+                        except OSError:
+                            pass
+            except BlockingIOError:
+                continue  # In use by another run
+            total -= size
+
+
+def fetch_commit(
+    repo: str, url: str, branch: Optional[str], max_blob_size: Optional[int]
+) -> str:
+    """Shallow fetch ``branch`` (default: the remote HEAD) into a bare ``repo``.
+
+    The fetched commit is kept as ``refs/readium/<branch>``, so repeated fetches
+    into one repository are incremental. The URL and the partial clone settings
+    are passed with ``-c`` and never written to the repository's config: the
+    URL may embed credentials, and without a promisor remote configured, later
+    reads of blobs left out by the size filter fail instead of fetching them.
+
+    Returns:
+        The commit id
+
+    Raises:
+        ValueError: If the fetch fails (credentials in the message are hidden)
+    """
+    source = branch or "HEAD"
+    ref = f"refs/readium/{source}"
+    cmd = ["-c", f"remote.origin.url={url}"]
+    if max_blob_size is not None:
+        cmd += ["-c", "remote.origin.promisor=true"]
+        cmd += ["-c", f"remote.origin.partialclonefilter={_blob_filter(max_blob_size)}"]
+    cmd += ["fetch", "-q", "--depth=1", "--no-write-fetch-head"]
+    if max_blob_size is not None:
+        cmd.append(f"--filter={_blob_filter(max_blob_size)}")
+    try:
+        _git(repo, *cmd, "origin", f"+{source}:{ref}")
+        return _git(repo, "rev-parse", ref).stdout.decode().strip()
+    except subprocess.CalledProcessError as e:
+        error_msg = e.stderr.decode()
+        # Hide credentials embedded in the URL if git echoed them
+        parts = urllib.parse.urlsplit(url)
+        for secret in (parts.password, parts.username):
+            if secret:
+                error_msg = error_msg.replace(secret, "****")
+        # Not chained: the failed command line holds the URL
+        raise ValueError(f"Failed to fetch repository: {error_msg}") from None
+
+
+def _blob_filter(max_blob_size: Optional[int]) -> str:
+    # The filter omits blobs of at least ``limit`` bytes
+    return "" if max_blob_size is None else f"blob:limit={max_blob_size + 1}"
+
+
+def _tree_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+@contextlib.contextmanager
+def _locked(lock_path: Path, blocking: bool = True) -> Iterator[None]:
+    """Hold an exclusive ``flock`` on ``lock_path``, touching it as last use.
+
+    The lock file may be deleted by its holder (see ``RepoCache.evict``); a
+    lock taken on a file that is no longer at ``lock_path`` is dropped and
+    taken again on the current file.
+
+    Raises BlockingIOError if ``blocking`` is False and the lock is taken.
+    Without ``fcntl`` (Windows) no lock is taken.
+    """
+    while True:
+        lock_file = open(lock_path, "a")
+        if fcntl is None:
+            break
+        flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        try:
+            fcntl.flock(lock_file.fileno(), flags)
+            current = os.stat(lock_path)
+        except FileNotFoundError:
+            lock_file.close()
+            continue
+        except BaseException:
+            lock_file.close()
+            raise
+        if os.path.samestat(os.fstat(lock_file.fileno()), current):
+            break
+        lock_file.close()
+
+    with lock_file:
+        try:
+            os.utime(lock_path)
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
 from typing import (  # Add Tuple and Union for function return type
+    List,
     Literal,
     Optional,
     Set,
@@ -172,6 +173,92 @@ class ReadConfig:
     ----------
     exclude_extensions : Set[str]
         File extensions to exclude from processing (takes precedence over include_extensions).
+    use_git_index : bool
+        In a git working tree, list files with ``git ls-files`` instead of walking
+        the directory. Git then applies nested ``.gitignore`` files and
+        ``.git/info/exclude`` too. Files come sorted by path, as git lists them,
+        instead of in walk order (a directory's own files before its
+        subdirectories), and the contents of submodules are left out. Falls back
+        to the directory walk when git is not available.
+    workers : Optional[int]
+        Number of threads used to filter, read and convert files. ``None`` picks a
+        default based on the CPU count; ``1`` processes files serially.
+    markitdown_processes : int
+        Number of worker processes used for MarkItDown conversion. ``0`` converts
+        in the main process, one document at a time.
+    markitdown_timeout : Optional[float]
+        Per-file conversion timeout in seconds. Setting it runs conversions in a
+        worker process (at least one); files that time out are skipped.
+    use_cache : bool
+        Cache MarkItDown conversions on disk, keyed by file content hash and
+        converter version, so unchanged documents are not converted again, and
+        keep a per-tree index of token counts so unchanged files are not
+        re-tokenized. Off by default so library calls write nothing to disk;
+        the CLI turns it on unless ``--no-cache`` is given.
+    cache_dir : Optional[str]
+        Cache root directory. Defaults to ``$READIUM_CACHE_DIR`` or
+        ``$XDG_CACHE_HOME/readium`` (``~/.cache/readium``).
+    cache_max_size : int
+        Size cap in bytes of the conversion cache, and separately of the HTTP
+        cache and of the token count indexes; least recently used entries are
+        evicted beyond it.
+    incremental_manifest : Optional[str]
+        Path of a run manifest. Each run records the fingerprint (size, mtime,
+        content hash) and processed text of every file there; the next run only
+        reprocesses added or modified files and reuses the stored text for the
+        rest. Processed text is kept in a ``<manifest>.blocks`` directory.
+    profile : bool
+        Collect per-stage timings, counters of skipped files by reason, bytes
+        read and the slowest files of each directory run. The result is
+        available as ``Readium.stats`` (a ``RunStats``) once the run completes.
+    max_tokens : Optional[int]
+        Token budget for a directory run, counted with tiktoken like the token
+        tree. Files are admitted in priority order (READMEs, then files under
+        docs directories, then ``priority_paths``, then the rest; smaller files
+        first within each tier) while they fit; once the budget is used up no
+        more files are read or converted. Output follows the admission order and
+        the summary lists what was dropped.
+    priority_paths : List[str]
+        Glob patterns on ``/``-separated relative paths ranking files for
+        ``max_tokens``, highest priority first.
+    partial_clone : bool
+        Clone git URLs partially: files larger than ``max_file_size`` are not
+        downloaded, and only ``target_dir`` minus ``exclude_dirs`` is checked
+        out. Disable for a plain shallow clone of everything.
+    repo_cache : bool
+        Keep bare mirrors of git URLs in ``<cache_dir>/repos`` and update them
+        with an incremental fetch instead of cloning from scratch on every run.
+        Needs ``use_cache``.
+    repo_cache_max_size : int
+        Size cap of the repository mirrors in bytes; least recently used
+        mirrors are evicted beyond it.
+    use_git_objects : bool
+        Read git URLs straight from git objects (``git ls-tree`` and ``git
+        cat-file --batch``) instead of a checkout, and read a local repository
+        given a branch, tag or commit from that revision without touching its
+        working tree.
+    crawl : bool
+        Crawl web URLs instead of reading a single page: starting from the URL,
+        or from the pages listed when it is a ``sitemap.xml``, follow
+        same-origin links breadth first. Each page becomes one file of the
+        output, named after its URL path.
+    crawl_depth : int
+        Number of link hops followed from the seed pages.
+    crawl_max_pages : int
+        Maximum number of pages requested by a crawl.
+    crawl_host_connections : int
+        Keep-alive connections, and so concurrent requests, per host.
+    http_cache : bool
+        Keep web pages in ``<cache_dir>/http`` with their ``ETag`` and
+        ``Last-Modified`` validators and the Markdown extracted from them.
+        Later runs revalidate pages with conditional requests; an unchanged
+        page (``304``) is not downloaded or extracted again. Needs
+        ``use_cache``; ``http_cache_ttl`` and ``offline`` turn it on.
+    http_cache_ttl : Optional[float]
+        Seconds during which a cached page is used without revalidation.
+    offline : bool
+        Serve web pages from the HTTP cache only, whatever their age, without
+        any network access; pages not cached fail.
     """
 
     max_file_size: int = 5 * 1024 * 1024  # 5MB default
@@ -200,6 +287,28 @@ class ReadConfig:
         "tiktoken"
     ] = "tiktoken"  # Token calculation mode (only tiktoken)
     use_gitignore: bool = True  # Respect .gitignore files (new)
+    use_git_index: bool = True  # List files with `git ls-files` in git checkouts
+    workers: Optional[int] = None  # Worker threads for file processing (None = auto)
+    markitdown_processes: int = 0  # MarkItDown worker processes (0 = in-process)
+    markitdown_timeout: Optional[float] = None  # Per-file MarkItDown timeout (seconds)
+    use_cache: bool = False  # Reuse cached results of expensive steps across runs
+    cache_dir: Optional[str] = None  # Cache root (default: ~/.cache/readium)
+    cache_max_size: int = 512 * 1024 * 1024  # Conversion cache size cap (512MB)
+    incremental_manifest: Optional[str] = None  # Run manifest for incremental runs
+    profile: bool = False  # Collect stage timings and skip counters (Readium.stats)
+    max_tokens: Optional[int] = None  # Token budget for the files of a run
+    priority_paths: List[str] = field(default_factory=list)  # Budget priority globs
+    partial_clone: bool = True  # Sparse + size-filtered clone of git URLs
+    repo_cache: bool = False  # Reuse local mirrors of git URLs across runs
+    repo_cache_max_size: int = 2 * 1024 * 1024 * 1024  # Mirror size cap (2GB)
+    use_git_objects: bool = False  # Read git URLs and revisions without a checkout
+    crawl: bool = False  # Follow same-origin links from web URLs
+    crawl_depth: int = 2  # Link hops followed from the seed pages
+    crawl_max_pages: int = 100  # Pages requested per crawl
+    crawl_host_connections: int = 4  # Concurrent requests per host
+    http_cache: bool = False  # Cache web pages and revalidate them on reuse
+    http_cache_ttl: Optional[float] = None  # Seconds to use pages unrevalidated
+    offline: bool = False  # Serve web pages from the HTTP cache only
 
 
 def convert_url_to_markdown(url: str, config: ReadConfig) -> Tuple[str, str]:
@@ -0,0 +1,222 @@
+import queue
+import sys
+import threading
+from typing import TYPE_CHECKING, Any, Callable, List, Optional
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+
+
+class ConversionError(Exception):
+    """Raised when a document could not be converted by a pool worker"""
+
+
+class ConversionTimeout(ConversionError):
+    """Raised when a worker exceeded the per-file conversion timeout"""
+
+
+class WorkerStartupTimeout(ConversionTimeout):
+    """Raised when a worker did not build its converter in time"""
+
+
+# Seconds a new worker may take to import and build its converter
+WORKER_STARTUP_TIMEOUT = 60.0
+
+
+def create_markitdown() -> Any:
+    """Default converter factory used by pool workers"""
+    from markitdown import MarkItDown
+
+    return MarkItDown()
+
+
+def _worker_main(conn: "Connection", converter_factory: Callable[[], Any]) -> None:
+    """Worker loop: build the converter once, then convert paths until told to stop"""
+    try:
+        converter = converter_factory()
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+        return
+    # Start-up time must not count against the per-file timeout
+    conn.send(("ready", None))
+    while True:
+        try:
+            path = conn.recv()
+        except (EOFError, OSError):
+            break
+        if path is None:
+            break
+        try:
+            result = converter.convert(path)
+            conn.send(("ok", result.text_content))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class _Worker:
+    """A single conversion process and the pipe used to talk to it"""
+
+    def __init__(
+        self,
+        ctx: Any,
+        converter_factory: Callable[[], Any],
+        startup_timeout: Optional[float] = None,
+    ):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main, args=(child_conn, converter_factory), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        try:
+            if not self.conn.poll(startup_timeout):
+                self.kill()
+                raise WorkerStartupTimeout(
+                    f"Conversion worker did not start within {startup_timeout}s"
+                )
+            status, payload = self.conn.recv()
+        except (EOFError, OSError) as e:
+            self.kill()
+            raise ConversionError(f"Conversion worker failed to start: {e}")
+        if status != "ready":
+            self.kill()
+            raise ConversionError(f"Conversion worker failed to start: {payload}")
+
+    def kill(self) -> None:
+        """Kill the process immediately (used for stuck or broken workers)"""
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Ask the process to exit, killing it if it does not comply"""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class MarkItDownPool:
+    """Bounded pool of MarkItDown worker processes with per-file timeouts.
+
+    Each worker builds its converter once and then serves conversion jobs one at a
+    time. ``convert`` is safe to call from several threads; callers block until a
+    worker is free. A worker that exceeds ``timeout`` (or dies) is killed and
+    replaced by a fresh process on next use.
+
+    If a worker does not start within ``startup_timeout`` (e.g. where spawning
+    processes hangs), that and every later ``convert`` call raise
+    ``WorkerStartupTimeout`` without spawning again: documents are never
+    converted outside a worker, where nothing could stop a hung conversion.
+    A single warning on stderr says that conversion is disabled.
+
+    Args:
+        processes: Maximum number of worker processes
+        timeout: Per-file timeout in seconds, ``None`` to wait indefinitely
+        converter_factory: Picklable callable building the converter in each worker
+        startup_timeout: Seconds to wait for a new worker, ``None`` to wait
+            indefinitely
+    """
+
+    def __init__(
+        self,
+        processes: int,
+        timeout: Optional[float] = None,
+        converter_factory: Callable[[], Any] = create_markitdown,
+        startup_timeout: Optional[float] = WORKER_STARTUP_TIMEOUT,
+    ):
+        self.processes = max(1, processes)
+        self.timeout = timeout
+        self.converter_factory = converter_factory
+        self.startup_timeout = startup_timeout
+        # Set once a worker failed to start in time
+        self._startup_error: Optional[str] = None
+        import multiprocessing
+
+        self._ctx = multiprocessing.get_context("spawn")
+        # Slots are None until a worker is actually needed
+        self._idle: "queue.Queue[Optional[_Worker]]" = queue.Queue()
+        self._workers: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        for _ in range(self.processes):
+            self._idle.put(None)
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self._ctx, self.converter_factory, self.startup_timeout)
+        with self._lock:
+            self._workers.append(worker)
+        return worker
+
+    def _discard(self, worker: _Worker) -> None:
+        worker.kill()
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+
+    def _disable(self, reason: str) -> None:
+        """Stop converting after a startup timeout, warning only the first time"""
+        with self._lock:
+            if self._startup_error is not None:
+                return
+            self._startup_error = reason
+        print(
+            f"Warning: {reason}. MarkItDown conversion is disabled for the rest "
+            "of the run; documents it would convert are skipped.",
+            file=sys.stderr,
+        )
+
+    def convert(self, path: str) -> str:
+        """Convert a document in a worker process and return its Markdown text"""
+        if self._closed:
+            raise ConversionError("Conversion pool is closed")
+        if self._startup_error is not None:
+            raise WorkerStartupTimeout(self._startup_error)
+
+        worker = self._idle.get()
+        try:
+            if worker is None or not worker.process.is_alive():
+                if worker is not None:
+                    self._discard(worker)
+                    worker = None
+                if self._startup_error is not None:
+                    raise WorkerStartupTimeout(self._startup_error)
+                try:
+                    worker = self._spawn()
+                except WorkerStartupTimeout as e:
+                    self._disable(str(e))
+                    raise
+            active = worker
+
+            try:
+                active.conn.send(path)
+                if not active.conn.poll(self.timeout):
+                    worker = None
+                    self._discard(active)
+                    raise ConversionTimeout(
+                        f"Conversion of {path} timed out after {self.timeout}s"
+                    )
+                status, payload = active.conn.recv()
+            except (EOFError, OSError) as e:
+                worker = None
+                self._discard(active)
+                raise ConversionError(f"Conversion worker died on {path}: {e}")
+
+            if status != "ok":
+                raise ConversionError(payload)
+            return payload
+        finally:
+            self._idle.put(worker)
+
+    def close(self) -> None:
+        """Stop all worker processes"""
+        self._closed = True
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.stop()
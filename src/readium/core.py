@@ -1,15 +1,44 @@
+import contextlib
+import copy
+import functools
 import os
+import shutil
 import subprocess
+import sys
 import tempfile
+import threading
+import time
 import urllib.parse
 import uuid
+from concurrent.futures import Executor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple, Union
-
-import pathspec
-from markitdown import FileConversionException, MarkItDown, UnsupportedFormatException
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Collection,
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
+from .budget import TokenBudget
+from .cache import (
+    ConversionCache,
+    HttpCache,
+    TokenCountCache,
+    TokenIndex,
+    converter_identity,
+    default_cache_dir,
+    hash_file,
+)
+from .clone import RepoCache, fetch_commit, partial_checkout
 from .config import (
     DEFAULT_EXCLUDE_DIRS,
     DEFAULT_EXCLUDE_FILES,
@@ -17,12 +46,35 @@ from .config import (
     MARKITDOWN_EXTENSIONS,
     ReadConfig,
 )
+from .conversion import ConversionTimeout, MarkItDownPool
+from .estimate import DEFAULT_SAMPLE_SIZE, TokenEstimate, estimate_token_counts
+from .filters import EXCLUDED_DIR, TOO_LARGE, UNSUPPORTED_EXTENSION, FileFilter
+from .gitobjects import BlobEntry, GitTree, is_git_repository
+from .incremental import RunManifest
+from .records import FILE, GIT, WEB, FileRecord
+from .stats import BINARY, CONVERSION_TIMEOUT, READ_ERROR, TOKEN_BUDGET, RunStats
+from .tokens import count_tokens, count_tokens_batch
+from .tokentree import TokenTree, build_token_tree, render_markdown
+from .utils.concurrency import ordered_map
+from .walker import WalkEntry, find_git_root, list_git_files, walk_files, walk_git_files
+
+if TYPE_CHECKING:
+    import pathspec
 
-__all__ = ["ReadConfig", "Readium"]
+    from .batch import BatchReport, BatchSource
+    from .crawl import Crawler, WebClient
+
+__all__ = ["ReadConfig", "Readium", "format_file_block"]
+
+# Stand-in for a stage timer when profiling is off
+_NO_STAGE = contextlib.nullcontext()
 
 
 def is_git_url(url: str) -> bool:
     """Check if the given string is a git URL"""
+    if url.startswith("file://"):
+        # Local repositories, e.g. a bare mirror
+        return url.rstrip("/").endswith(".git")
     if not url.startswith(("http://", "https://")):
         return False
 
@@ -78,47 +130,13 @@ def convert_url_to_markdown(
     try:
         # Attempt to import trafilatura here to handle import errors
         import trafilatura
-        from trafilatura.settings import use_config
-
-        # Configure trafilatura for Markdown output
-        trafilatura_config = use_config()
-        trafilatura_config.set("DEFAULT", "output_format", "markdown")
-
-        # Adjust extraction settings based on URL mode
-        if config.url_mode == "full":
-            # Disable aggressive filtering
-            trafilatura_config.set("DEFAULT", "extraction_timeout", "30")
-            trafilatura_config.set("DEFAULT", "min_extracted_size", "10")
-            trafilatura_config.set(
-                "EXTRACTION",
-                "list_tags",
-                "p, blockquote, q, dl, ul, ol, h1, h2, h3, h4, h5, h6, div, section, article",
-            )
 
         # Download and extract content
         downloaded = trafilatura.fetch_url(url)
         if not downloaded:
             raise ValueError(f"Failed to download content from {url}")
 
-        # Extract metadata and content
-        metadata = trafilatura.extract_metadata(downloaded)
-        title = metadata.title if metadata and metadata.title else "Untitled"
-
-        # Extract content as Markdown
-        markdown = trafilatura.extract(
-            downloaded,
-            output_format="markdown",
-            include_tables=config.include_tables,
-            include_images=config.include_images,
-            include_links=config.include_links,
-            include_comments=config.include_comments,
-            config=trafilatura_config,
-        )
-
-        if not markdown:
-            raise ValueError(f"Failed to extract content from {url}")
-
-        return title, markdown
+        return extract_markdown(downloaded, url, config)
 
     except ImportError:
         # If trafilatura is not installed, return an error message
@@ -134,9 +152,82 @@ def convert_url_to_markdown(
         raise ValueError(f"Error converting URL to Markdown: {str(e)}")
 
 
-def clone_repository(url: str, target_dir: str, branch: Optional[str] = None) -> None:
+def extract_markdown(
+    downloaded: Union[str, bytes], url: str, config: ReadConfig
+) -> Tuple[str, str]:
+    """
+    Extract the title and Markdown content of a downloaded web page
+
+    Parameters
+    ----------
+    downloaded : Union[str, bytes]
+        HTML of the page.
+    url : str
+        URL the page was downloaded from, for error messages.
+    config : ReadConfig
+        Configuration for processing.
+
+    Returns
+    -------
+    Tuple[str, str]:
+        Extracted title, content in Markdown format.
+    """
+    import trafilatura
+    from trafilatura.settings import use_config
+
+    # Configure trafilatura for Markdown output
+    trafilatura_config = use_config()
+    trafilatura_config.set("DEFAULT", "output_format", "markdown")
+
+    # Adjust extraction settings based on URL mode
+    if config.url_mode == "full":
+        # Disable aggressive filtering
+        trafilatura_config.set("DEFAULT", "extraction_timeout", "30")
+        trafilatura_config.set("DEFAULT", "min_extracted_size", "10")
+        trafilatura_config.set(
+            "EXTRACTION",
+            "list_tags",
+            "p, blockquote, q, dl, ul, ol, h1, h2, h3, h4, h5, h6, div, section, article",
+        )
+
+    # Extract metadata and content
+    metadata = trafilatura.extract_metadata(downloaded)
+    title = metadata.title if metadata and metadata.title else "Untitled"
+
+    # Extract content as Markdown
+    markdown = trafilatura.extract(
+        downloaded,
+        output_format="markdown",
+        include_tables=config.include_tables,
+        include_images=config.include_images,
+        include_links=config.include_links,
+        include_comments=config.include_comments,
+        config=trafilatura_config,
+    )
+
+    if not markdown:
+        raise ValueError(f"Failed to extract content from {url}")
+
+    return title, markdown
+
+
+def clone_repository(
+    url: str,
+    target_dir: str,
+    branch: Optional[str] = None,
+    sparse_dir: Optional[str] = None,
+    exclude_dirs: Collection[str] = (),
+    max_blob_size: Optional[int] = None,
+) -> None:
     """Clone a git repository to the target directory
 
+    Without the optional arguments this is a plain shallow clone. Given any of
+    them, the clone is partial: blobs larger than ``max_blob_size`` are not
+    downloaded, and only ``sparse_dir`` minus the ``exclude_dirs`` directories
+    is checked out (see ``clone.partial_checkout``), so only blobs that can be
+    read are fetched and written. Servers without partial clone support send
+    every blob, and the checkout is still restricted.
+
     Parameters
     ----------
     url : str
@@ -145,10 +236,22 @@ def clone_repository(url: str, target_dir: str, branch: Optional[str] = None) ->
         Target directory for cloning
     branch : Optional[str]
         Specific branch to clone (default: None, uses default branch)
+    sparse_dir : Optional[str]
+        Only check out this directory of the repository (default: None, all)
+    exclude_dirs : Collection[str]
+        Directory names not to check out wherever they appear
+    max_blob_size : Optional[int]
+        Do not download files larger than this many bytes (default: None)
     """
+    partial = bool(sparse_dir or exclude_dirs or max_blob_size is not None)
     try:
         # Base command
         cmd = ["git", "clone", "--depth=1"]
+        if partial:
+            cmd.append("--no-checkout")
+            if max_blob_size is not None:
+                # The filter omits blobs of at least ``limit`` bytes
+                cmd.append(f"--filter=blob:limit={max_blob_size + 1}")
 
         # Add branch specification if provided
         if branch:
@@ -180,6 +283,9 @@ def clone_repository(url: str, target_dir: str, branch: Optional[str] = None) ->
             cmd.extend([url, target_dir])
             subprocess.run(cmd, check=True, capture_output=True)
 
+        if partial:
+            partial_checkout(target_dir, sparse_dir, exclude_dirs)
+
     except subprocess.CalledProcessError as e:
         error_msg = e.stderr.decode()
         # Hide the token in the error message if present
@@ -190,24 +296,167 @@ def clone_repository(url: str, target_dir: str, branch: Optional[str] = None) ->
         raise ValueError(f"Failed to clone repository: {error_msg}")
 
 
+# Bytes inspected to decide whether a file is binary
+BINARY_SNIFF_SIZE = 1024
+
+_TEXT_CHARS = bytes([7, 8, 9, 10, 12, 13, 27] + list(range(0x20, 0x100)))
+
+
+def _looks_binary(chunk: bytes) -> bool:
+    """Return True if a chunk of file data contains non-text control bytes"""
+    return bool(chunk.translate(None, _TEXT_CHARS))
+
+
+def _decode_text(data: bytes) -> str:
+    """Decode file bytes the way ``open(..., encoding="utf-8", errors="ignore")``
+    reads them, including universal newline translation"""
+    text = data.decode("utf-8", errors="ignore")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def _is_conversion_rejection(error: Exception) -> bool:
+    """Whether MarkItDown rejected a file as unsupported or unconvertible.
+
+    markitdown is only imported once a conversion ran in this process, so its
+    exception types are looked up instead of imported.
+    """
+    markitdown = sys.modules.get("markitdown")
+    return markitdown is not None and isinstance(
+        error,
+        (markitdown.FileConversionException, markitdown.UnsupportedFormatException),
+    )
+
+
+def format_file_block(record: FileRecord) -> str:
+    """Format one processed file as it appears in the combined content"""
+    return (
+        f"================================================\n"
+        f"File: {record.path}\n"
+        f"================================================\n"
+        f"{record.content}"
+    )
+
+
 class Readium:
     """Main class for reading documentation"""
 
     def __init__(self, config: Optional[ReadConfig] = None):
         self.config = config or ReadConfig()
-        self.markitdown = MarkItDown() if self.config.use_markitdown else None
+        self.markitdown: Optional[Any] = None
         self.branch: Optional[str] = None
         self.split_output_dir: Optional[str] = None
+        self.file_filter = FileFilter(self.config)
+        self.git_listed = False  # Whether iter_candidates used the git index
+        self.conversion_pool: Optional[MarkItDownPool] = None
+        if self.config.use_markitdown and (
+            self.config.markitdown_processes > 0
+            or self.config.markitdown_timeout is not None
+        ):
+            # Timeouts can only be enforced on an isolated worker process
+            self.conversion_pool = MarkItDownPool(
+                max(1, self.config.markitdown_processes),
+                timeout=self.config.markitdown_timeout,
+            )
+        elif self.config.use_markitdown:
+            # MarkItDown pulls in a large dependency tree; import it only when used
+            from markitdown import MarkItDown
+
+            self.markitdown = MarkItDown()
+        # MarkItDown is not known to be thread-safe (its converters keep sessions
+        # and parser state), so in-process conversions run one at a time;
+        # markitdown_processes converts in parallel
+        self.markitdown_lock = threading.Lock()
+        self.timed_out_files: List[str] = []
+        self.manifest: Optional[RunManifest] = None
+        self.stats: Optional[RunStats] = None
+        self.token_budget: Optional[TokenBudget] = None
+        self.token_estimate: Optional[TokenEstimate] = None
+        self.token_tree: Optional[TokenTree] = None  # Counts of the last run
+        self.files_processed = 0  # Files in the output of the last run
+        self.git_tree: Optional[GitTree] = None  # Set while reading git objects
+        self.crawler: Optional["Crawler"] = None  # Last crawl, with its counters
+        # Pools shared by the readers of a batch (see ``batch.run_batch``)
+        self.executor: Optional[Executor] = None  # File processing
+        self.fetch_slots: Optional[threading.Semaphore] = None  # Clones, downloads
+        self.conversion_cache: Optional[ConversionCache] = None
+        self.token_cache: Optional[TokenCountCache] = None
+        self.repo_cache: Optional[RepoCache] = None
+        self.http_cache: Optional[HttpCache] = None
+        if self.config.use_cache:
+            cache_root = self.config.cache_dir or default_cache_dir()
+            self.token_cache = TokenCountCache(
+                cache_root, max_size=self.config.cache_max_size
+            )
+            if self.config.repo_cache:
+                self.repo_cache = RepoCache(
+                    cache_root, max_size=self.config.repo_cache_max_size
+                )
+            if self.config.use_markitdown:
+                self.conversion_cache = ConversionCache(
+                    cache_root, max_size=self.config.cache_max_size
+                )
+            if (
+                self.config.http_cache
+                or self.config.http_cache_ttl is not None
+                or self.config.offline
+            ):
+                self.http_cache = HttpCache(
+                    cache_root, max_size=self.config.cache_max_size
+                )
+
+    def spawn(self) -> "Readium":
+        """A reader for another run that shares this one's expensive parts.
+
+        The configuration, MarkItDown converter or worker processes, caches
+        and shared pools are reused; per-run state starts out empty, so the
+        new reader can run concurrently with this one. Only the original
+        reader needs to be closed.
+        """
+        reader = copy.copy(self)
+        reader.file_filter = FileFilter(self.config)
+        reader.branch = None
+        reader.timed_out_files = []
+        reader.manifest = None
+        reader.stats = None
+        reader.token_budget = None
+        reader.token_estimate = None
+        reader.token_tree = None
+        reader.files_processed = 0
+        reader.git_tree = None
+        reader.crawler = None
+        return reader
+
+    def close(self) -> None:
+        """Release worker processes held by this reader"""
+        if self.conversion_pool is not None:
+            self.conversion_pool.close()
+            self.conversion_pool = None
 
     def log_debug(self, msg: str) -> None:
         """Print debug messages if debug mode is enabled"""
         if self.config.debug:
             print(f"DEBUG: {msg}")
 
-    def load_gitignore_patterns(self, root_path: Path) -> Optional[pathspec.PathSpec]:
+    def _fetch_slot(self) -> ContextManager[Any]:
+        """Hold one of the shared network slots, if any, around a fetch"""
+        if self.fetch_slots is None:
+            return _NO_STAGE
+        return self.fetch_slots
+
+    def _stage(self, name: str) -> ContextManager[None]:
+        """Time a block as pipeline stage ``name`` when profiling"""
+        if self.stats is None:
+            return _NO_STAGE
+        return self.stats.stage(name)
+
+    def load_gitignore_patterns(self, root_path: Path) -> Optional["pathspec.PathSpec"]:
         """Load .gitignore patterns from the given directory"""
         gitignore_path = root_path / ".gitignore"
         if gitignore_path.exists():
+            import pathspec
+
             try:
                 with open(gitignore_path, "r", encoding="utf-8") as f:
                     spec = pathspec.PathSpec.from_lines("gitwildmatch", f)
@@ -221,165 +470,227 @@ class Readium:
         """Check if a file is binary"""
         try:
             with open(file_path, "rb") as file:
-                chunk = file.read(1024)
-                return bool(
-                    chunk.translate(
-                        None,
-                        bytes([7, 8, 9, 10, 12, 13, 27] + list(range(0x20, 0x100))),
-                    )
-                )
+                return _looks_binary(file.read(BINARY_SNIFF_SIZE))
         except Exception:
             return True
 
     def should_process_file(self, file_path: Union[str, Path]) -> bool:
         """Determine if a file should be processed based on configuration"""
         path = Path(file_path)
-        file_ext = os.path.splitext(str(path))[1].lower()
-
-        self.log_debug(f"Checking file: {path}")
-
-        # First check if the file is in an excluded directory
-        parts = path.parts
-        for excluded_dir in self.config.exclude_dirs:
-            if excluded_dir in parts:
-                self.log_debug(
-                    f"Excluding {path} due to being in excluded directory {excluded_dir}"
-                )
-                return False
-
-        # Check exclude patterns - handle macOS @ suffix
-        base_name = path.name.rstrip("@")
-        if any(pattern in base_name for pattern in self.config.exclude_files):
-            self.log_debug(f"Excluding {path} due to exclude patterns")
-            return False
-
-        # NEW: Check if the file extension is in the excluded extensions (case-insensitive)
-        if file_ext in {ext.lower() for ext in self.config.exclude_extensions}:
-            self.log_debug(f"Excluding {path} due to excluded extension {file_ext}")
-            return False
 
-        # Check size
+        file_size: Optional[int] = None
         if self.config.max_file_size >= 0:
             try:
                 file_size = path.stat().st_size
-                if file_size > self.config.max_file_size:
-                    self.log_debug(
-                        f"Excluding {path} due to size: {file_size} > {self.config.max_file_size}"
-                    )
-                    return False
             except FileNotFoundError:
                 return False
 
-        should_use_markitdown = (
-            self.config.use_markitdown
-            and self.config.markitdown_extensions is not None
-            and file_ext in self.config.markitdown_extensions
-        )
-
-        if should_use_markitdown:
-            self.log_debug(f"Including {path} for markitdown processing")
-            return True
-
-        # If not using markitdown or file isn't compatible with markitdown,
-        # check if it's in the included extensions
-        if file_ext not in self.config.include_extensions:
-            self.log_debug(f"Extension {file_ext} not in supported extensions")
+        mode = self._select_file(path, file_size)
+        if mode is None:
             return False
 
         # Check if binary only for non-markitdown files
-        if not should_use_markitdown:
-            is_bin = self.is_binary(path)
-            if is_bin:
-                self.log_debug(f"Excluding {path} because it's binary")
-                return False
+        if mode == "text" and self.is_binary(path):
+            self.log_debug(f"Excluding {path} because it's binary")
+            return False
 
         self.log_debug(f"Including {path} for processing")
         return True
 
+    def _select_file(
+        self,
+        path: Union[str, Path],
+        file_size: Optional[int],
+        check_dirs: bool = True,
+    ) -> Optional[str]:
+        """Apply every filter that needs no file content.
+
+        Returns ``"markitdown"`` or ``"text"`` for the way the file will be read,
+        or None if it is excluded. ``file_size`` is the already known size of the
+        file (None skips the size check); binary detection is left to the caller.
+        ``check_dirs=False`` skips the excluded-directory check for paths coming
+        from a walk that already pruned those directories.
+        """
+        path_str = os.fspath(path)
+        mode, reason = self.file_filter.select(path_str, file_size, check_dirs)
+        if reason is not None and self.stats is not None:
+            self.stats.skip(reason, path_str)
+
+        if self.config.debug:
+            self.log_debug(f"Checking file: {path}")
+            if reason is None:
+                if mode == "markitdown":
+                    self.log_debug(f"Including {path} for markitdown processing")
+            elif reason == EXCLUDED_DIR:
+                excluded_dir = self.file_filter.excluded_dir(path_str)
+                self.log_debug(
+                    f"Excluding {path} due to being in excluded directory {excluded_dir}"
+                )
+            elif reason == UNSUPPORTED_EXTENSION:
+                file_ext = os.path.splitext(path_str)[1].lower()
+                self.log_debug(f"Extension {file_ext} not in supported extensions")
+            elif reason == TOO_LARGE:
+                self.log_debug(
+                    f"Excluding {path} due to size: {file_size} > {self.config.max_file_size}"
+                )
+            else:
+                self.log_debug(f"Excluding {path} due to {reason.replace('_', ' ')}")
+
+        return mode
+
     def estimate_tokens(self, text: str) -> int:
         """
         Estimate the number of tokens in a text string using tiktoken.
         """
-        import tiktoken
+        return count_tokens(text)
 
-        encoding = tiktoken.get_encoding("cl100k_base")
-        return len(encoding.encode(text))
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        """
+        Count tokens for many texts at once with tiktoken's threaded batch API.
+        """
+        return count_tokens_batch(texts, num_threads=self.worker_count())
 
     def generate_token_tree(
-        self, files: list[dict[str, str]], base_path: Path, rich_only: bool = False
+        self,
+        files: List[FileRecord],
+        base_path: Path,
+        rich_only: bool = False,
+        source: Optional[str] = None,
     ) -> str:
         """
-        Generate a token tree table grouped by directory.
-        If rich_only=True, only prints the Rich table and does not return markdown.
+        Count tokens of ``files`` and build the token tree grouped by directory.
+
+        The counts are stored in each record's ``tokens`` (records already
+        counted, e.g. for a token budget, are not counted again) and the
+        aggregated tree in ``self.token_tree``. Returns its markdown table, or an empty
+        string with ``rich_only`` for callers that render ``self.token_tree``
+        themselves (see the ``tokentree`` renderers). ``source`` is the git or
+        web URL the files were read from, if any.
         """
-        import os
-        from collections import defaultdict
-
-        from rich.console import Console
-        from rich.table import Table
-
-        console = Console()
-        dir_files: dict[str, list[dict[str, str]]] = defaultdict(list)
-        dir_totals: dict[str, int] = defaultdict(int)
-        total_tokens = 0
-        console.print("[yellow]Calculating tokens for files...[/yellow]")
-        for idx, file_info in enumerate(files):
-            path = file_info["path"]
-            content = file_info["content"]
-            tokens = self.estimate_tokens(content)
-            dir_path = os.path.dirname(path)
-            if not dir_path:
-                dir_path = "."
-            dir_files[dir_path].append(
-                {
-                    "filename": os.path.basename(path),
-                    "path": path,
-                    "tokens": str(tokens),
-                }
-            )
-            dir_totals[dir_path] += tokens
-            total_tokens += tokens
-            if idx % 10 == 0:
-                console.print(f"Processed {idx+1}/{len(files)} files...", end="\r")
-        console.print(f"Processed {len(files)} files.")
-        table = Table(title="Directory Token Tree")
-        table.add_column("Directory", style="cyan")
-        table.add_column("Files", style="green")
-        table.add_column("Token Count", style="yellow", justify="right")
-        for dir_path in sorted(dir_files.keys()):
-            files_in_dir = dir_files[dir_path]
-            dir_token_count = dir_totals[dir_path]
-            table.add_row(
-                f"[bold]{dir_path}[/bold]",
-                str(len(files_in_dir)),
-                f"{dir_token_count:,}",
-            )
-            for file_info in sorted(files_in_dir, key=lambda x: x["filename"]):
-                filename = file_info["filename"]
-                file_tokens = file_info["tokens"]
-                table.add_row(f"└─ {filename}", "", file_tokens)
-        console.print(table)
-        console.print(f"[bold]Total Files:[/bold] {len(files)}")
-        console.print(f"[bold]Total Tokens:[/bold] {total_tokens:,}")
-        if rich_only:
-            return ""
-        # Markdown table generation (only if rich_only is False)
-        md_table = "# Directory Token Tree\n\n"
-        md_table += "| Directory | Files | Token Count |\n"
-        md_table += "|-----------|-------|------------|\n"
-        for dir_path in sorted(dir_files.keys()):
-            files_in_dir = dir_files[dir_path]
-            dir_token_count = dir_totals[dir_path]
-            md_table += (
-                f"| **{dir_path}** | {len(files_in_dir)} | {dir_token_count:,} |\n"
+        uncounted = [f for f in files if f.tokens is None]
+        self.log_debug(f"Calculating tokens for {len(uncounted)} files")
+        with self._stage("tokenize"):
+            if not uncounted:
+                token_counts: List[int] = []
+            elif self.token_cache is not None:
+                token_counts = self.token_cache.count(
+                    self._token_tree_id(base_path, source),
+                    uncounted,
+                    self.count_tokens,
+                )
+                self.log_debug(
+                    f"Token cache: {self.token_cache.hits} hits, "
+                    f"{self.token_cache.misses} misses"
+                )
+            else:
+                token_counts = self.count_tokens([f.content for f in uncounted])
+        for record, tokens in zip(uncounted, token_counts):
+            record.tokens = tokens
+        with self._stage("render"):
+            return self._render_token_tree(
+                [(f.path, f.tokens or 0) for f in files], rich_only=rich_only
             )
-            for file_info in sorted(files_in_dir, key=lambda x: x["filename"]):
-                filename = file_info["filename"]
-                file_tokens = file_info["tokens"]
-                md_table += f"| └─ {filename} | | {file_tokens} |\n"
-        md_table += f"\n**Total Files:** {len(files)}  \n"
-        md_table += f"**Total Tokens:** {total_tokens:,}\n"
-        return md_table
+
+    def _token_tree_id(self, path: Path, source: Optional[str]) -> str:
+        """Key of a tree's token count index (see ``TokenCountCache``)
+
+        Git URLs are read from a new temporary directory on every run, so
+        their index is keyed by the URL and revision rather than the path.
+        """
+        if source is None:
+            return os.path.abspath(path)
+        return "\0".join((source, self.branch or "", self.config.target_dir or ""))
+
+    def _render_token_tree(
+        self,
+        path_tokens: List[Tuple[str, int]],
+        rich_only: bool = False,
+        estimate: Optional[TokenEstimate] = None,
+    ) -> str:
+        """
+        Aggregate already counted (path, tokens) pairs into ``self.token_tree``
+        and return its markdown table (empty with ``rich_only``).
+        With an ``estimate`` the counts are marked as estimated and the total
+        is reported with its confidence interval.
+        """
+        tree = build_token_tree(path_tokens, estimate)
+        self.token_tree = tree
+        return "" if rich_only else render_markdown(tree)
+
+    def estimate_token_tree(
+        self,
+        path: Union[str, Path],
+        branch: Optional[str] = None,
+        sample_size: int = DEFAULT_SAMPLE_SIZE,
+        rich_only: bool = False,
+    ) -> str:
+        """
+        Estimate the token tree of a directory without reading every file
+
+        Candidate files are selected as in ``read_docs``; a sample stratified
+        by extension is processed and tokenized exactly, and the other files
+        are estimated from their sizes (see ``estimate.TokenEstimate``). The
+        result is also kept in ``self.token_estimate`` and ``self.token_tree``.
+
+        Parameters
+        ----------
+        path : Union[str, Path]
+            Local path or git URL
+        branch : Optional[str]
+            Specific branch to clone for git repositories (default: None)
+        sample_size : int
+            Number of files to tokenize exactly (default: 400)
+        rich_only : bool
+            Only build ``self.token_tree`` and return an empty string
+
+        Returns
+        -------
+        str:
+            Markdown token tree with estimated counts
+        """
+        if isinstance(path, str) and is_url(path) and not is_git_url(path):
+            raise ValueError("Token estimation needs a directory or git repository")
+        self.branch = branch
+        self.timed_out_files = []
+        self.manifest = None
+        self.token_budget = None
+        with self._local_source(path, branch) as (local_path, _):
+            root = self.resolve_target(local_path)
+            selected: List[Tuple[WalkEntry, str]] = []
+            for entry in self.iter_candidates(root):
+                mode = self._select_file(entry.path, entry.size, check_dirs=False)
+                if mode is not None:
+                    selected.append((entry, mode))
+            sizes = [
+                (
+                    entry.rel_path,
+                    (
+                        entry.size
+                        if entry.size is not None
+                        else os.path.getsize(entry.path)
+                    ),
+                )
+                for entry, _ in selected
+            ]
+
+            def count(index: int) -> Tuple[int, Optional[int]]:
+                entry, mode = selected[index]
+                result = self._load_selected(entry, mode)
+                if result is None:
+                    return index, None
+                return index, count_tokens(result.content)
+
+            def count_sample(indexes: List[int]) -> Dict[int, Optional[int]]:
+                return dict(
+                    ordered_map(count, indexes, self.worker_count(), self.executor)
+                )
+
+            estimate = estimate_token_counts(sizes, count_sample, sample_size)
+        self.token_estimate = estimate
+        self.log_debug(f"Token estimate: {estimate.describe()}")
+        return self._render_token_tree(
+            estimate.files, rich_only=rich_only, estimate=estimate
+        )
 
     def read_docs(
         self, path: Union[str, Path], branch: Optional[str] = None
@@ -401,37 +712,39 @@ class Readium:
         """
         self.branch = branch
 
-        # If it's a git URL, clone first
+        # If it's a git URL, fetch it first
         if isinstance(path, str) and is_git_url(path):
-            with tempfile.TemporaryDirectory() as temp_dir:
+            with self._local_source(path, branch) as (local_path, _):
                 try:
-                    clone_repository(path, temp_dir, branch)
-                    return self._process_directory(Path(temp_dir), original_path=path)
+                    return self._process_directory(local_path, original_path=path)
                 except Exception as e:
                     raise ValueError(f"Error processing git repository: {str(e)}")
+        # Crawl a documentation site from the URL
+        elif isinstance(path, str) and is_url(path) and self.config.crawl:
+            try:
+                netloc = Path(urllib.parse.urlparse(path).netloc)
+                return self._process_files(self._crawl(path), netloc, path)
+            except Exception as e:
+                raise ValueError(f"Error processing URL: {str(e)}")
         # If it's a regular URL, process it
         elif isinstance(path, str) and is_url(path):
             try:
                 self.log_debug(f"URL detected: {path}")
 
                 # Extract title and Markdown content
-                title, markdown_content = convert_url_to_markdown(path, self.config)
+                title, markdown_content = self._convert_url(path)
 
                 # Generate file name from the URL
-                file_name = (
-                    os.path.basename(urllib.parse.urlparse(path).path) or "index.md"
-                )
-                if not file_name.endswith(".md"):
-                    file_name += ".md"
+                file_name = self._url_file_name(path)
 
                 # Generate result
                 file_info = [
-                    {"path": file_name, "content": markdown_content, "title": title}
+                    FileRecord(file_name, markdown_content, kind=WEB, title=title)
                 ]
 
                 # Always generate the token tree
                 token_tree = self.generate_token_tree(
-                    file_info, Path(urllib.parse.urlparse(path).netloc)
+                    file_info, Path(urllib.parse.urlparse(path).netloc), source=path
                 )
 
                 # Write split files if output directory is specified
@@ -466,30 +779,319 @@ class Readium:
                 if token_tree:
                     summary += f"Token Tree generated for URL content\n"
 
+                self.files_processed = 1
                 return summary, tree, content
 
             except Exception as e:
                 raise ValueError(f"Error processing URL: {str(e)}")
+        else:
+            with self._local_source(path, branch) as (local_path, _):
+                return self._process_directory(local_path)
+
+    def iter_docs(
+        self, path: Union[str, Path], branch: Optional[str] = None
+    ) -> Iterator[FileRecord]:
+        """
+        Yield processed files one at a time as they are read
+
+        Unlike ``read_docs`` nothing is accumulated, so memory use stays bounded
+        by the files currently being processed rather than the whole tree.
+
+        Parameters
+        ----------
+        path : Union[str, Path]
+            Local path, git URL, or web URL
+        branch : Optional[str]
+            Specific branch to clone for git repositories (default: None)
+
+        Yields
+        ------
+        FileRecord:
+            Processed files; records also read like dicts with ``path`` and
+            ``content`` keys (plus ``title`` for URLs)
+        """
+        self.branch = branch
+        if isinstance(path, str) and is_url(path) and self.config.crawl:
+            yield from self._crawl(path)
+            return
+        if isinstance(path, str) and is_url(path):
+            title, markdown_content = self._convert_url(path)
+            yield FileRecord(
+                self._url_file_name(path), markdown_content, kind=WEB, title=title
+            )
+            return
+
+        with self._local_source(path, branch) as (local_path, _):
+            yield from self._iter_directory(self.resolve_target(local_path))
+
+    def write_docs(
+        self,
+        path: Union[str, Path],
+        output: Union[str, Path],
+        branch: Optional[str] = None,
+    ) -> Tuple[str, str]:
+        """
+        Read documentation and stream the combined result into ``output``
+
+        File blocks are written to disk as soon as they are produced; the summary
+        and tree are prepended once all files are known. The output file has the
+        same layout as the CLI output built from ``read_docs``.
+
+        Parameters
+        ----------
+        path : Union[str, Path]
+            Local path, git URL, or web URL
+        output : Union[str, Path]
+            Output file path
+        branch : Optional[str]
+            Specific branch to clone for git repositories (default: None)
+
+        Returns
+        -------
+        Tuple[str, str]:
+            summary, tree structure
+        """
+        self.branch = branch
+        if isinstance(path, str) and is_url(path) and self.config.crawl:
+            netloc = Path(urllib.parse.urlparse(path).netloc)
+            return self._write_files(self._crawl(path), netloc, output, path)
+        if isinstance(path, str) and is_url(path):
+            summary, tree, content = self.read_docs(path, branch=branch)
+            with open(output, "w", encoding="utf-8") as f:
+                f.write(f"Summary:\n{summary}\n\n")
+                f.write(f"Tree:\n{tree}\n\n")
+                f.write(f"Content:\n{content}")
+            return summary, tree
+
+        with self._local_source(path, branch) as (local_path, original_path):
+            return self._write_directory(local_path, output, original_path)
+
+    def write_batch(
+        self,
+        sources: Sequence[Union[str, "BatchSource"]],
+        output_dir: Union[str, Path],
+        jobs: Optional[int] = None,
+        fetch_jobs: Optional[int] = None,
+    ) -> "BatchReport":
+        """
+        Process many sources concurrently, each into its own output file
+
+        Sources are local paths, git URLs and web URLs, optionally paired with
+        a branch. They share this reader's MarkItDown converter and caches,
+        one file processing pool and a bounded number of concurrent clones,
+        fetches and downloads (see ``batch.run_batch``).
+
+        Parameters
+        ----------
+        sources : Sequence[Union[str, Tuple[str, Optional[str]]]]
+            Sources, or ``(source, branch)`` pairs
+        output_dir : Union[str, Path]
+            Directory receiving one output file per source plus the summary
+        jobs : Optional[int]
+            Sources processed at once (default: 4)
+        fetch_jobs : Optional[int]
+            Clones, fetches and downloads running at once (default: 4)
+
+        Returns
+        -------
+        BatchReport:
+            Result of every source, in input order
+        """
+        from .batch import DEFAULT_BATCH_JOBS, DEFAULT_FETCH_JOBS, run_batch
+
+        return run_batch(
+            self,
+            sources,
+            output_dir,
+            jobs=jobs or DEFAULT_BATCH_JOBS,
+            fetch_jobs=fetch_jobs or DEFAULT_FETCH_JOBS,
+        )
+
+    @staticmethod
+    def _url_file_name(url: str) -> str:
+        """Name of the Markdown file produced for a web URL"""
+        file_name = os.path.basename(urllib.parse.urlparse(url).path) or "index.md"
+        if not file_name.endswith(".md"):
+            file_name += ".md"
+        return file_name
+
+    def _web_client(self) -> "WebClient":
+        """A client fetching web pages through the HTTP cache, if enabled"""
+        from .crawl import WebClient
+
+        if self.config.offline and self.http_cache is None:
+            raise ValueError("Offline mode needs the cache, which is disabled")
+        return WebClient(
+            self.config,
+            self.http_cache,
+            fetch_slot=self._fetch_slot,
+            log=self.log_debug,
+        )
+
+    def _convert_url(self, url: str) -> Tuple[str, str]:
+        """Title and Markdown content of a single web page"""
+        if self.http_cache is None and not self.config.offline:
+            with self._fetch_slot():
+                return convert_url_to_markdown(url, self.config)
+        client = self._web_client()
+        try:
+            title, markdown = client.read(url)
+        finally:
+            client.close()
+        self.log_debug(client.describe_cache().strip())
+        return title, markdown
+
+    def _crawl(self, url: str) -> Iterator[FileRecord]:
+        """Yield the pages of a documentation site crawled from ``url``"""
+        from .crawl import Crawler
+
+        self.timed_out_files = []
+        self.manifest = None
+        self.stats = None
+        self.token_budget = None
+        self.crawler = Crawler(
+            url, self._web_client(), workers=self.worker_count(), executor=self.executor
+        )
+        yield from self.crawler.crawl()
+
+    @contextlib.contextmanager
+    def _local_source(
+        self, path: Union[str, Path], branch: Optional[str]
+    ) -> Iterator[Tuple[Path, Optional[str]]]:
+        """Resolve a local path or git URL to a directory on disk.
+
+        With ``use_git_objects``, git URLs and local repositories given a
+        ``branch`` are read from git objects (see ``GitTree``) while the block
+        runs; the directory yielded is then the repository itself.
+        """
+        if isinstance(path, str) and is_git_url(path):
+            with tempfile.TemporaryDirectory() as temp_dir:
+                with contextlib.ExitStack() as stack:
+                    try:
+                        with self._fetch_slot():
+                            root = self._fetch_repository(stack, path, temp_dir, branch)
+                    except Exception as e:
+                        raise ValueError(f"Error processing git repository: {str(e)}")
+                    yield root, path
         else:
             path_obj = Path(path)
             if not path_obj.exists():
                 raise ValueError(f"Path does not exist: {path}")
-            return self._process_directory(path_obj)
-
-    def _process_directory(
-        self, path: Path, original_path: Optional[str] = None
-    ) -> Tuple[str, str, str]:
-        """Internal method to process a directory"""
-        files: List[Dict[str, str]] = []
-
-        # If target_dir is specified, look only in that subdirectory
+            if (
+                branch
+                and self.config.use_git_objects
+                and is_git_repository(str(path_obj))
+            ):
+                git_tree = GitTree(str(path_obj), branch)
+                if git_tree.tree_id() is None:
+                    raise ValueError(f"Unknown git revision: {branch}")
+                with contextlib.ExitStack() as stack:
+                    self._read_git_tree(stack, git_tree)
+                    yield path_obj, None
+            else:
+                yield path_obj, None
+
+    def _fetch_repository(
+        self,
+        stack: contextlib.ExitStack,
+        url: str,
+        temp_dir: str,
+        branch: Optional[str],
+    ) -> Path:
+        """Make a git URL readable for the duration of ``stack``.
+
+        With ``use_git_objects`` the commit is fetched into a bare repository
+        (the mirror, with the repository cache on) and read from git objects;
+        otherwise it is checked out into ``temp_dir``.
+
+        Returns:
+            The directory to process
+        """
+        options = self._clone_options()
+        if not self.config.use_git_objects:
+            if self.repo_cache is not None:
+                self.log_debug(f"Fetching {url} through the repository cache")
+                self.repo_cache.checkout(url, temp_dir, branch, **options)
+            else:
+                clone_repository(url, temp_dir, branch, **options)
+            return Path(temp_dir)
+
+        max_blob_size = options.get("max_blob_size")
+        if self.repo_cache is not None:
+            self.log_debug(f"Fetching {url} through the repository cache")
+            repo, commit = stack.enter_context(
+                self.repo_cache.open(url, branch, max_blob_size)
+            )
+        else:
+            subprocess.run(
+                ["git", "init", "-q", "--bare", temp_dir],
+                check=True,
+                capture_output=True,
+            )
+            repo, commit = temp_dir, fetch_commit(temp_dir, url, branch, max_blob_size)
+        self._read_git_tree(stack, GitTree(repo, commit))
+        return Path(repo)
+
+    def _read_git_tree(self, stack: contextlib.ExitStack, git_tree: GitTree) -> None:
+        """Read files from ``git_tree`` until ``stack`` exits"""
+        self.log_debug(f"Reading git objects of {git_tree.commit} in {git_tree.repo}")
+        self.git_tree = git_tree
+
+        def release() -> None:
+            git_tree.close()
+            self.git_tree = None
+
+        stack.callback(release)
+
+    def _clone_options(self) -> Dict[str, Any]:
+        """Partial clone arguments of ``clone_repository`` for this config"""
+        if not self.config.partial_clone:
+            return {}
+        return {
+            "sparse_dir": self.config.target_dir,
+            "exclude_dirs": self.config.exclude_dirs,
+            "max_blob_size": (
+                self.config.max_file_size if self.config.max_file_size >= 0 else None
+            ),
+        }
+
+    def resolve_target(self, path: Path) -> Path:
+        """Apply ``target_dir``, returning the directory that is actually read"""
         if self.config.target_dir:
             base_path = path / self.config.target_dir
-            if not base_path.exists():
+            if self.git_tree is not None:
+                exists = self.git_tree.tree_id(self.config.target_dir) is not None
+            else:
+                exists = base_path.exists()
+            if not exists:
                 raise ValueError(
                     f"Target directory not found: {self.config.target_dir}"
                 )
-            path = base_path
+            return base_path
+        return path
+
+    def iter_candidates(self, path: Path) -> Iterator[WalkEntry]:
+        """Walk ``path`` yielding the files left after directory pruning"""
+        self.file_filter = FileFilter(self.config)
+        self.git_listed = False
+        on_skip = self.stats.skip if self.stats is not None else None
+        if self.git_tree is not None:
+            return self.git_tree.walk(
+                self.config.target_dir or "",
+                exclude_dirs=self.file_filter.exclude_dirs,
+                on_skip=on_skip,
+            )
+        if self.config.use_git_index:
+            git_files = self._list_git_files(path)
+            if git_files is not None:
+                self.git_listed = True
+                return walk_git_files(
+                    str(path),
+                    git_files,
+                    exclude_dirs=self.file_filter.exclude_dirs,
+                    with_stat=self._needs_stat(),
+                    on_skip=on_skip,
+                )
 
         # Load .gitignore patterns if enabled
         gitignore_spec = None
@@ -502,46 +1104,232 @@ class Readium:
             # or the current path if original is not set/same.
             gitignore_spec = self.load_gitignore_patterns(path)
 
-        for root, dirs, filenames in os.walk(path):
-            # Calculate relative path from the root being processed
-            rel_root = Path(root).relative_to(path)
-
-            # Filter directories based on .gitignore and exclude_dirs
-            # We need to filter dirs in-place to prevent os.walk from traversing them
-            i = 0
-            while i < len(dirs):
-                d = dirs[i]
-                dir_rel_path = rel_root / d
+        # Compile the include/exclude rules once for the whole run
+        self.file_filter = FileFilter(self.config, gitignore_spec)
+        return walk_files(
+            str(path),
+            exclude_dirs=self.file_filter.exclude_dirs,
+            ignore=self.file_filter.ignored if gitignore_spec else None,
+            with_stat=self._needs_stat(),
+            log=self.log_debug if self.config.debug else None,
+            on_skip=on_skip,
+        )
 
-                # Check standard excludes
-                if d in self.config.exclude_dirs:
-                    del dirs[i]
-                    continue
+    def select_candidates(self, path: Path, rel_paths: Collection[str]) -> Set[str]:
+        """Return those of ``rel_paths`` that the last ``iter_candidates`` walk
+        of ``path`` would have reached, without walking again.
 
-                # Check .gitignore
-                if gitignore_spec and gitignore_spec.match_file(
-                    str(dir_rel_path) + "/"
+        A path is kept when it is outside excluded directories and, depending on
+        how that walk listed files, known to the git index or not matched by the
+        ``.gitignore`` rules; a directory is kept when files below it may be.
+        Paths that do not exist are judged as files.
+        """
+        kept = set()
+        for rel_path in rel_paths:
+            is_dir = os.path.isdir(os.path.join(path, rel_path))
+            dirs = rel_path if is_dir else os.path.dirname(rel_path)
+            if dirs and self.file_filter.excluded_dir(dirs) is not None:
+                continue
+            if self.file_filter.gitignore is not None and not self.git_listed:
+                parts = rel_path.split(os.sep)
+                # The walk prunes an ignored directory with everything below it
+                ignored_dirs = (
+                    os.sep.join(parts[:depth]) + "/"
+                    for depth in range(1, len(parts) + is_dir)
+                )
+                if any(map(self.file_filter.ignored, ignored_dirs)) or (
+                    not is_dir and self.file_filter.ignored(rel_path)
                 ):
-                    self.log_debug(f"Ignoring directory via .gitignore: {dir_rel_path}")
-                    del dirs[i]
                     continue
+            kept.add(rel_path)
+        if not self.git_listed or not kept:
+            return kept
+
+        listed = list_git_files(
+            str(path),
+            include_ignored=not self.config.use_gitignore,
+            paths=[rel_path.replace(os.sep, "/") for rel_path in kept],
+        )
+        if listed is None:
+            return kept
+        # Listed files and every directory above them
+        known = set()
+        for listed_path in listed:
+            parts = listed_path.split("/")
+            for depth in range(1, len(parts) + 1):
+                known.add(os.sep.join(parts[:depth]))
+        return kept & known
+
+    def _needs_stat(self) -> bool:
+        """Whether walked entries need their size and mtime"""
+        return (
+            self.config.max_file_size >= 0
+            or self.manifest is not None
+            or self.token_budget is not None
+        )
 
-                i += 1
-
-            for filename in filenames:
-                file_path = Path(root) / filename
-                relative_path = file_path.relative_to(path)
+    def _list_git_files(self, path: Path) -> Optional[List[str]]:
+        """List files through the git index when ``path`` is a git working tree.
 
-                # Check .gitignore for files
-                if gitignore_spec and gitignore_spec.match_file(str(relative_path)):
-                    self.log_debug(f"Ignoring file via .gitignore: {relative_path}")
-                    continue
+        Git applies every ``.gitignore`` (nested ones included),
+        ``.git/info/exclude`` and the global excludes file. Returns None when
+        the tree is not a git checkout or git is unavailable.
+        """
+        # With target_dir, the .git entry sits that many levels above ``path``
+        depth = len(Path(self.config.target_dir).parts) if self.config.target_dir else 0
+        git_root = find_git_root(str(path), max_up=depth)
+        if git_root is None:
+            return None
+        files = list_git_files(str(path), include_ignored=not self.config.use_gitignore)
+        if files is None:
+            self.log_debug(f"git ls-files failed in {path}, walking the directory")
+        else:
+            self.log_debug(
+                f"Listed {len(files)} files from the git index of {git_root}"
+            )
+        return files
+
+    def _iter_directory(self, path: Path) -> Iterator[FileRecord]:
+        """Yield processed files of an already resolved directory in walk order"""
+        self.timed_out_files = []
+        self.crawler = None
+        self.manifest = None
+        self.stats = RunStats() if self.config.profile else None
+        self.token_budget = None
+        if self.config.max_tokens is not None:
+            self.token_budget = TokenBudget(
+                self.config.max_tokens, self.config.priority_paths
+            )
+        if self.config.incremental_manifest:
+            self.manifest = RunManifest(
+                self.config.incremental_manifest, self._output_settings()
+            )
+        load = self.load_file
+        with self._stage("walk"):
+            candidates: Iterator[WalkEntry] = self.iter_candidates(path)
+        if self.stats is not None:
+            candidates = self.stats.timed_iter("walk", candidates)
+            load = self._load_file_profiled
+        if self.token_budget is not None:
+            yield from self._iter_budgeted(candidates, self.token_budget)
+        else:
+            # Filter, read and convert candidates on the worker pool; results
+            # come back in walk order so the output matches a serial run exactly
+            for result in ordered_map(
+                load, candidates, self.worker_count(), self.executor
+            ):
+                if result:
+                    yield result
+
+        # Only a completed run may replace the manifest: entries of files not
+        # reached yet would otherwise be dropped
+        if self.manifest is not None:
+            self.manifest.save()
+            self.log_debug(
+                f"Incremental run: {self.manifest.reused} unchanged, "
+                f"{self.manifest.processed} processed, "
+                f"{self.manifest.removed} removed"
+            )
+        if self.stats is not None:
+            self.stats.finish()
+
+    def _iter_budgeted(
+        self, candidates: Iterator[WalkEntry], budget: TokenBudget
+    ) -> Iterator[FileRecord]:
+        """Yield processed files in priority order while they fit in ``budget``.
+
+        Candidates are filtered first (no file is read for that), ranked with
+        ``TokenBudget.order`` and then read on the worker pool in that order.
+        Files are no longer handed to the pool once no remaining candidate can
+        fit, judging by their sizes (see ``TokenBudget.min_tokens``); texts
+        read but too long for what is left are not tokenized.
+        """
+        selected = []
+        for entry in candidates:
+            with self._stage("filter"):
+                mode = self._select_file(entry.path, entry.size, check_dirs=False)
+            if mode is not None:
+                selected.append((entry, mode))
+        queue = budget.order(selected)
+        # Smallest lower bound of the tokens of each candidate and those after it
+        least_rest = [0] * len(queue)
+        least = sys.maxsize
+        for position in range(len(queue) - 1, -1, -1):
+            entry, mode = queue[position]
+            least = min(least, budget.min_tokens(entry.size, mode))
+            least_rest[position] = least
+        fed = 0
+
+        def feed() -> Iterator[Tuple[WalkEntry, str]]:
+            nonlocal fed
+            for position, item in enumerate(queue):
+                if budget.exhausted or least_rest[position] > budget.remaining:
+                    return
+                fed += 1
+                yield item
+
+        def load(
+            item: Tuple[WalkEntry, str]
+        ) -> Tuple[Optional[FileRecord], Optional[int]]:
+            entry, mode = item
+            start = time.perf_counter()
+            result = self._load_selected(entry, mode)
+            tokens = None
+            # The budget only shrinks, so a text too long for it now never fits
+            if result is not None and budget.may_fit(result.content):
+                with self._stage("tokenize"):
+                    tokens = count_tokens(result.content)
+                result.tokens = tokens
+            if self.stats is not None:
+                self.stats.file_done(
+                    entry.rel_path, time.perf_counter() - start, result is not None
+                )
+            return result, tokens
+
+        for result, tokens in ordered_map(
+            load, feed(), self.worker_count(), self.executor
+        ):
+            if result is None:
+                continue
+            if tokens is None:
+                budget.dropped.append(result.path)
+            elif budget.admit(result.path, tokens):
+                yield result
+                continue
+            self.log_debug(f"Dropping {result.path}: over the token budget")
+            if self.stats is not None:
+                self.stats.skip(TOKEN_BUDGET, result.path)
+        budget.unread = len(queue) - fed
+        if self.manifest is not None:
+            # Unread files are not known to have changed; keep their rows so
+            # the next run does not process them again
+            for entry, _ in queue[fed:]:
+                self.manifest.keep(entry.rel_path)
+        if self.stats is not None and budget.unread:
+            self.stats.skip(TOKEN_BUDGET, count=budget.unread)
+
+    def _output_settings(self) -> str:
+        """Identify the settings that change how a file's block is produced"""
+        if not self.config.use_markitdown:
+            return "text"
+        extensions = ",".join(sorted(self.config.markitdown_extensions or ()))
+        return f"markitdown:{converter_identity()}:{extensions}"
 
-                if self.should_process_file(file_path):
-                    # relative_path is already calculated above
-                    result = self._process_file(file_path, relative_path)
-                    if result:
-                        files.append(result)
+    def _process_directory(
+        self, path: Path, original_path: Optional[str] = None
+    ) -> Tuple[str, str, str]:
+        """Internal method to process a directory"""
+        path = self.resolve_target(path)
+        return self._process_files(self._iter_directory(path), path, original_path)
+
+    def _process_files(
+        self,
+        file_iter: Iterator[FileRecord],
+        path: Path,
+        original_path: Optional[str],
+    ) -> Tuple[str, str, str]:
+        """Combine processed files into the summary, tree and content"""
+        files: List[FileRecord] = list(file_iter)
 
         # Write split files if output directory is specified
         if self.split_output_dir:
@@ -550,51 +1338,342 @@ class Readium:
         # Siempre generar el token tree (si hay archivos)
         token_tree = ""
         if files:
-            # When using the tokens command/flag, use rich_only=True to avoid duplication
+            # The tokens command/flag renders self.token_tree itself
             rich_only = self.config.show_token_tree
-            token_tree = self.generate_token_tree(files, path, rich_only=rich_only)
+            token_tree = self.generate_token_tree(
+                files, path, rich_only=rich_only, source=original_path
+            )
+
+        summary, tree = self.render_header(
+            path, [f.path for f in files], token_tree, original_path
+        )
+        with self._stage("write"):
+            content = "\n\n".join(format_file_block(f) for f in files)
+        if self.stats is not None:
+            self.stats.finish()
+        return summary, tree, content
 
-        # Generar el tree combinando token tree y estructura de archivos
+    def _write_directory(
+        self, path: Path, output: Union[str, Path], original_path: Optional[str]
+    ) -> Tuple[str, str]:
+        """Stream a directory's file blocks into ``output`` (see ``write_docs``)"""
+        path = self.resolve_target(path)
+        index = None
+        if self.token_cache is not None:
+            index = self.token_cache.open(self._token_tree_id(path, original_path))
+        return self._write_files(
+            self._iter_directory(path), path, output, original_path, index
+        )
+
+    def _write_files(
+        self,
+        file_iter: Iterator[FileRecord],
+        path: Path,
+        output: Union[str, Path],
+        original_path: Optional[str],
+        index: Optional[TokenIndex] = None,
+    ) -> Tuple[str, str]:
+        """Stream file blocks into ``output`` as they are produced"""
+        paths: List[str] = []
+        token_counts: List[int] = []
+        pending: List[FileRecord] = []
+
+        def flush_pending() -> None:
+            # Token counting is batched to keep tiktoken's thread pool busy
+            uncounted = [f for f in pending if f.tokens is None]
+            if uncounted:
+                with self._stage("tokenize"):
+                    if index is not None:
+                        counts = index.count(uncounted, self.count_tokens)
+                    else:
+                        counts = self.count_tokens([f.content for f in uncounted])
+                for record, tokens in zip(uncounted, counts):
+                    record.tokens = tokens
+            for record in pending:
+                # Records that can load their text again need not keep it
+                record.release()
+                token_counts.append(record.tokens or 0)
+            pending.clear()
+
+        output_dir = os.path.dirname(os.path.abspath(output))
+        body = tempfile.NamedTemporaryFile(
+            "w",
+            encoding="utf-8",
+            newline="",
+            dir=output_dir,
+            prefix=".readium-",
+            suffix=".tmp",
+            delete=False,
+        )
+        try:
+            with body:
+                pending_size = 0
+                for file_info in file_iter:
+                    with self._stage("write"):
+                        if paths:
+                            body.write("\n\n")
+                        body.write(format_file_block(file_info))
+                    if self.split_output_dir:
+                        self.write_split_files([file_info], path)
+                    paths.append(file_info.path)
+                    pending.append(file_info)
+                    pending_size += len(file_info.content)
+                    if len(pending) >= 64 or pending_size >= 16 * 1024 * 1024:
+                        flush_pending()
+                        pending_size = 0
+                flush_pending()
+            if index is not None:
+                assert self.token_cache is not None
+                self.token_cache.save(index)
+                self.log_debug(f"Token cache: {index.hits} hits, {index.misses} misses")
+
+            token_tree = ""
+            if paths:
+                with self._stage("render"):
+                    token_tree = self._render_token_tree(
+                        list(zip(paths, token_counts)),
+                        rich_only=self.config.show_token_tree,
+                    )
+            summary, tree = self.render_header(path, paths, token_tree, original_path)
+            with self._stage("write"):
+                with open(output, "w", encoding="utf-8") as f:
+                    f.write(f"Summary:\n{summary}\n\n")
+                    f.write(f"Tree:\n{tree}\n\n")
+                    f.write("Content:\n")
+                    with open(body.name, "r", encoding="utf-8", newline="") as src:
+                        shutil.copyfileobj(src, f)
+            if self.stats is not None:
+                self.stats.finish()
+            return summary, tree
+        finally:
+            os.unlink(body.name)
+
+    def render_header(
+        self,
+        path: Path,
+        paths: List[str],
+        token_tree: str = "",
+        original_path: Optional[str] = None,
+    ) -> Tuple[str, str]:
+        """Render the summary and tree that precede the content of a run.
+
+        ``paths`` are the relative paths of the files in the output, in output
+        order, and ``token_tree`` their markdown token table (see
+        ``generate_token_tree``). ``original_path`` is the git or web URL the
+        files were read from, if any.
+
+        Returns:
+            (summary, tree)
+        """
+        with self._stage("write"):
+            tree = self._build_tree(paths, token_tree)
+            summary = self._build_summary(path, original_path, len(paths), token_tree)
+        self.files_processed = len(paths)
+        return summary, tree
+
+    def _build_tree(self, paths: List[str], token_tree: str) -> str:
+        """Combine the token tree and the file structure listing"""
         tree = ""
         if token_tree:
             tree += token_tree.strip() + "\n\n"
         tree += "Documentation Structure:\n"
-        for file in files:
-            tree += f"└── {file['path']}\n"
-
-        # Generate content
-        content = "\n\n".join(
-            [
-                f"================================================\n"
-                f"File: {f['path']}\n"
-                f"================================================\n"
-                f"{f['content']}"
-                for f in files
-            ]
-        )
-
-        # Generate summary
+        tree += "".join(f"└── {p}\n" for p in paths)
+        return tree
+
+    def _build_summary(
+        self,
+        path: Path,
+        original_path: Optional[str],
+        file_count: int,
+        token_tree: str,
+    ) -> str:
+        """Build the summary of a directory run"""
         summary = f"Path analyzed: {original_path or path}\n"
-        summary += f"Files processed: {len(files)}\n"
+        summary += f"Files processed: {file_count}\n"
         if self.config.target_dir:
             summary += f"Target directory: {self.config.target_dir}\n"
         if self.config.use_markitdown:
             summary += "Using MarkItDown for compatible files\n"
             if self.config.markitdown_extensions:
                 summary += f"MarkItDown extensions: {', '.join(self.config.markitdown_extensions)}\n"
+        if self.timed_out_files:
+            summary += (
+                f"Skipped after MarkItDown timeout: {len(self.timed_out_files)} files "
+                f"({', '.join(sorted(self.timed_out_files))})\n"
+            )
         if self.branch:
             summary += f"Git branch: {self.branch}\n"
         if self.split_output_dir:
             summary += f"Split files output directory: {self.split_output_dir}\n"
+        if self.token_budget is not None:
+            summary += self.token_budget.describe()
+        if self.crawler is not None:
+            summary += self.crawler.describe()
         if token_tree:
-            summary += f"Token Tree generated with {len(files)} files\n"
+            summary += f"Token Tree generated with {file_count} files\n"
+
+        return summary
+
+    def worker_count(self) -> int:
+        """Number of worker threads used for file processing"""
+        if self.config.workers is not None:
+            return max(1, self.config.workers)
+        return min(32, (os.cpu_count() or 1) + 4)
+
+    def load_file(self, entry: WalkEntry) -> Optional[FileRecord]:
+        """Filter and process a single candidate file (runs on the worker pool)"""
+        # Excluded directories were already pruned by the walker
+        with self._stage("filter"):
+            mode = self._select_file(entry.path, entry.size, check_dirs=False)
+        if mode is None:
+            return None
+        return self._load_selected(entry, mode)
+
+    def _load_selected(self, entry: WalkEntry, mode: str) -> Optional[FileRecord]:
+        """Process a file that passed ``_select_file`` as ``mode``"""
+        if self.manifest is not None:
+            return self._load_incremental(entry, mode)
+        if isinstance(entry, BlobEntry):
+            return self._process_blob(entry, mode)
+        return self._process_file(
+            entry.path, entry.rel_path, check_binary=(mode == "text")
+        )
 
-        return summary, tree, content
+    def _load_file_profiled(self, entry: WalkEntry) -> Optional[FileRecord]:
+        """``load_file`` that also records the time spent on the file"""
+        assert self.stats is not None
+        start = time.perf_counter()
+        result = self.load_file(entry)
+        self.stats.file_done(
+            entry.rel_path, time.perf_counter() - start, result is not None
+        )
+        return result
+
+    def _load_incremental(self, entry: WalkEntry, mode: str) -> Optional[FileRecord]:
+        """Serve an unchanged file from the run manifest, or process and record it
+
+        The text of an unchanged file stays in its manifest block until the
+        record's content is first used.
+        """
+        manifest = self.manifest
+        assert manifest is not None
+        hit, block = False, None
+        if entry.mtime_ns is not None:  # Blobs have no mtime
+            hit, block = manifest.lookup(entry.rel_path, entry.size, entry.mtime_ns)
+        if not hit:
+            try:
+                with self._stage("read"):
+                    data = self._read_entry(entry)
+            except OSError as e:
+                self.log_debug(f"Error processing file: {str(e)}")
+                if self.stats is not None:
+                    self.stats.skip(READ_ERROR, entry.rel_path)
+                return None
+            if self.stats is not None:
+                self.stats.add_bytes(len(data))
+            content_hash = RunManifest.hash_bytes(data)
+            # Touched but identical files keep their block
+            hit, block = manifest.lookup(
+                entry.rel_path, entry.size, entry.mtime_ns, content_hash
+            )
+            if not hit:
+                if isinstance(entry, BlobEntry):
+                    result = self._process_blob(entry, mode, data, content_hash)
+                else:
+                    result = self._process_file(
+                        entry.path,
+                        entry.rel_path,
+                        check_binary=(mode == "text"),
+                        data=data,
+                        content_hash=content_hash,
+                    )
+                if result is None and entry.rel_path in self.timed_out_files:
+                    return None  # Try again next run
+                manifest.record(
+                    entry.rel_path,
+                    entry.size,
+                    entry.mtime_ns,
+                    content_hash,
+                    result.content if result else None,
+                )
+                return result
+
+        self.log_debug(f"Unchanged since last run: {entry.rel_path}")
+        if block is None:
+            return None
+        return FileRecord(
+            entry.rel_path,
+            size=entry.size,
+            kind=GIT if isinstance(entry, BlobEntry) else FILE,
+            loader=functools.partial(RunManifest.read_block, block),
+        )
+
+    def _read_entry(self, entry: WalkEntry) -> bytes:
+        """Raw content of a candidate file, from its blob or from disk"""
+        if isinstance(entry, BlobEntry):
+            assert self.git_tree is not None
+            return self.git_tree.read(entry.oid)
+        with open(entry.path, "rb") as f:
+            return f.read()
+
+    def _process_blob(
+        self,
+        entry: BlobEntry,
+        mode: str,
+        data: Optional[bytes] = None,
+        content_hash: Optional[str] = None,
+    ) -> Optional[FileRecord]:
+        """``_process_file`` for a file read from git objects"""
+        if data is None:
+            try:
+                with self._stage("read"):
+                    data = self._read_entry(entry)
+            except OSError as e:
+                self.log_debug(f"Error processing file: {str(e)}")
+                if self.stats is not None:
+                    self.stats.skip(READ_ERROR, entry.rel_path)
+                return None
+            if self.stats is not None:
+                self.stats.add_bytes(len(data))
+        if mode != "markitdown":
+            return self._process_file(
+                entry.path,
+                entry.rel_path,
+                check_binary=(mode == "text"),
+                data=data,
+                kind=GIT,
+            )
+
+        # MarkItDown converts files, so the blob is written to a temporary one
+        with tempfile.TemporaryDirectory(prefix="readium-") as temp_dir:
+            temp_path = os.path.join(temp_dir, entry.name)
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            return self._process_file(
+                temp_path,
+                entry.rel_path,
+                data=data,
+                content_hash=content_hash or RunManifest.hash_bytes(data),
+                kind=GIT,
+            )
 
     def _process_file(
-        self, file_path: Path, relative_path: Path
-    ) -> Optional[Dict[str, str]]:
-        """Process a single file, using markitdown if enabled"""
+        self,
+        file_path: Union[str, Path],
+        relative_path: Union[str, Path],
+        check_binary: bool = False,
+        data: Optional[bytes] = None,
+        content_hash: Optional[str] = None,
+        kind: str = FILE,
+    ) -> Optional[FileRecord]:
+        """Process a single file, using markitdown if enabled
+
+        With ``check_binary`` the file is rejected if its first bytes look binary;
+        the check runs on the same buffer that is decoded, so plain files are
+        opened exactly once. Callers that already read the file pass its bytes as
+        ``data`` and their SHA-256 as ``content_hash``; ``kind`` tells where the
+        file came from.
+        """
         self.log_debug(f"Processing file: {file_path}")
 
         try:
@@ -605,38 +1684,90 @@ class Readium:
                     and file_ext in self.config.markitdown_extensions
                 ):
                     try:
+                        cache = self.conversion_cache
+                        cache_key = None
+                        size = (
+                            len(data)
+                            if data is not None
+                            else os.path.getsize(file_path)
+                        )
+                        if cache is not None:
+                            cache_key = ConversionCache.make_key(
+                                content_hash or hash_file(file_path),
+                                converter_identity(),
+                                [file_ext],
+                            )
+                            cached = cache.get(cache_key)
+                            if cached is not None:
+                                self.log_debug(f"Conversion cache hit for {file_path}")
+                                return FileRecord(
+                                    str(relative_path), cached, size, kind
+                                )
+
                         self.log_debug(f"Attempting to process with markitdown")
-                        assert self.markitdown is not None
-                        result = self.markitdown.convert(str(file_path))
+                        if self.stats is not None:
+                            self.stats.add_bytes(size)
+                        with self._stage("markitdown"):
+                            if self.conversion_pool is not None:
+                                text = self.conversion_pool.convert(str(file_path))
+                            else:
+                                assert self.markitdown is not None
+                                with self.markitdown_lock:
+                                    converted = self.markitdown.convert(str(file_path))
+                                text = converted.text_content
                         self.log_debug("Successfully processed with markitdown")
-                        return {
-                            "path": str(relative_path),
-                            "content": result.text_content,
-                        }
-                    except (FileConversionException, UnsupportedFormatException) as e:
-                        self.log_debug(
-                            f"MarkItDown couldn't process {file_path}: {str(e)}"
-                        )
+                        if cache is not None and cache_key is not None:
+                            cache.put(cache_key, text)
+                        return FileRecord(str(relative_path), text, size, kind)
+                    except ConversionTimeout as e:
+                        # Skip the file: plain-reading a document that hung the
+                        # converter would only add binary noise to the output
+                        self.log_debug(f"Skipping {file_path}: {str(e)}")
+                        self.timed_out_files.append(str(relative_path))
+                        if self.stats is not None:
+                            self.stats.skip(CONVERSION_TIMEOUT, str(relative_path))
+                        return None
                     except Exception as e:
-                        self.log_debug(
-                            f"Error with MarkItDown processing {file_path}: {str(e)}"
-                        )
+                        if self.stats is not None:
+                            self.stats.conversion_error()
+                        if _is_conversion_rejection(e):
+                            self.log_debug(
+                                f"MarkItDown couldn't process {file_path}: {str(e)}"
+                            )
+                        else:
+                            self.log_debug(
+                                f"Error with MarkItDown processing {file_path}: {str(e)}"
+                            )
 
             # Fall back to normal reading
             self.log_debug("Attempting normal file reading")
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
-                self.log_debug("Successfully read file normally")
-                return {"path": str(relative_path), "content": content}
+            if data is None:
+                with self._stage("read"), open(file_path, "rb") as f:
+                    data = f.read()
+                if self.stats is not None:
+                    self.stats.add_bytes(len(data))
+            if check_binary:
+                with self._stage("binary_sniff"):
+                    is_binary = _looks_binary(data[:BINARY_SNIFF_SIZE])
+                if is_binary:
+                    self.log_debug(f"Excluding {file_path} because it's binary")
+                    if self.stats is not None:
+                        self.stats.skip(BINARY, str(relative_path))
+                    return None
+            content = _decode_text(data)
+            self.log_debug("Successfully read file normally")
+            return FileRecord(str(relative_path), content, len(data), kind)
         except Exception as e:
             self.log_debug(f"Error processing file: {str(e)}")
+            if self.stats is not None:
+                self.stats.skip(READ_ERROR, str(relative_path))
             return None
 
-    def write_split_files(self, files: List[Dict[str, str]], base_path: Path) -> None:
+    def write_split_files(self, files: List[FileRecord], base_path: Path) -> None:
         """Write individual files for each processed document.
 
         Args:
-            files: List of dictionaries containing file paths and contents
+            files: Processed file records
             base_path: Base path for creating the output directory structure
         """
         if not self.split_output_dir:
@@ -654,11 +1785,11 @@ class Readium:
 
             # Prepare content with metadata header
             content = (
-                f"Original Path: {file_info['path']}\n"
+                f"Original Path: {file_info.path}\n"
                 f"Base Directory: {base_path}\n"
                 f"UUID: {file_uuid}\n"
                 f"{'=' * 50}\n\n"
-                f"{file_info['content']}"
+                f"{file_info.content}"
             )
 
             # Write the file
@@ -0,0 +1,627 @@
+import contextlib
+import os
+import posixpath
+import re
+import threading
+import urllib.parse
+from collections import Counter, deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+import urllib3
+
+from .cache import HttpCache, HttpEntry
+from .config import ReadConfig
+from .core import extract_markdown
+from .records import WEB, FileRecord
+from .utils.concurrency import ordered_map
+
+USER_AGENT = "readium (documentation crawler)"
+
+# Links to these are never requested: they cannot be documentation pages
+SKIPPED_EXTENSIONS = {
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".svg",
+    ".ico",
+    ".webp",
+    ".css",
+    ".js",
+    ".map",
+    ".woff",
+    ".woff2",
+    ".ttf",
+    ".eot",
+    ".zip",
+    ".gz",
+    ".tgz",
+    ".tar",
+    ".whl",
+    ".exe",
+    ".dmg",
+    ".mp3",
+    ".mp4",
+    ".webm",
+    ".pdf",
+}
+
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+SITEMAP_TYPES = ("application/xml", "text/xml")
+
+# Levels of sitemap indexes followed below a sitemap seed
+MAX_SITEMAP_NESTING = 3
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a page URL: no fragment, lowercase host, default port dropped"""
+    parts = urllib.parse.urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if ":" in host:
+        host = f"[{host}]"  # IPv6
+    default_port = {"http": 80, "https": 443}.get(scheme)
+    if parts.port is not None and parts.port != default_port:
+        host += f":{parts.port}"
+    return urllib.parse.urlunsplit((scheme, host, parts.path or "/", parts.query, ""))
+
+
+def origin(url: str) -> str:
+    """Scheme, host and port of a normalized URL"""
+    parts = urllib.parse.urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def page_path(url: str) -> str:
+    """Relative path of the Markdown file produced for a crawled page"""
+    parts = urllib.parse.urlsplit(url)
+    path = urllib.parse.unquote(parts.path).strip("/")
+    if not path or parts.path.endswith("/"):
+        path = posixpath.join(path, "index")
+    stem, extension = posixpath.splitext(path)
+    if extension.lower() in (".html", ".htm", ".md"):
+        path = stem
+    if parts.query:
+        path += "_" + parts.query
+    segments = [
+        re.sub(r"[^A-Za-z0-9._-]+", "_", segment).strip(".") or "_"
+        for segment in path.split("/")
+    ]
+    return "/".join(segments) + ".md"
+
+
+def extract_links(data: bytes, url: str) -> List[str]:
+    """Absolute URLs of the ``<a href>`` links of an HTML page, in page order"""
+    import lxml.etree
+    import lxml.html
+
+    try:
+        document = lxml.html.document_fromstring(data)
+    except (ValueError, lxml.etree.ParserError):
+        return []
+    base = url
+    for href in document.xpath("//base/@href")[:1]:
+        base = urllib.parse.urljoin(url, href.strip())
+    links = []
+    for href in document.xpath("//a/@href"):
+        try:
+            links.append(urllib.parse.urljoin(base, href.strip()))
+        except ValueError:  # Malformed, e.g. an invalid IPv6 host
+            continue
+    return links
+
+
+def parse_sitemap(data: bytes) -> Tuple[List[str], bool]:
+    """URLs listed in a sitemap and whether it is a sitemap index.
+
+    Raises:
+        ValueError: If ``data`` is not a sitemap
+    """
+    import lxml.etree
+
+    try:
+        root = lxml.etree.fromstring(
+            data, parser=lxml.etree.XMLParser(resolve_entities=False, no_network=True)
+        )
+    except lxml.etree.XMLSyntaxError as e:
+        raise ValueError(f"Invalid sitemap: {e}")
+    kind = lxml.etree.QName(root).localname
+    if kind not in ("urlset", "sitemapindex"):
+        raise ValueError(f"Not a sitemap: <{kind}>")
+    urls = [
+        element.text.strip()
+        for element in root.iter("{*}loc")
+        if element.text and element.text.strip()
+    ]
+    return urls, kind == "sitemapindex"
+
+
+def extraction_settings(config: ReadConfig) -> str:
+    """Identify the settings and trafilatura build that shape extracted Markdown"""
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        extractor = f"trafilatura-{version('trafilatura')}"
+    except PackageNotFoundError:
+        extractor = "trafilatura-unknown"
+    options = (
+        config.url_mode,
+        config.include_tables,
+        config.include_images,
+        config.include_links,
+        config.include_comments,
+    )
+    return ":".join([extractor, *map(str, options)])
+
+
+class WebPage:
+    """A fetched HTML page or sitemap.
+
+    Attributes:
+        url: URL the page was served from, after redirects
+        data: Response body
+        is_sitemap: Whether the page is a sitemap
+        entry: Cache entry of the page, when an ``HttpCache`` is used
+    """
+
+    __slots__ = ("url", "data", "is_sitemap", "entry")
+
+    def __init__(
+        self,
+        url: str,
+        data: bytes,
+        is_sitemap: bool,
+        entry: Optional[HttpEntry] = None,
+    ) -> None:
+        self.url = url
+        self.data = data
+        self.is_sitemap = is_sitemap
+        self.entry = entry
+
+
+class WebClient:
+    """HTTP client for web pages, with an optional on-disk cache.
+
+    Requests go through one ``urllib3.PoolManager`` whose keep-alive
+    connections are capped at ``config.crawl_host_connections`` per host. With
+    an ``HttpCache``, a page cached less than ``config.http_cache_ttl`` seconds
+    ago is served without any request; older ones are revalidated with
+    ``If-None-Match``/``If-Modified-Since``, and a ``304`` reuses both the
+    cached body and the Markdown extracted from it. In ``config.offline`` mode
+    pages are only served from the cache.
+
+    Pages that fail to download are recorded in ``failed``; responses that are
+    not HTML or exceed ``config.max_file_size`` are recorded in ``skipped``.
+
+    Args:
+        config: Configuration for extraction, limits and caching
+        cache: Cache of downloaded pages and their extracted Markdown
+        fetch_slot: Returns a context manager held around each request
+        log: Debug logger
+    """
+
+    def __init__(
+        self,
+        config: ReadConfig,
+        cache: Optional[HttpCache] = None,
+        fetch_slot: Optional[Callable[[], ContextManager[Any]]] = None,
+        log: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        self.config = config
+        self.cache = cache
+        self.fetch_slot = fetch_slot or contextlib.nullcontext
+        self.log = log or (lambda msg: None)
+        self.connections = max(1, config.crawl_host_connections)
+        self.http = urllib3.PoolManager(
+            maxsize=self.connections,
+            block=True,
+            headers={"User-Agent": USER_AGENT},
+            timeout=urllib3.Timeout(connect=10, read=30),
+            retries=urllib3.Retry(
+                total=2,
+                redirect=5,
+                backoff_factor=0.5,
+                status_forcelist=(429, 502, 503, 504),
+                raise_on_status=False,
+            ),
+        )
+        self.settings = extraction_settings(config)
+        self.failed: List[Tuple[str, str]] = []
+        self.skipped: List[Tuple[str, str]] = []
+        # Pages served from the cache without a request, revalidated with a
+        # 304, and downloaded; extractions reused from the cache
+        self.counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def fetch(self, url: str, sitemap: bool = False) -> Optional[WebPage]:
+        """Get an HTML page, or record why it was not used.
+
+        With ``sitemap``, XML responses and ``.xml`` URLs are accepted too and
+        returned as sitemaps.
+        """
+        cached: Optional[Tuple[HttpEntry, bytes]] = None
+        if self.cache is not None:
+            cached = self.cache.get(normalize_url(url))
+            ttl = self.config.http_cache_ttl
+            if cached is not None and (
+                self.config.offline or (ttl is not None and cached[0].age() < ttl)
+            ):
+                self._count("cached")
+                return self._cached_page(url, cached, sitemap)
+            if self.config.offline:
+                self.fail(url, "not in the HTTP cache (offline)")
+                return None
+        with self.fetch_slot():
+            return self._fetch(url, sitemap, cached)
+
+    def extract(self, page: WebPage) -> Tuple[str, str]:
+        """Title and Markdown of a page, reused from the cache when possible.
+
+        Raises:
+            ValueError: If no content can be extracted
+        """
+        entry = page.entry
+        if entry is not None and self.settings in entry.extracted:
+            self._count("reused")
+            title, markdown = entry.extracted[self.settings]
+            return title, markdown
+        title, markdown = extract_markdown(page.data, page.url, self.config)
+        if entry is not None and self.cache is not None:
+            entry.extracted[self.settings] = [title, markdown]
+            self.cache.save(entry)
+        return title, markdown
+
+    def read(self, url: str) -> Tuple[str, str]:
+        """Title and Markdown of a single page.
+
+        Raises:
+            ValueError: If the page cannot be downloaded or extracted
+        """
+        page = self.fetch(url)
+        if page is None:
+            raise ValueError(f"Failed to download content from {url}: {self.reason()}")
+        return self.extract(page)
+
+    def reason(self) -> str:
+        """Why the last page that could not be used was left out"""
+        records = self.failed or self.skipped
+        return records[-1][1] if records else "unknown error"
+
+    def describe_cache(self) -> str:
+        """Summary line of cache use, if a cache is used"""
+        if self.cache is None:
+            return ""
+        counts = self.counts
+        return (
+            f"HTTP cache: {counts['cached']} pages served from cache, "
+            f"{counts['revalidated']} revalidated (304), "
+            f"{counts['downloaded']} downloaded, "
+            f"{counts['reused']} extractions reused\n"
+        )
+
+    def close(self) -> None:
+        """Close the pooled connections"""
+        self.http.clear()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counts[name] += 1
+
+    def fail(self, url: str, reason: str) -> None:
+        """Record a page that could not be downloaded or extracted"""
+        self.log(f"{url}: {reason}")
+        self.failed.append((url, reason))
+
+    def skip(self, url: str, reason: str) -> None:
+        """Record a page that was left out on purpose"""
+        self.log(f"{url}: {reason}")
+        self.skipped.append((url, reason))
+
+    def _classify(self, url: str, media_type: str, sitemap: bool) -> Optional[bool]:
+        """Whether a response is a sitemap, or None if it is not used"""
+        if media_type in HTML_TYPES:
+            return False
+        if sitemap and (media_type in SITEMAP_TYPES or url.lower().endswith(".xml")):
+            return True
+        self.skip(url, f"not HTML ({media_type or '?'})")
+        return None
+
+    def _cached_page(
+        self, url: str, cached: Tuple[HttpEntry, bytes], sitemap: bool
+    ) -> Optional[WebPage]:
+        entry, body = cached
+        is_sitemap = self._classify(url, entry.media_type, sitemap)
+        if is_sitemap is None:
+            return None
+        return WebPage(entry.final_url, body, is_sitemap, entry)
+
+    def _fetch(
+        self, url: str, sitemap: bool, cached: Optional[Tuple[HttpEntry, bytes]]
+    ) -> Optional[WebPage]:
+        headers = {}
+        if cached is not None:
+            if cached[0].etag:
+                headers["If-None-Match"] = cached[0].etag
+            if cached[0].last_modified:
+                headers["If-Modified-Since"] = cached[0].last_modified
+        try:
+            response = self.http.request(
+                "GET", url, headers=headers, preload_content=False
+            )
+        except urllib3.exceptions.HTTPError as e:
+            self.fail(url, str(e))
+            return None
+        complete = False
+        try:
+            if response.status == 304 and cached is not None and self.cache:
+                complete = True
+                self.cache.refresh(cached[0])
+                self._count("revalidated")
+                return self._cached_page(url, cached, sitemap)
+            if response.status != 200:
+                self.fail(url, f"HTTP {response.status}")
+                return None
+            final_url = url
+            # ``geturl()`` only has the path: follow the redirects instead
+            for step in response.retries.history if response.retries else ():
+                if step.redirect_location:
+                    final_url = urllib.parse.urljoin(final_url, step.redirect_location)
+            final_url = normalize_url(final_url)
+            content_type = response.headers.get("Content-Type", "")
+            media_type = content_type.split(";")[0].strip().lower()
+            is_sitemap = self._classify(url, media_type, sitemap)
+            if is_sitemap is None:
+                return None
+            limit = self.config.max_file_size
+            if limit < 0:  # No size limit
+                data = response.read()
+            else:
+                length = response.headers.get("Content-Length", "")
+                if length.isdigit() and int(length) > limit:
+                    self.skip(url, "too large")
+                    return None
+                data = response.read(limit + 1)
+                if len(data) > limit:
+                    self.skip(url, "too large")
+                    return None
+            complete = True
+        except urllib3.exceptions.HTTPError as e:
+            self.fail(url, str(e))
+            return None
+        finally:
+            # A connection with an unread body cannot be reused: close it, but
+            # still hand it back, as the pool blocks once all are handed out
+            if not complete:
+                response.close()
+            response.release_conn()
+
+        self._count("downloaded")
+        entry = None
+        if self.cache is not None and "no-store" not in response.headers.get(
+            "Cache-Control", ""
+        ):
+            entry = self.cache.put(
+                normalize_url(url),
+                final_url,
+                media_type,
+                data,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+        return WebPage(final_url, data, is_sitemap, entry)
+
+
+class Crawler:
+    """Crawl a documentation site from a seed page or ``sitemap.xml``.
+
+    Pages are visited breadth first: the seed pages (the seed URL itself, or
+    every page listed by a sitemap seed) are at depth 0, and same-origin
+    ``<a href>`` links are followed up to ``config.crawl_depth`` hops, with at
+    most ``config.crawl_max_pages`` URLs requested in all. Pages are fetched
+    concurrently through a ``WebClient``, up to its per-host connection cap,
+    and their Markdown is extracted on a separate worker pool while fetching
+    continues. Pages are yielded in discovery order as soon as their extraction
+    completes, so the output does not depend on timing.
+
+    Args:
+        seed: Seed page or sitemap URL
+        client: Client fetching pages; its failures and skips are the crawl's
+        workers: Extraction threads, when no ``executor`` is given
+        executor: Shared pool to run extraction on
+    """
+
+    def __init__(
+        self,
+        seed: str,
+        client: WebClient,
+        workers: int = 4,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.seed = seed
+        self.client = client
+        self.config = client.config
+        self.workers = workers
+        self.executor = executor
+        self.origins = {origin(normalize_url(seed))}
+        self.requested = 0
+        self.pages = 0
+
+    def crawl(self) -> Iterator[FileRecord]:
+        """Yield a record of each page, with its ``title`` and ``source`` URL.
+
+        Raises:
+            ValueError: If the seed cannot be read
+        """
+        try:
+            yield from self._crawl()
+        finally:
+            self.client.close()
+
+    def _crawl(self) -> Iterator[FileRecord]:
+        client = self.client
+        client.log(f"Crawling {self.seed}")
+        seed = normalize_url(self.seed)
+        first = client.fetch(self.seed, sitemap=True)
+        if first is None:
+            raise ValueError(
+                f"Failed to download content from {self.seed}: {client.reason()}"
+            )
+        self.origins.add(origin(first.url))
+
+        seen = {seed, first.url}
+        prefetched: Dict[str, WebPage] = {}
+        if first.is_sitemap:
+            level = self._sitemap_pages(first, seen)
+        else:
+            self.requested = 1
+            level = [first.url]
+            prefetched[first.url] = first
+
+        def fetch(url: str) -> Optional[WebPage]:
+            page = prefetched.pop(url, None) or client.fetch(url)
+            if page is not None and origin(page.url) not in self.origins:
+                client.skip(url, f"redirected to {page.url}")
+                return None
+            return page
+
+        # URL, size and pending extraction of pages not yielded yet; bodies are
+        # not kept
+        extractions: Deque[Tuple[str, int, "Future[Optional[Tuple[str, str]]]"]]
+        extractions = deque()
+        paths: Dict[str, int] = {}
+
+        def extracted(wait: bool) -> Iterator[FileRecord]:
+            """Yield the leading pages whose extraction is done (all if ``wait``)"""
+            while extractions and (wait or extractions[0][2].done()):
+                url, size, future = extractions.popleft()
+                result = future.result()
+                if result is None:
+                    continue
+                title, markdown = result
+                path = page_path(url)
+                if path in paths:
+                    paths[path] += 1
+                    path = f"{path[:-3]}-{paths[path]}.md"
+                paths.setdefault(path, 1)
+                self.pages += 1
+                yield FileRecord(path, markdown, size, WEB, title=title, source=url)
+
+        with contextlib.ExitStack() as stack:
+            executor = self.executor
+            if executor is None:
+                executor = stack.enter_context(
+                    ThreadPoolExecutor(max_workers=max(1, self.workers))
+                )
+            fetch_pool = stack.enter_context(
+                ThreadPoolExecutor(max_workers=client.connections)
+            )
+            fetched: Set[str] = set()
+            depth = 0
+            while level:
+                client.log(f"Crawl depth {depth}: {len(level)} pages")
+                next_level: List[str] = []
+                pages = ordered_map(fetch, level, client.connections, fetch_pool)
+                for page in pages:
+                    yield from extracted(wait=False)
+                    if page is None or page.url in fetched:
+                        continue  # Failed, or redirected to a page already read
+                    fetched.add(page.url)
+                    seen.add(page.url)
+                    extractions.append(
+                        (page.url, len(page.data), executor.submit(self._extract, page))
+                    )
+                    if depth < self.config.crawl_depth:
+                        next_level.extend(self._same_origin_links(page, seen))
+                    yield from extracted(wait=False)
+                level = next_level
+                depth += 1
+            yield from extracted(wait=True)
+
+    def describe(self) -> str:
+        """Summary lines describing the crawl"""
+        text = (
+            f"Crawl: {self.pages} pages from {self.requested} URLs requested "
+            f"(depth {self.config.crawl_depth}, "
+            f"limit {self.config.crawl_max_pages} pages)\n"
+        )
+        failed, skipped = self.client.failed, self.client.skipped
+        if failed:
+            pages = ", ".join(f"{url} ({why})" for url, why in sorted(failed))
+            text += f"Failed pages: {pages}\n"
+        if skipped:
+            text += f"Skipped URLs: {len(skipped)}\n"
+        return text + self.client.describe_cache()
+
+    def _admit(self, url: str, seen: Set[str]) -> bool:
+        """Whether a discovered URL should be requested; counts it if so"""
+        if url in seen or self.requested >= self.config.crawl_max_pages:
+            return False
+        seen.add(url)
+        self.requested += 1
+        return True
+
+    def _same_origin_links(self, page: WebPage, seen: Set[str]) -> Iterator[str]:
+        """New same-origin page links of a page, within the page limit"""
+        for link in extract_links(page.data, page.url):
+            parts = urllib.parse.urlsplit(link)
+            if parts.scheme not in ("http", "https"):
+                continue
+            url = normalize_url(link)
+            if origin(url) not in self.origins:
+                continue
+            extension = os.path.splitext(parts.path)[1].lower()
+            if extension in SKIPPED_EXTENSIONS:
+                continue
+            if self._admit(url, seen):
+                yield url
+
+    def _sitemap_pages(self, sitemap: WebPage, seen: Set[str]) -> List[str]:
+        """Same-origin pages listed by a sitemap, following sitemap indexes"""
+        pages: List[str] = []
+        sitemaps = [sitemap]
+        for _ in range(MAX_SITEMAP_NESTING):
+            nested: List[str] = []
+            for page in sitemaps:
+                try:
+                    urls, is_index = parse_sitemap(page.data)
+                except ValueError as e:
+                    self.client.fail(page.url, str(e))
+                    continue
+                for url in map(normalize_url, urls):
+                    if origin(url) not in self.origins:
+                        continue
+                    if is_index:
+                        nested.append(url)
+                    elif self._admit(url, seen):
+                        pages.append(url)
+            if not nested:
+                break
+            fetched = ordered_map(
+                lambda url: self.client.fetch(url, sitemap=True),
+                nested,
+                self.client.connections,
+            )
+            sitemaps = [
+                page for page in fetched if page is not None and page.is_sitemap
+            ]
+        return pages
+
+    def _extract(self, page: WebPage) -> Optional[Tuple[str, str]]:
+        """Title and Markdown of a page (runs on the extraction pool)"""
+        try:
+            return self.client.extract(page)
+        except Exception as e:
+            self.client.fail(page.url, str(e))
+            return None
@@ -0,0 +1,161 @@
+import math
+import os
+import random
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Files tokenized exactly by default
+DEFAULT_SAMPLE_SIZE = 400
+
+# Files sampled from every extension at least (all of them if it has fewer), so
+# each stratum has a residual variance (two would do; five keeps it meaningful)
+MIN_PER_STRATUM = 5
+
+# Normal quantile of the reported two-sided 95% interval
+Z_95 = 1.96
+
+
+class TokenEstimate:
+    """Token counts extrapolated from an exactly tokenized stratified sample.
+
+    Files are stratified by extension. In each stratum the sampled files give a
+    tokens-per-byte ratio, and every file that was not sampled is estimated as
+    its size times that ratio. Sampled files keep their exact counts; sampled
+    files that produced no text (binary files, failed reads) count as zero
+    tokens and are left out of ``files``.
+
+    The margin is the half width of a 95% confidence interval of the total,
+    from the usual variance of a stratified ratio estimator:
+    ``N^2 (1 - n/N) / n * s^2`` per stratum, where ``s^2`` is the variance of
+    the residuals ``tokens - ratio * bytes`` over the sample.
+
+    Attributes:
+        files: ``(rel_path, tokens)`` of every file, estimated or exact
+        total: Estimated total tokens
+        margin: Half width of the 95% confidence interval of ``total``
+        sampled: Number of files tokenized exactly
+        population: Number of candidate files the estimate covers
+    """
+
+    def __init__(
+        self,
+        files: List[Tuple[str, int]],
+        total: float,
+        margin: float,
+        sampled: int,
+        population: int,
+    ) -> None:
+        self.files = files
+        self.total = total
+        self.margin = margin
+        self.sampled = sampled
+        self.population = population
+
+    def describe(self) -> str:
+        """One line stating the estimate and its interval"""
+        return (
+            f"~{round(self.total):,} ± {round(self.margin):,} "
+            f"(95% confidence, {self.sampled} of {self.population} files tokenized)"
+        )
+
+
+def stratum_key(rel_path: str) -> str:
+    """Stratum of a file: its lowercased extension"""
+    return os.path.splitext(rel_path)[1].lower()
+
+
+def choose_sample(
+    sizes: Sequence[Tuple[str, int]], sample_size: int, seed: int = 0
+) -> List[int]:
+    """Pick the indexes of ``sizes`` to tokenize exactly.
+
+    Each stratum gets a share of ``sample_size`` proportional to its bytes,
+    but at least ``MIN_PER_STRATUM`` files (or all of them, if fewer).
+
+    Args:
+        sizes: ``(rel_path, size)`` of every candidate file
+        sample_size: Target number of sampled files
+        seed: Random seed, so repeated runs sample the same files
+
+    Returns:
+        Sorted indexes into ``sizes``
+    """
+    strata: Dict[str, List[int]] = {}
+    for index, (rel_path, _) in enumerate(sizes):
+        strata.setdefault(stratum_key(rel_path), []).append(index)
+    total_bytes = sum(size for _, size in sizes) or 1
+
+    rng = random.Random(seed)
+    chosen: List[int] = []
+    for key in sorted(strata):
+        members = strata[key]
+        stratum_bytes = sum(sizes[i][1] for i in members)
+        share = round(sample_size * stratum_bytes / total_bytes)
+        count = min(len(members), max(MIN_PER_STRATUM, share))
+        chosen.extend(rng.sample(members, count))
+    chosen.sort()
+    return chosen
+
+
+def extrapolate(
+    sizes: Sequence[Tuple[str, int]], counted: Dict[int, Optional[int]]
+) -> TokenEstimate:
+    """Estimate the tokens of every file from the counted sample.
+
+    Args:
+        sizes: ``(rel_path, size)`` of every candidate file
+        counted: Exact token count of each sampled index (from
+            ``choose_sample``), or None for files that produced no text
+    """
+    strata: Dict[str, List[int]] = {}
+    for index, (rel_path, _) in enumerate(sizes):
+        strata.setdefault(stratum_key(rel_path), []).append(index)
+
+    files: List[Tuple[str, int]] = []
+    estimates: Dict[int, int] = {}
+    total = 0.0
+    variance = 0.0
+    for members in strata.values():
+        sample = [i for i in members if i in counted]
+        tokens = {i: counted[i] or 0 for i in sample}
+        sample_bytes = sum(sizes[i][1] for i in sample)
+        sample_tokens = sum(tokens.values())
+        if sample_bytes:
+            ratio = sample_tokens / sample_bytes
+            per_file = 0.0
+        else:
+            # Only empty files were sampled: fall back to tokens per file
+            ratio = 0.0
+            per_file = sample_tokens / len(sample) if sample else 0.0
+
+        for i in members:
+            if i in tokens:
+                total += tokens[i]
+                if counted[i] is not None:
+                    estimates[i] = tokens[i]
+            else:
+                value = ratio * sizes[i][1] + per_file
+                total += value
+                estimates[i] = round(value)
+
+        n, size = len(sample), len(members)
+        if 1 < n < size:
+            residuals = [tokens[i] - ratio * sizes[i][1] - per_file for i in sample]
+            s2 = sum(r * r for r in residuals) / (n - 1)
+            variance += size * size * (1 - n / size) / n * s2
+
+    for index, (rel_path, _) in enumerate(sizes):
+        if index in estimates:
+            files.append((rel_path, estimates[index]))
+    return TokenEstimate(
+        files, total, Z_95 * math.sqrt(variance), len(counted), len(sizes)
+    )
+
+
+def estimate_token_counts(
+    sizes: Sequence[Tuple[str, int]],
+    count_sample: Callable[[List[int]], Dict[int, Optional[int]]],
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    seed: int = 0,
+) -> TokenEstimate:
+    """Sample ``sizes``, count the sample with ``count_sample`` and extrapolate"""
+    return extrapolate(sizes, count_sample(choose_sample(sizes, sample_size, seed)))
@@ -0,0 +1,156 @@
+import fnmatch
+import os
+import re
+from typing import TYPE_CHECKING, Any, Iterable, Optional, Pattern, Tuple
+
+if TYPE_CHECKING:
+    from .config import ReadConfig
+
+# Reasons reported by ``FileFilter.select`` for excluded files
+EXCLUDED_DIR = "excluded_dir"
+EXCLUDE_PATTERN = "exclude_pattern"
+EXCLUDED_EXTENSION = "excluded_extension"
+TOO_LARGE = "too_large"
+UNSUPPORTED_EXTENSION = "unsupported_extension"
+# Paths matched by ``FileFilter.ignored`` (reported by the walker)
+GITIGNORE = "gitignore"
+
+_GLOB_CHARS = frozenset("*?[")
+
+
+def compile_name_patterns(patterns: Iterable[str]) -> Optional[Pattern[str]]:
+    """Compile ``exclude_files`` patterns into one regex matched on file names.
+
+    Patterns with glob characters (``*``, ``?``, ``[``) must match the whole
+    name, case-sensitively (``*.log``). Plain patterns keep their historical
+    meaning and match anywhere in the name (``.pyc``, ``Thumbs.db``).
+
+    Returns:
+        The compiled regex, or None when there are no patterns
+    """
+    alternatives = []
+    for pattern in sorted(set(patterns)):
+        if not pattern:
+            continue
+        if _GLOB_CHARS.intersection(pattern):
+            alternatives.append(fnmatch.translate(pattern))
+        else:
+            alternatives.append(f"(?s:.*{re.escape(pattern)}.*)\\Z")
+    if not alternatives:
+        return None
+    return re.compile("|".join(f"(?:{alt})" for alt in alternatives))
+
+
+def compile_gitignore(spec: Any) -> Optional[Pattern[str]]:
+    """Fold a gitignore ``PathSpec`` into a single regex when that is exact.
+
+    Without negated (``!``) patterns a path is ignored as soon as any pattern
+    matches, so the patterns can be joined into one alternation. With negations
+    the last matching pattern wins and None is returned; callers then fall back to
+    ``spec.match_file``.
+    """
+    alternatives = []
+    for pattern in spec.patterns:
+        if pattern.include is None:
+            continue  # Blank line or comment
+        if not pattern.include or pattern.regex is None:
+            return None
+        # Group names may only be defined once in a regex
+        alternatives.append(pattern.regex.pattern.replace("(?P<ps_d>", "("))
+    if not alternatives:
+        return None
+    return re.compile("|".join(f"(?:{alt})" for alt in alternatives))
+
+
+class FileFilter:
+    """All of a ``ReadConfig``'s include/exclude rules, compiled once per run.
+
+    Extensions are kept in frozen sets so that most files are decided by a
+    single set lookup; only files with a wanted extension go through the
+    combined name-pattern regex and the size check. The optional gitignore spec
+    is compiled into one regex as well (see ``compile_gitignore``).
+
+    Args:
+        config: Configuration providing the rules
+        gitignore: Optional ``pathspec.PathSpec`` loaded from a .gitignore file
+    """
+
+    def __init__(self, config: "ReadConfig", gitignore: Any = None) -> None:
+        self.exclude_dirs = frozenset(config.exclude_dirs)
+        self.exclude_extensions = frozenset(
+            ext.lower() for ext in config.exclude_extensions
+        )
+        self.include_extensions = frozenset(config.include_extensions)
+        self.markitdown_extensions = frozenset(
+            (config.markitdown_extensions or ()) if config.use_markitdown else ()
+        )
+        self.max_file_size = config.max_file_size
+        self.name_regex = compile_name_patterns(config.exclude_files)
+
+        self.gitignore = gitignore
+        self.gitignore_regex = (
+            compile_gitignore(gitignore) if gitignore is not None else None
+        )
+
+    def ignored(self, rel_path: str) -> bool:
+        """Whether a path relative to the root is matched by the gitignore spec.
+
+        Directories are passed with a trailing ``/``.
+        """
+        if self.gitignore is None:
+            return False
+        if os.sep != "/":
+            rel_path = rel_path.replace(os.sep, "/")
+        if self.gitignore_regex is not None:
+            return self.gitignore_regex.match(rel_path) is not None
+        return bool(self.gitignore.match_file(rel_path))
+
+    def excluded_dir(self, path: str) -> Optional[str]:
+        """Return the first excluded directory name among the parts of ``path``"""
+        for part in re.split(r"[\\/]", path):
+            if part in self.exclude_dirs:
+                return part
+        return None
+
+    def select(
+        self, path: str, file_size: Optional[int], check_dirs: bool = True
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Decide how a file is read from its path and (optional) size alone.
+
+        Args:
+            path: File path; only the name is used unless ``check_dirs`` is set
+            file_size: Size in bytes, or None to skip the size check
+            check_dirs: Also reject paths inside an excluded directory
+
+        Returns:
+            ``(mode, reason)``: mode is ``"markitdown"`` or ``"text"`` with a None
+            reason, or None with one of the reason constants of this module
+        """
+        if check_dirs and self.excluded_dir(path) is not None:
+            return None, EXCLUDED_DIR
+
+        name = os.path.basename(path)
+        ext = os.path.splitext(name)[1].lower()
+
+        # Fast path: the extension alone settles most files
+        if ext in self.exclude_extensions:
+            return None, EXCLUDED_EXTENSION
+        if ext in self.markitdown_extensions:
+            mode = "markitdown"
+        elif ext in self.include_extensions:
+            mode = "text"
+        else:
+            return None, UNSUPPORTED_EXTENSION
+
+        # Handle macOS @ suffix
+        if self.name_regex is not None and self.name_regex.match(name.rstrip("@")):
+            return None, EXCLUDE_PATTERN
+
+        if (
+            self.max_file_size >= 0
+            and file_size is not None
+            and file_size > self.max_file_size
+        ):
+            return None, TOO_LARGE
+
+        return mode, None
@@ -0,0 +1,186 @@
+import os
+import subprocess
+import threading
+from typing import IO, Collection, Dict, Iterator, List, Optional
+
+from .filters import EXCLUDED_DIR, TOO_LARGE
+from .walker import SkipFunc, WalkEntry
+
+# ``git ls-tree`` modes of entries that are not regular files
+SYMLINK_MODE = "120000"
+SUBMODULE_MODE = "160000"
+
+
+def is_git_repository(path: str) -> bool:
+    """Whether ``path`` is inside a git working tree or is a bare repository"""
+    try:
+        subprocess.run(
+            ["git", "-C", path, "rev-parse", "--git-dir"],
+            check=True,
+            capture_output=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    return True
+
+
+class BlobEntry(WalkEntry):
+    """A file of a git tree, read from its blob instead of the working tree.
+
+    ``path`` is the ``rel_path`` prefixed with the tree's location in the
+    repository; no file exists there. ``mtime_ns`` is always None.
+
+    Attributes:
+        oid: Object id of the blob
+    """
+
+    __slots__ = ("oid",)
+
+    def __init__(self, path: str, rel_path: str, size: int, oid: str) -> None:
+        super().__init__(path, rel_path, os.path.basename(rel_path), size, False)
+        self.oid = oid
+
+
+class GitTree:
+    """A directory of one commit of a local git repository.
+
+    Used to read a repository without a checkout: files are listed with ``git
+    ls-tree -r -l``, which reports blob sizes so ``max_file_size`` needs no
+    object reads, and their content is streamed through a single long-lived
+    ``git cat-file --batch`` process shared by all worker threads.
+
+    Lazy fetching is never triggered: blobs missing from a partial clone are
+    listed without a size (git prints ``BAD``) as long as the repository has no
+    promisor remote configured, which is how ``clone.fetch_commit`` leaves it.
+
+    Args:
+        repo: Repository directory (bare, or a working tree or subdirectory)
+        commit: Commit, branch or tag to read
+    """
+
+    def __init__(self, repo: str, commit: str) -> None:
+        self.repo = repo
+        self.commit = commit
+        self._process: Optional["subprocess.Popen[bytes]"] = None
+        self._lock = threading.Lock()
+
+    def _git(self, *args: str) -> str:
+        return subprocess.run(
+            ["git", "-C", self.repo, *args], check=True, capture_output=True
+        ).stdout.decode()
+
+    def tree_id(self, subdir: str = "") -> Optional[str]:
+        """Object id of the tree at ``subdir`` of the commit, or None if absent.
+
+        ``subdir`` is relative to ``repo``, which may itself be a subdirectory
+        of the working tree.
+        """
+        try:
+            prefix = self._git("rev-parse", "--show-prefix").strip()
+            location = (prefix + subdir.replace(os.sep, "/")).strip("/")
+            oid = self._git("rev-parse", "--verify", f"{self.commit}:{location}")
+            oid = oid.strip()
+            if self._git("cat-file", "-t", oid).strip() != "tree":
+                return None
+        except subprocess.CalledProcessError:
+            return None
+        return oid
+
+    def walk(
+        self,
+        subdir: str = "",
+        exclude_dirs: Collection[str] = (),
+        on_skip: Optional[SkipFunc] = None,
+    ) -> Iterator[BlobEntry]:
+        """Yield the regular files below ``subdir`` in path order.
+
+        Files inside a directory named in ``exclude_dirs`` are skipped, as are
+        symlinks and submodules. Blobs left out by a partial clone's size
+        filter are reported to ``on_skip`` as too large.
+
+        Raises:
+            ValueError: If ``subdir`` is not a directory of the commit
+        """
+        tree = self.tree_id(subdir)
+        if tree is None:
+            raise ValueError(f"Target directory not found: {subdir}")
+        output = subprocess.run(
+            ["git", "-C", self.repo, "ls-tree", "-r", "-l", "-z", tree],
+            check=True,
+            capture_output=True,
+        ).stdout
+
+        records: List[List[str]] = []
+        for record in output.split(b"\0"):
+            if not record:
+                continue
+            meta, _, raw_path = record.partition(b"\t")
+            mode, _, oid, size = meta.decode().split()
+            records.append([os.fsdecode(raw_path), mode, oid, size])
+        records.sort()
+
+        excluded: Dict[str, bool] = {}  # Directory part -> excluded?
+        for rel_path, mode, oid, size in records:
+            if mode in (SYMLINK_MODE, SUBMODULE_MODE):
+                continue
+            rel_dir = rel_path.rpartition("/")[0]
+            if rel_dir:
+                skip = excluded.get(rel_dir)
+                if skip is None:
+                    skip = any(part in exclude_dirs for part in rel_dir.split("/"))
+                    excluded[rel_dir] = skip
+                if skip:
+                    if on_skip is not None:
+                        on_skip(EXCLUDED_DIR, rel_path)
+                    continue
+            if not size.isdigit():
+                # Missing from a partial clone, i.e. over its blob size limit
+                if on_skip is not None:
+                    on_skip(TOO_LARGE, rel_path)
+                continue
+
+            native_rel = rel_path if os.sep == "/" else rel_path.replace("/", os.sep)
+            path = os.path.join(subdir, native_rel) if subdir else native_rel
+            yield BlobEntry(path, native_rel, int(size), oid)
+
+    def read(self, oid: str) -> bytes:
+        """Content of a blob, via the shared ``git cat-file --batch`` process.
+
+        Raises:
+            OSError: If the object is missing or the process died
+        """
+        with self._lock:
+            if self._process is None:
+                self._process = subprocess.Popen(
+                    ["git", "-C", self.repo, "cat-file", "--batch"],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                )
+            stdin: IO[bytes] = self._process.stdin  # type: ignore[assignment]
+            stdout: IO[bytes] = self._process.stdout  # type: ignore[assignment]
+            try:
+                stdin.write(oid.encode("ascii") + b"\n")
+                stdin.flush()
+                header = stdout.readline().split()
+            except (BrokenPipeError, ValueError) as e:
+                raise OSError(f"git cat-file failed: {e}")
+            if len(header) != 3:
+                raise OSError(f"Git object {oid} is missing")
+            size = int(header[2])
+            data = stdout.read(size)
+            stdout.read(1)  # Newline after the content
+            if len(data) != size:
+                raise OSError(f"Git object {oid} was cut short")
+            return data
+
+    def close(self) -> None:
+        """Stop the ``git cat-file`` process, if it was started"""
+        with self._lock:
+            if self._process is not None:
+                assert self._process.stdin is not None
+                self._process.stdin.close()
+                self._process.wait()
+                if self._process.stdout is not None:
+                    self._process.stdout.close()
+                self._process = None
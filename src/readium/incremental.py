@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Bump when the manifest layout or the way blocks are produced changes
+MANIFEST_VERSION = "1"
+
+
+class RunManifest:
+    """Fingerprints and processed output of every file seen by the last run.
+
+    The manifest is a JSON file mapping each relative path to
+    ``[size, mtime_ns, sha256, block]``, where ``sha256`` hashes the source bytes
+    and ``block`` names the processed text stored under ``<manifest>.blocks/``
+    (None for files that turned out to be binary). A file whose size and mtime
+    are unchanged, or whose content hash still matches, is served from its block
+    without being processed again.
+
+    Entries are rebuilt from the files seen in the current run, so deleted files
+    drop out on ``save``; blocks no longer referenced are removed with them.
+    Files a run chose not to read (see ``keep``) retain their previous entry. A
+    change of ``settings`` (anything that alters processed output, such as the
+    MarkItDown configuration) discards the previous run.
+
+    Args:
+        path: Manifest file path
+        settings: Identity of the settings the blocks were produced with
+    """
+
+    def __init__(self, path: Union[str, Path], settings: str) -> None:
+        self.path = Path(path)
+        self.blocks_dir = self.path.with_name(self.path.name + ".blocks")
+        self.settings = settings
+        self.previous: Dict[str, List[Any]] = {}
+        self.entries: Dict[str, List[Any]] = {}
+        self.reused = 0
+        self.processed = 0
+        self._lock = threading.Lock()
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if (
+                data.get("version") == MANIFEST_VERSION
+                and data.get("settings") == settings
+            ):
+                self.previous = data.get("files", {})
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def hash_bytes(data: bytes) -> str:
+        """Content fingerprint used by the manifest"""
+        return hashlib.sha256(data).hexdigest()
+
+    def _block_path(self, key: str) -> Path:
+        return self.blocks_dir / key[:2] / f"{key}.md"
+
+    def lookup(
+        self,
+        rel_path: str,
+        size: Optional[int],
+        mtime_ns: Optional[int],
+        content_hash: Optional[str] = None,
+    ) -> Tuple[bool, Optional[Path]]:
+        """Look up the stored block of an unchanged file.
+
+        A file is unchanged when its size and mtime match the previous run or,
+        if ``content_hash`` is given, when its content hash does. The block is
+        not read here, so unchanged files only cost a read once their text is
+        needed (see ``read_block``).
+
+        Returns:
+            ``(hit, block)``; on a hit ``block`` is the path of the stored text,
+            or None if the file produced no output last time
+        """
+        previous = self.previous.get(rel_path)
+        if previous is None:
+            return False, None
+        if content_hash is not None:
+            if previous[2] != content_hash:
+                return False, None
+        elif size is None or previous[0] != size or previous[1] != mtime_ns:
+            return False, None
+
+        block: Optional[Path] = None
+        if previous[3] is not None:
+            block = self._block_path(previous[3])
+            if not block.is_file():
+                return False, None  # Block lost, process the file again
+
+        with self._lock:
+            self.entries[rel_path] = [size, mtime_ns, previous[2], previous[3]]
+            self.reused += 1
+        return True, block
+
+    def keep(self, rel_path: str) -> None:
+        """Carry the previous entry of a file that this run did not read"""
+        previous = self.previous.get(rel_path)
+        if previous is not None:
+            with self._lock:
+                self.entries.setdefault(rel_path, previous)
+
+    @staticmethod
+    def read_block(block: Path) -> str:
+        """Text stored in a block returned by ``lookup``"""
+        with open(block, "r", encoding="utf-8", newline="") as f:
+            return f.read()
+
+    def record(
+        self,
+        rel_path: str,
+        size: Optional[int],
+        mtime_ns: Optional[int],
+        content_hash: str,
+        content: Optional[str],
+    ) -> None:
+        """Store the result of processing a new or modified file"""
+        key = None
+        if content is not None:
+            encoded = content.encode("utf-8", errors="surrogatepass")
+            key = hashlib.sha256(encoded).hexdigest()
+            block = self._block_path(key)
+            if not block.exists():
+                block.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp_name = tempfile.mkstemp(dir=block.parent, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(encoded)
+                    os.replace(tmp_name, block)
+                except OSError:
+                    if os.path.exists(tmp_name):
+                        os.unlink(tmp_name)
+                    return
+
+        with self._lock:
+            self.entries[rel_path] = [size, mtime_ns, content_hash, key]
+            self.processed += 1
+
+    @property
+    def removed(self) -> int:
+        """Number of files of the previous run that were not seen this run"""
+        return sum(1 for rel_path in self.previous if rel_path not in self.entries)
+
+    def save(self) -> None:
+        """Write the manifest and delete blocks that are no longer referenced"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": MANIFEST_VERSION,
+            "settings": self.settings,
+            "files": self.entries,
+        }
+        fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_name, self.path)
+        except OSError:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            return
+
+        live = {entry[3] for entry in self.entries.values() if entry[3]}
+        for block in self.blocks_dir.glob("*/*.md"):
+            if block.stem not in live:
+                try:
+                    block.unlink()
+                except OSError:
+                    pass
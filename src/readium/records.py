@@ -0,0 +1,108 @@
+from collections.abc import Mapping
+from typing import Any, Callable, Iterator, Optional
+
+# Where a record's content came from
+FILE = "file"  # A file on disk
+GIT = "git"  # A blob read from git objects
+WEB = "web"  # A downloaded web page
+
+
+class FileRecord(Mapping):
+    """One processed file (or web page) as it flows through a run.
+
+    Records are slotted and hold their token count as an integer, so large trees
+    carry no per-file dict. ``content`` is either given up front or produced by
+    ``loader`` on first access (e.g. an unchanged file's text stored by the
+    incremental manifest) and can be dropped again with ``release``.
+
+    Records also read like the dicts earlier versions yielded: ``path`` and
+    ``content`` keys, plus ``title`` and ``source`` when set.
+
+    Attributes:
+        path: Path relative to the processed root (or to the site for web pages)
+        size: Size in bytes of the source file or page, None if unknown
+        tokens: Token count, None until counted
+        kind: Where the content came from: ``FILE``, ``GIT`` or ``WEB``
+        title: Page title (web pages only)
+        source: URL the page was read from (crawled pages only)
+    """
+
+    __slots__ = (
+        "path",
+        "size",
+        "tokens",
+        "kind",
+        "title",
+        "source",
+        "_content",
+        "_loader",
+    )
+
+    def __init__(
+        self,
+        path: str,
+        content: Optional[str] = None,
+        size: Optional[int] = None,
+        kind: str = FILE,
+        tokens: Optional[int] = None,
+        title: Optional[str] = None,
+        source: Optional[str] = None,
+        loader: Optional[Callable[[], str]] = None,
+    ) -> None:
+        if content is None and loader is None:
+            raise ValueError(f"{path}: a record needs content or a loader")
+        self.path = path
+        self.size = size
+        self.tokens = tokens
+        self.kind = kind
+        self.title = title
+        self.source = source
+        self._content = content
+        self._loader = loader
+
+    @property
+    def content(self) -> str:
+        """Processed text, loaded on first access if the record has a loader"""
+        content = self._content
+        if content is None:
+            assert self._loader is not None
+            content = self._content = self._loader()
+        return content
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the content is currently held in memory"""
+        return self._content is not None
+
+    def release(self) -> None:
+        """Drop the content if it can be loaded again"""
+        if self._loader is not None:
+            self._content = None
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "path":
+            return self.path
+        if key == "content":
+            return self.content
+        if key == "title" and self.title is not None:
+            return self.title
+        if key == "source" and self.source is not None:
+            return self.source
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield "path"
+        yield "content"
+        if self.title is not None:
+            yield "title"
+        if self.source is not None:
+            yield "source"
+
+    def __len__(self) -> int:
+        return 2 + (self.title is not None) + (self.source is not None)
+
+    def __repr__(self) -> str:
+        return (
+            f"FileRecord(path={self.path!r}, size={self.size!r}, "
+            f"tokens={self.tokens!r}, kind={self.kind!r})"
+        )
@@ -0,0 +1,182 @@
+import heapq
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type, TypeVar
+
+T = TypeVar("T")
+
+# Pipeline stages timed by ``RunStats``, in pipeline order
+STAGES = (
+    "walk",
+    "filter",
+    "binary_sniff",
+    "read",
+    "markitdown",
+    "tokenize",
+    "render",
+    "write",
+)
+
+# Skip reasons beyond those of ``filters``
+BINARY = "binary"
+CONVERSION_TIMEOUT = "conversion_timeout"
+READ_ERROR = "read_error"
+TOKEN_BUDGET = "token_budget"
+
+
+class _StageTimer:
+    """Context manager adding the time spent in its block to a stage"""
+
+    __slots__ = ("stats", "stage", "start")
+
+    def __init__(self, stats: "RunStats", stage: str) -> None:
+        self.stats = stats
+        self.stage = stage
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Any,
+    ) -> None:
+        self.stats.add_time(self.stage, time.perf_counter() - self.start)
+
+
+class RunStats:
+    """Timings and counters collected during one run with ``profile`` enabled.
+
+    Stage times are summed over all worker threads, so with several workers
+    they can add up to more than ``wall_seconds``. Skipped files are counted by
+    reason: the ``FileFilter`` reasons plus ``gitignore``, ``binary``,
+    ``conversion_timeout``, ``read_error`` and ``token_budget`` (files dropped or
+    never read because of ``max_tokens``). Directories pruned by the walk are
+    counted separately in ``pruned_dirs``, since the files below them are never
+    listed. Files dropped by git's ignore rules when listing the git index are
+    not seen at all and so not counted.
+
+    Args:
+        top_n: Number of slowest files to keep
+    """
+
+    def __init__(self, top_n: int = 10) -> None:
+        self.top_n = top_n
+        self.stage_seconds: Dict[str, float] = {stage: 0.0 for stage in STAGES}
+        self.skipped: Dict[str, int] = {}
+        self.pruned_dirs: Dict[str, int] = {}
+        self.files_seen = 0
+        self.files_processed = 0
+        self.bytes_read = 0
+        self.conversion_errors = 0
+        self.wall_seconds = 0.0
+        self._slowest: List[Tuple[float, str]] = []  # Min-heap of (seconds, path)
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def stage(self, name: str) -> _StageTimer:
+        """Time a block of code as part of stage ``name``"""
+        return _StageTimer(self, name)
+
+    def timed_iter(self, name: str, items: Iterable[T]) -> Iterator[T]:
+        """Yield ``items``, timing the production of each one as stage ``name``"""
+        iterator = iter(items)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_time(name, time.perf_counter() - start)
+                return
+            self.add_time(name, time.perf_counter() - start)
+            yield item
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+
+    def skip(self, reason: str, rel_path: str = "", count: int = 1) -> None:
+        """Count a skipped file, or a pruned directory if ``rel_path`` ends with /"""
+        with self._lock:
+            counters = self.pruned_dirs if rel_path.endswith("/") else self.skipped
+            counters[reason] = counters.get(reason, 0) + count
+
+    def add_bytes(self, count: int) -> None:
+        with self._lock:
+            self.bytes_read += count
+
+    def conversion_error(self) -> None:
+        with self._lock:
+            self.conversion_errors += 1
+
+    def file_done(self, rel_path: str, seconds: float, processed: bool) -> None:
+        """Record the total time spent on one candidate file"""
+        with self._lock:
+            self.files_seen += 1
+            if processed:
+                self.files_processed += 1
+            item = (seconds, rel_path)
+            if len(self._slowest) < self.top_n:
+                heapq.heappush(self._slowest, item)
+            elif item > self._slowest[0]:
+                heapq.heapreplace(self._slowest, item)
+
+    def finish(self) -> None:
+        """Set ``wall_seconds`` to the time elapsed since the run started"""
+        self.wall_seconds = time.perf_counter() - self._started
+
+    @property
+    def slowest_files(self) -> List[Tuple[str, float]]:
+        """``(path, seconds)`` of the slowest files, slowest first"""
+        with self._lock:
+            ranked = sorted(self._slowest, reverse=True)
+        return [(path, seconds) for seconds, path in ranked]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain data suitable for ``json.dump``"""
+        with self._lock:
+            data: Dict[str, Any] = {
+                "wall_seconds": self.wall_seconds,
+                "stage_seconds": dict(self.stage_seconds),
+                "files_seen": self.files_seen,
+                "files_processed": self.files_processed,
+                "bytes_read": self.bytes_read,
+                "conversion_errors": self.conversion_errors,
+                "skipped": dict(sorted(self.skipped.items())),
+                "pruned_dirs": dict(sorted(self.pruned_dirs.items())),
+            }
+        data["slowest_files"] = [
+            {"path": path, "seconds": seconds} for path, seconds in self.slowest_files
+        ]
+        return data
+
+    def format(self) -> str:
+        """Human readable report of the collected statistics"""
+        lines = [
+            f"Run time: {self.wall_seconds:.3f}s",
+            f"Files: {self.files_seen} seen, {self.files_processed} processed, "
+            f"{self.bytes_read:,} bytes read",
+            "Stage times (summed over workers):",
+        ]
+        for stage in STAGES:
+            lines.append(f"  {stage:<13} {self.stage_seconds.get(stage, 0.0):9.3f}s")
+        if self.skipped:
+            lines.append("Skipped files:")
+            for reason, count in sorted(self.skipped.items()):
+                lines.append(f"  {reason:<22} {count}")
+        if self.pruned_dirs:
+            lines.append("Pruned directories:")
+            for reason, count in sorted(self.pruned_dirs.items()):
+                lines.append(f"  {reason:<22} {count}")
+        if self.conversion_errors:
+            lines.append(
+                f"MarkItDown errors (read as plain text): {self.conversion_errors}"
+            )
+        slowest = self.slowest_files
+        if slowest:
+            lines.append("Slowest files:")
+            for path, seconds in slowest:
+                lines.append(f"  {seconds:9.4f}s  {path}")
+        return "\n".join(lines)
@@ -0,0 +1,49 @@
+import functools
+from typing import Any, List, Sequence
+
+# Encoding used for every token count (same as GPT-3.5/4)
+TOKEN_ENCODING = "cl100k_base"
+
+# Texts handed to tiktoken per batch; bounds the token lists held in memory
+BATCH_SIZE = 256
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoding(name: str = TOKEN_ENCODING) -> Any:
+    """Return the tiktoken encoding, building it only once per process"""
+    import tiktoken
+
+    return tiktoken.get_encoding(name)
+
+
+def count_tokens(text: str) -> int:
+    """Count the tokens in a single text.
+
+    Special-token markers such as ``<|endoftext|>`` are counted as plain text
+    instead of raising, since file contents are never prompts.
+    """
+    return len(get_encoding().encode_ordinary(text))
+
+
+def count_tokens_batch(texts: Sequence[str], num_threads: int = 8) -> List[int]:
+    """Count the tokens of many texts using tiktoken's threaded batch encoder.
+
+    tiktoken releases the GIL while encoding, so batches scale across threads.
+    Texts are encoded ``BATCH_SIZE`` at a time and only the counts are kept.
+
+    Args:
+        texts: Texts to count
+        num_threads: Threads used by the batch encoder
+
+    Returns:
+        Token counts, in the same order as ``texts``
+    """
+    encoding = get_encoding()
+    counts: List[int] = []
+    for start in range(0, len(texts), BATCH_SIZE):
+        batch = list(texts[start : start + BATCH_SIZE])
+        encoded = encoding.encode_ordinary_batch(
+            batch, num_threads=max(1, min(num_threads, len(batch)))
+        )
+        counts.extend(len(tokens) for tokens in encoded)
+    return counts
@@ -0,0 +1,205 @@
+import csv
+import io
+import json
+import os
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .estimate import TokenEstimate
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+# Formats accepted by ``render``; "table" is the Rich table, for terminals
+TOKEN_TREE_FORMATS = ("table", "markdown", "json", "csv")
+
+
+class DirectoryTokens:
+    """Token counts of the files directly inside one directory.
+
+    Attributes:
+        path: Directory relative to the processed root ("." for the root)
+        files: ``(file name, tokens)`` pairs sorted by name
+        tokens: Total tokens of ``files``
+    """
+
+    __slots__ = ("path", "files", "tokens")
+
+    def __init__(self, path: str, files: List[Tuple[str, int]], tokens: int) -> None:
+        self.path = path
+        self.files = files
+        self.tokens = tokens
+
+
+class TokenTree:
+    """Token counts of a run aggregated by directory, ready to be rendered.
+
+    Attributes:
+        directories: Directories sorted by path
+        total_files: Number of files counted
+        total_tokens: Sum of the file counts
+        estimate: Sampling estimate the counts come from, if not exact
+    """
+
+    __slots__ = ("directories", "total_files", "total_tokens", "estimate")
+
+    def __init__(
+        self,
+        directories: List[DirectoryTokens],
+        total_files: int,
+        total_tokens: int,
+        estimate: Optional[TokenEstimate] = None,
+    ) -> None:
+        self.directories = directories
+        self.total_files = total_files
+        self.total_tokens = total_tokens
+        self.estimate = estimate
+
+    @property
+    def title(self) -> str:
+        if self.estimate is not None:
+            return "Directory Token Tree (estimated)"
+        return "Directory Token Tree"
+
+    def describe_total(self) -> str:
+        """Total tokens as reported under the table"""
+        if self.estimate is not None:
+            return self.estimate.describe()
+        return f"{self.total_tokens:,}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain data suitable for ``json.dump``"""
+        data: Dict[str, Any] = {
+            "title": self.title,
+            "total_files": self.total_files,
+            "total_tokens": self.total_tokens,
+        }
+        if self.estimate is not None:
+            data["estimate"] = {
+                "total": round(self.estimate.total),
+                "margin": round(self.estimate.margin),
+                "sampled": self.estimate.sampled,
+                "population": self.estimate.population,
+            }
+        data["directories"] = [
+            {
+                "path": directory.path,
+                "tokens": directory.tokens,
+                "files": [
+                    {"name": name, "tokens": tokens} for name, tokens in directory.files
+                ],
+            }
+            for directory in self.directories
+        ]
+        return data
+
+
+def build_token_tree(
+    path_tokens: Iterable[Tuple[str, int]], estimate: Optional[TokenEstimate] = None
+) -> TokenTree:
+    """Group ``(rel_path, tokens)`` pairs by directory.
+
+    Nothing is rendered here; see ``render`` and ``render_rich``.
+    """
+    dir_files: Dict[str, List[Tuple[str, int]]] = defaultdict(list)
+    total_files = 0
+    total_tokens = 0
+    for path, tokens in path_tokens:
+        dir_path, name = os.path.split(path)
+        dir_files[dir_path or "."].append((name, tokens))
+        total_files += 1
+        total_tokens += tokens
+    directories = []
+    for dir_path in sorted(dir_files):
+        files = dir_files[dir_path]
+        files.sort()
+        directories.append(
+            DirectoryTokens(dir_path, files, sum(tokens for _, tokens in files))
+        )
+    return TokenTree(directories, total_files, total_tokens, estimate)
+
+
+def render_markdown(tree: TokenTree) -> str:
+    """Markdown table, as included in the output's tree section"""
+    lines = [
+        f"# {tree.title}",
+        "",
+        "| Directory | Files | Token Count |",
+        "|-----------|-------|------------|",
+    ]
+    for directory in tree.directories:
+        lines.append(
+            f"| **{directory.path}** | {len(directory.files)} | {directory.tokens:,} |"
+        )
+        lines.extend(f"| └─ {name} | | {tokens} |" for name, tokens in directory.files)
+    lines.append("")
+    lines.append(f"**Total Files:** {tree.total_files}  ")
+    lines.append(f"**Total Tokens:** {tree.describe_total()}")
+    return "\n".join(lines) + "\n"
+
+
+def render_json(tree: TokenTree) -> str:
+    """JSON document of ``TokenTree.to_dict``"""
+    return json.dumps(tree.to_dict(), indent=2)
+
+
+def render_csv(tree: TokenTree) -> str:
+    """One ``directory,file,tokens`` row per file"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(["directory", "file", "tokens"])
+    for directory in tree.directories:
+        for name, tokens in directory.files:
+            writer.writerow([directory.path, name, tokens])
+    return buffer.getvalue()
+
+
+def render_rich(tree: TokenTree, console: Optional["Console"] = None) -> None:
+    """Print the tree as a Rich table (imports Rich on first use)"""
+    from rich.table import Table
+
+    if console is None:
+        from rich.console import Console
+
+        console = Console()
+    console.print(f"Processed {tree.total_files} files.")
+    table = Table(title=tree.title)
+    table.add_column("Directory", style="cyan")
+    table.add_column("Files", style="green")
+    table.add_column("Token Count", style="yellow", justify="right")
+    for directory in tree.directories:
+        table.add_row(
+            f"[bold]{directory.path}[/bold]",
+            str(len(directory.files)),
+            f"{directory.tokens:,}",
+        )
+        for name, tokens in directory.files:
+            table.add_row(f"└─ {name}", "", str(tokens))
+    console.print(table)
+    console.print(f"[bold]Total Files:[/bold] {tree.total_files}")
+    console.print(f"[bold]Total Tokens:[/bold] {tree.describe_total()}")
+
+
+_RENDERERS: Dict[str, Callable[[TokenTree], str]] = {
+    "markdown": render_markdown,
+    "json": render_json,
+    "csv": render_csv,
+}
+
+
+def render(tree: TokenTree, token_format: str) -> str:
+    """Render ``tree`` as text; "table" falls back to Markdown off a terminal
+
+    Raises:
+        ValueError: On an unknown format
+    """
+    if token_format == "table":
+        token_format = "markdown"
+    try:
+        renderer = _RENDERERS[token_format]
+    except KeyError:
+        raise ValueError(
+            f"Unknown token tree format {token_format!r}; "
+            f"expected one of {', '.join(TOKEN_TREE_FORMATS)}"
+        )
+    return renderer(tree)
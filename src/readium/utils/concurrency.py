@@ -0,0 +1,44 @@
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Callable, Deque, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def ordered_map(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    workers: int,
+    executor: Optional[Executor] = None,
+) -> Iterator[R]:
+    """Apply ``func`` to ``items`` on a thread pool, yielding results in input order.
+
+    At most ``workers * 4`` items are in flight at any time, so ``items`` may be
+    a lazy iterator over a very large tree without queueing everything up front.
+
+    Args:
+        func: Function applied to every item
+        items: Items to process
+        workers: Number of worker threads; ``1`` runs everything inline
+        executor: Pool to submit to instead of a new one of ``workers`` threads,
+            shared with other callers (it is not shut down)
+    """
+    if workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    if executor is None:
+        with ThreadPoolExecutor(max_workers=workers) as own_executor:
+            yield from ordered_map(func, items, workers, own_executor)
+        return
+
+    window = workers * 4
+    pending: Deque[Future] = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
@@ -1,14 +1,35 @@
-import rich.errors
-from rich.console import Console
+from typing import TYPE_CHECKING, Any, Optional, Union
 
+if TYPE_CHECKING:
+    from rich.console import Console
 
-def print_error(console: Console, message: str) -> None:
+
+class LazyConsole:
+    """Stand-in for a Rich ``Console`` that creates it on first use.
+
+    Importing Rich is a noticeable part of the CLI start-up time, and commands
+    such as ``--help`` never print through it.
+    """
+
+    _console: Optional["Console"] = None
+
+    def __getattr__(self, name: str) -> Any:
+        if self._console is None:
+            from rich.console import Console
+
+            self._console = Console()
+        return getattr(self._console, name)
+
+
+def print_error(console: Union["Console", LazyConsole], message: str) -> None:
     """Safely print error messages that might contain markup-like content.
 
     Args:
         console: Rich console instance for output
         message: Error message that might contain markup-like content
     """
+    import rich.errors
+
     try:
         console.print(f"[red]Error: {message}[/red]")
     except rich.errors.MarkupError:
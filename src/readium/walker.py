@@ -0,0 +1,235 @@
+import os
+import stat
+import subprocess
+from typing import Callable, Collection, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .filters import EXCLUDED_DIR, GITIGNORE
+
+# Called with a path relative to the walk root (directories end with "/");
+# returning True drops the entry (and everything below a directory)
+IgnoreFunc = Callable[[str], bool]
+# Called with the reason and relative path (directories end with "/") of a skip
+SkipFunc = Callable[[str, str], None]
+
+
+class WalkEntry:
+    """A file found by ``walk_files``.
+
+    Attributes:
+        path: Full path of the file (root joined with ``rel_path``)
+        rel_path: Path relative to the walk root, using ``os.sep``
+        name: File name
+        size: Size in bytes, or None when the entry was not stat'ed
+        mtime_ns: Modification time in nanoseconds, or None like ``size``
+        is_symlink: Whether the entry itself is a symbolic link
+    """
+
+    __slots__ = ("path", "rel_path", "name", "size", "mtime_ns", "is_symlink")
+
+    def __init__(
+        self,
+        path: str,
+        rel_path: str,
+        name: str,
+        size: Optional[int],
+        is_symlink: bool,
+        mtime_ns: Optional[int] = None,
+    ) -> None:
+        self.path = path
+        self.rel_path = rel_path
+        self.name = name
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.is_symlink = is_symlink
+
+    def __repr__(self) -> str:
+        return f"WalkEntry({self.rel_path!r}, size={self.size})"
+
+
+def walk_files(
+    root: str,
+    exclude_dirs: Collection[str] = (),
+    ignore: Optional[IgnoreFunc] = None,
+    with_stat: bool = True,
+    log: Optional[Callable[[str], None]] = None,
+    on_skip: Optional[SkipFunc] = None,
+) -> Iterator[WalkEntry]:
+    """Yield the files below ``root``, pruning excluded directories early.
+
+    The walk is built on ``os.scandir`` and works on plain strings. Directories
+    named in ``exclude_dirs`` or matched by ``ignore`` are never opened. File
+    order matches a top-down ``os.walk``: a directory's files first, then its
+    subdirectories depth-first in listing order. Symlinked directories are not
+    followed, and unreadable directories are skipped.
+
+    Args:
+        root: Directory to walk
+        exclude_dirs: Directory names that are skipped wherever they appear
+        ignore: Optional predicate on relative paths (see ``IgnoreFunc``)
+        with_stat: Fill ``size`` and ``mtime_ns`` from the entry's ``stat`` result
+        log: Optional callback receiving a message for every ignored path
+        on_skip: Optional callback for every pruned directory and ignored file
+
+    Yields:
+        A ``WalkEntry`` per file
+    """
+    root = os.fspath(root)
+    # (absolute directory, its path relative to root with a trailing separator)
+    stack: List[Tuple[str, str]] = [(root, "")]
+    while stack:
+        directory, rel_dir = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            continue
+
+        subdirs: List[Tuple[str, str]] = []
+        for entry in entries:
+            name = entry.name
+            rel_path = rel_dir + name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+
+            if is_dir:
+                if name in exclude_dirs:
+                    if on_skip is not None:
+                        on_skip(EXCLUDED_DIR, rel_path + "/")
+                    continue
+                if entry.is_symlink():
+                    continue
+                if ignore is not None and ignore(rel_path + "/"):
+                    if log is not None:
+                        log(f"Ignoring directory via .gitignore: {rel_path}")
+                    if on_skip is not None:
+                        on_skip(GITIGNORE, rel_path + "/")
+                    continue
+                subdirs.append((entry.path, rel_path + os.sep))
+                continue
+
+            if ignore is not None and ignore(rel_path):
+                if log is not None:
+                    log(f"Ignoring file via .gitignore: {rel_path}")
+                if on_skip is not None:
+                    on_skip(GITIGNORE, rel_path)
+                continue
+
+            size: Optional[int] = None
+            mtime_ns: Optional[int] = None
+            if with_stat:
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue  # Broken symlink or file removed meanwhile
+                size, mtime_ns = st.st_size, st.st_mtime_ns
+
+            yield WalkEntry(
+                entry.path, rel_path, name, size, entry.is_symlink(), mtime_ns
+            )
+
+        stack.extend(reversed(subdirs))
+
+
+def find_git_root(path: str, max_up: int = 0) -> Optional[str]:
+    """Return the git working tree containing ``path``, looking up to ``max_up``
+    parent directories, or None if there is no ``.git`` entry that close.
+
+    ``.git`` may be a directory or, for worktrees and submodules, a file.
+    """
+    current = os.path.abspath(path)
+    for _ in range(max_up + 1):
+        if os.path.exists(os.path.join(current, ".git")):
+            return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            break
+        current = parent
+    return None
+
+
+def list_git_files(
+    root: str, include_ignored: bool = False, paths: Optional[Sequence[str]] = None
+) -> Optional[List[str]]:
+    """List the files git knows below ``root``, relative to it.
+
+    Runs ``git ls-files -z --cached --others`` with ``--exclude-standard`` unless
+    ``include_ignored`` is set, so tracked files and untracked files not ignored
+    by any ``.gitignore``, ``.git/info/exclude`` or global excludes file are
+    returned, sorted by path. ``paths`` (relative to ``root``) limits the
+    listing to those files and the files below those directories.
+
+    Returns:
+        The relative paths, or None when git is unavailable or fails
+    """
+    if paths is not None and not paths:
+        return []
+    cmd = ["git", "ls-files", "-z", "--cached", "--others"]
+    if not include_ignored:
+        cmd.append("--exclude-standard")
+    if paths is not None:
+        cmd.append("--")
+        cmd.extend(":(literal)" + path for path in paths)
+    try:
+        result = subprocess.run(cmd, cwd=root, capture_output=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    listed: List[str] = []
+    for raw in result.stdout.split(b"\0"):
+        if not raw:
+            continue
+        rel_path = os.fsdecode(raw)
+        # Unmerged files are listed once per conflict stage
+        if not listed or listed[-1] != rel_path:
+            listed.append(rel_path)
+    listed.sort()
+    return listed
+
+
+def walk_git_files(
+    root: str,
+    rel_paths: List[str],
+    exclude_dirs: Collection[str] = (),
+    with_stat: bool = True,
+    on_skip: Optional[SkipFunc] = None,
+) -> Iterator[WalkEntry]:
+    """Yield ``WalkEntry`` objects for paths listed by ``list_git_files``.
+
+    Files inside a directory named in ``exclude_dirs`` are skipped (and passed
+    to ``on_skip``), as are entries that are not regular files (submodules,
+    symlinks to directories) or that no longer exist in the working tree.
+    """
+    root = os.fspath(root)
+    excluded: Dict[str, bool] = {}  # Directory part -> excluded?
+    for rel_path in rel_paths:
+        rel_dir, _, name = rel_path.rpartition("/")
+        if rel_dir:
+            skip = excluded.get(rel_dir)
+            if skip is None:
+                skip = any(part in exclude_dirs for part in rel_dir.split("/"))
+                excluded[rel_dir] = skip
+            if skip:
+                if on_skip is not None:
+                    on_skip(EXCLUDED_DIR, rel_path)
+                continue
+
+        native_rel = rel_path if os.sep == "/" else rel_path.replace("/", os.sep)
+        path = os.path.join(root, native_rel)
+        try:
+            st = os.lstat(path)
+            is_symlink = stat.S_ISLNK(st.st_mode)
+            if is_symlink:
+                st = os.stat(path)
+        except OSError:
+            continue  # Deleted from the working tree, or a broken symlink
+        if not stat.S_ISREG(st.st_mode):
+            continue
+
+        if with_stat:
+            yield WalkEntry(
+                path, native_rel, name, st.st_size, is_symlink, st.st_mtime_ns
+            )
+        else:
+            yield WalkEntry(path, native_rel, name, None, is_symlink)
@@ -0,0 +1,557 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import stat
+import struct
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Collection, Dict, List, Optional, Set, Tuple, Union
+
+from .core import Readium, format_file_block
+from .records import FileRecord
+from .utils.concurrency import ordered_map
+from .walker import WalkEntry, walk_files
+
+# (size, mtime_ns, processed file or None, tokens) of a file in a watched tree
+FileState = Tuple[Optional[int], Optional[int], Optional[FileRecord], int]
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+# Reported instead of paths when events were lost: every file may have changed.
+# No real path contains a NUL byte.
+RESCAN = "\0rescan"
+
+
+class PollingWatcher:
+    """Detect changes by comparing stat snapshots of the tree every ``interval``.
+
+    Args:
+        root: Directory to watch
+        exclude_dirs: Directory names that are not watched
+        interval: Seconds between two snapshots
+    """
+
+    def __init__(
+        self, root: str, exclude_dirs: Collection[str] = (), interval: float = 1.0
+    ) -> None:
+        self.root = root
+        self.exclude_dirs = exclude_dirs
+        self.interval = interval
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self) -> Dict[str, Tuple[Optional[int], Optional[int]]]:
+        return {
+            entry.path: (entry.size, entry.mtime_ns)
+            for entry in walk_files(self.root, exclude_dirs=self.exclude_dirs)
+        }
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[Set[str]]:
+        """Block until files change; return their paths, or None on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self.interval
+            if deadline is not None:
+                delay = min(delay, deadline - time.monotonic())
+                if delay <= 0:
+                    return None
+            time.sleep(delay)
+            snapshot = self._take_snapshot()
+            changed = {
+                path
+                for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changed:
+                return changed
+
+    def close(self) -> None:
+        """Nothing to release for polling"""
+
+
+class InotifyWatcher:
+    """Recursive watch of a directory tree with Linux inotify (through ctypes).
+
+    inotify watches single directories, so every directory below ``root`` gets
+    its own watch and directories created later are added as they appear.
+
+    Args:
+        root: Directory to watch
+        exclude_dirs: Directory names that are not watched
+
+    Raises:
+        OSError: inotify is not available on this system
+    """
+
+    def __init__(self, root: str, exclude_dirs: Collection[str] = ()) -> None:
+        libc_name = ctypes.util.find_library("c")
+        if not hasattr(os, "uname") or os.uname().sysname != "Linux":
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(libc_name or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_CLOEXEC | IN_NONBLOCK)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 failed: {os.strerror(errno)}")
+        self.root = root
+        self.exclude_dirs = exclude_dirs
+        self._dirs: Dict[int, str] = {}  # Watch descriptor -> directory
+        self._add_tree(root)
+
+    def _add_watch(self, directory: str) -> None:
+        wd = self._libc.inotify_add_watch(
+            self.fd, os.fsencode(directory), ctypes.c_uint32(WATCH_MASK)
+        )
+        if wd >= 0:
+            self._dirs[wd] = directory
+
+    def _add_tree(self, top: str) -> None:
+        self._add_watch(top)
+        stack = [top]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if (
+                            entry.is_dir(follow_symlinks=False)
+                            and entry.name not in self.exclude_dirs
+                        ):
+                            self._add_watch(entry.path)
+                            stack.append(entry.path)
+            except OSError:
+                continue
+
+    def _read_events(self) -> Set[str]:
+        changed: Set[str] = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                changed.add(RESCAN)  # Events were lost; treat all as changed
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self._dirs[wd]
+                continue
+            path = os.path.join(directory, name) if name else directory
+            changed.add(path)
+            if (
+                mask & IN_ISDIR
+                and mask & (IN_CREATE | IN_MOVED_TO)
+                and name not in self.exclude_dirs
+            ):
+                self._add_tree(path)
+        return changed
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[Set[str]]:
+        """Block until files change; return their paths, or None on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None
+            if deadline is not None:
+                remaining = max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                return None
+            changed = self._read_events()
+            if changed:
+                return changed
+
+    def close(self) -> None:
+        """Release the inotify file descriptor"""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def create_watcher(
+    root: str, exclude_dirs: Collection[str] = (), poll_interval: float = 1.0
+) -> Union[InotifyWatcher, PollingWatcher]:
+    """Use inotify where available and fall back to polling elsewhere"""
+    try:
+        return InotifyWatcher(root, exclude_dirs)
+    except (OSError, AttributeError):
+        return PollingWatcher(root, exclude_dirs, interval=poll_interval)
+
+
+class WatchSession:
+    """In-memory state of a watched tree and the combined output built from it.
+
+    The first ``refresh`` enumerates the tree with the same walk and filters as
+    a one-shot run (``.gitignore`` or git index, ``ReadConfig`` rules). Later
+    refreshes given the changed paths only look at those: changed files are
+    read, converted and tokenized again, deleted ones dropped and new ones
+    inserted where the walk would have put them. Blocks, token counts and the
+    tree of all other files are kept from the previous refresh.
+
+    Args:
+        reader: Configured reader used to enumerate and load files
+        path: Directory to watch (``target_dir`` is applied)
+        output: Combined output file, rewritten atomically on each change
+    """
+
+    def __init__(
+        self, reader: Readium, path: Union[str, Path], output: Union[str, Path]
+    ) -> None:
+        self.reader = reader
+        self.path = reader.resolve_target(Path(path))
+        self.output = os.path.abspath(output)
+        # rel path -> state, in walk order
+        self.files: Dict[str, FileState] = {}
+        self._walked = False
+        self._dirs: Set[str] = set()  # Directories holding known files
+
+    def relevant(self, paths: Collection[str]) -> Set[str]:
+        """Drop the paths whose change cannot affect the output.
+
+        Those are our own output and its temporary files, paths outside the
+        tree, and new paths the walk would skip (excluded directories,
+        ``.gitignore`` rules or git index). Known files and the directories
+        holding them are kept, so that deletions are seen.
+        """
+        root = str(self.path)
+        output_dir = os.path.dirname(self.output)
+        kept: Set[str] = set()
+        unknown: Dict[str, str] = {}  # rel path -> path
+        for path in paths:
+            if path == RESCAN:
+                kept.add(path)
+                continue
+            path = os.path.abspath(path)
+            # Our own writes (temp file + rename) must not trigger a refresh
+            if path == self.output or (
+                os.path.dirname(path) == output_dir
+                and os.path.basename(path).startswith(".readium-")
+            ):
+                continue
+            rel_path = os.path.relpath(path, root)
+            if rel_path == os.curdir or rel_path.split(os.sep)[0] == os.pardir:
+                continue
+            if rel_path in self.files or rel_path in self._dirs:
+                kept.add(path)
+            else:
+                unknown[rel_path] = path
+        if unknown:
+            selected = self.reader.select_candidates(self.path, unknown.keys())
+            kept.update(unknown[rel_path] for rel_path in selected)
+        return kept
+
+    def refresh(self, dirty: Optional[Collection[str]] = None) -> int:
+        """Bring the state up to date.
+
+        Args:
+            dirty: Paths reported changed; only those are looked at, and they
+                are reloaded even if size and mtime match. None walks the whole
+                tree and reloads the files whose size or mtime changed, as does
+                the first refresh. ``RESCAN`` among the paths walks the tree and
+                reloads every file. A ``.gitignore`` change, a new directory or
+                a first file in a directory walks the tree as well.
+
+        Returns:
+            Number of files whose processed output was added, changed or removed
+        """
+        reader = self.reader
+        reader.timed_out_files = []
+        previous = self.files
+        plan = None
+        if dirty is not None and self._walked and RESCAN not in dirty:
+            plan = self._plan_update(dirty)
+        if plan is None:
+            plan = self._plan_walk(dirty or ())
+            self._walked = True
+        order, to_load = plan
+
+        results = list(ordered_map(reader.load_file, to_load, reader.worker_count()))
+        texts = [r.content for r in results if r]
+        counts = iter(reader.count_tokens(texts) if texts else [])
+        loaded: Dict[str, FileState] = {}
+        for entry, result in zip(to_load, results):
+            if result is None and entry.rel_path in reader.timed_out_files:
+                # Without an mtime the file is retried on the next refresh
+                loaded[entry.rel_path] = (entry.size, None, None, 0)
+                continue
+            tokens = next(counts) if result else 0
+            if result is not None:
+                result.tokens = tokens
+            loaded[entry.rel_path] = (entry.size, entry.mtime_ns, result, tokens)
+
+        current: Dict[str, FileState] = {}
+        for rel_path in order:
+            state = loaded.get(rel_path) or previous.get(rel_path)
+            if state is not None:
+                current[rel_path] = state
+
+        # Only files whose processed output changed count (excluded files and
+        # touched-but-identical files do not)
+        changed = sum(
+            1
+            for rel_path, state in loaded.items()
+            if state[2] != (previous[rel_path][2] if rel_path in previous else None)
+        )
+        changed += sum(
+            1
+            for rel_path, state in previous.items()
+            if rel_path not in current and state[2] is not None
+        )
+        if current.keys() != previous.keys():
+            self._dirs = {
+                os.path.dirname(rel_path) for rel_path in current if os.sep in rel_path
+            }
+            for rel_dir in list(self._dirs):
+                while os.sep in rel_dir:
+                    rel_dir = os.path.dirname(rel_dir)
+                    self._dirs.add(rel_dir)
+        self.files = current
+        return changed
+
+    def _plan_walk(self, dirty: Collection[str]) -> Tuple[List[str], List[WalkEntry]]:
+        """Walk the tree: (every rel path in walk order, the files to load)"""
+        reader = self.reader
+        previous = self.files
+        reload_all = RESCAN in dirty
+        order: List[str] = []
+        to_load: List[WalkEntry] = []
+
+        for entry in reader.iter_candidates(self.path):
+            if os.path.abspath(entry.path) == self.output:
+                continue  # Never include our own output
+            if entry.mtime_ns is None:
+                try:
+                    st = os.stat(entry.path)
+                except OSError:
+                    continue
+                entry.size, entry.mtime_ns = st.st_size, st.st_mtime_ns
+            order.append(entry.rel_path)
+            known = previous.get(entry.rel_path)
+            if (
+                known is None
+                or known[0] != entry.size
+                or known[1] != entry.mtime_ns
+                or reload_all
+                or entry.path in dirty
+            ):
+                to_load.append(entry)
+        return order, to_load
+
+    def _plan_update(
+        self, dirty: Collection[str]
+    ) -> Optional[Tuple[List[str], List[WalkEntry]]]:
+        """Look at ``dirty`` paths only: (every rel path in walk order, the
+        files to load), or None when the tree has to be walked instead"""
+        root = str(self.path)
+        previous = self.files
+        # Files whose last load timed out are retried
+        rel_paths = {rel for rel, state in previous.items() if state[1] is None}
+        for path in dirty:
+            path = os.path.abspath(path)
+            if path == self.output:
+                continue
+            rel_path = os.path.relpath(path, root)
+            if rel_path == os.curdir or rel_path.split(os.sep)[0] == os.pardir:
+                continue
+            if os.path.basename(rel_path) == ".gitignore":
+                return None  # The set of files itself may have changed
+            rel_paths.add(rel_path)
+
+        removed: Set[str] = set()
+        found: Dict[str, WalkEntry] = {}
+        for rel_path in rel_paths:
+            path = os.path.join(root, rel_path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                st = None
+            if st is not None and stat.S_ISDIR(st.st_mode):
+                if rel_path not in self._dirs:
+                    return None  # New directory: its files are unknown
+                continue
+            if st is None or not stat.S_ISREG(st.st_mode):
+                # Deleted, or a directory that held known files
+                prefix = rel_path + os.sep
+                removed.update(
+                    rel for rel in previous if rel == rel_path or rel.startswith(prefix)
+                )
+                continue
+            found[rel_path] = WalkEntry(
+                path,
+                rel_path,
+                os.path.basename(rel_path),
+                st.st_size,
+                os.path.islink(path),
+                st.st_mtime_ns,
+            )
+
+        new = [rel_path for rel_path in found if rel_path not in previous]
+        if new:
+            for rel_path in set(new) - self.reader.select_candidates(self.path, new):
+                del found[rel_path]
+            new = [rel_path for rel_path in new if rel_path in found]
+        order: Optional[List[str]] = [
+            rel_path for rel_path in previous if rel_path not in removed
+        ]
+        if new and order is not None:
+            order = self._insert(order, new)
+        if order is None:
+            return None
+        return order, list(found.values())
+
+    def _insert(self, order: List[str], new: List[str]) -> Optional[List[str]]:
+        """Place ``new`` files among ``order`` as the walk would, or return None
+        when that takes a walk"""
+        if self.reader.git_listed:
+            # The git index is listed sorted by path
+            return sorted(order + new, key=lambda rel: rel.replace(os.sep, "/"))
+
+        # A directory's files are walked together, in listing order
+        blocks: Dict[str, List[str]] = {}
+        for rel_path in order:
+            blocks.setdefault(os.path.dirname(rel_path), []).append(rel_path)
+        for rel_dir in {os.path.dirname(rel_path) for rel_path in new}:
+            if rel_dir not in blocks:
+                return None
+            try:
+                with os.scandir(os.path.join(str(self.path), rel_dir)) as it:
+                    listing = {entry.name: i for i, entry in enumerate(it)}
+            except OSError:
+                return None
+            files = blocks[rel_dir] + [
+                rel_path for rel_path in new if os.path.dirname(rel_path) == rel_dir
+            ]
+            files.sort(key=lambda rel: listing.get(os.path.basename(rel), len(listing)))
+            blocks[rel_dir] = files
+
+        merged: List[str] = []
+        for rel_path in order:
+            rel_dir = os.path.dirname(rel_path)
+            if rel_dir in blocks:
+                merged.extend(blocks.pop(rel_dir))
+        return merged
+
+    def render(self) -> Tuple[str, str, str]:
+        """Build (summary, tree, content) exactly as a one-shot run would"""
+        reader = self.reader
+        records = [state[2] for state in self.files.values() if state[2] is not None]
+        token_tree = ""
+        if records:
+            # Every record carries its count, so nothing is tokenized here
+            token_tree = reader.generate_token_tree(records, self.path)
+        summary, tree = reader.render_header(
+            self.path, [record.path for record in records], token_tree
+        )
+        return summary, tree, "\n\n".join(format_file_block(r) for r in records)
+
+    def write(self) -> None:
+        """Write the combined output, replacing the previous file atomically"""
+        summary, tree, content = self.render()
+        output_dir = os.path.dirname(self.output)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=output_dir, prefix=".readium-", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+                f.write(f"Summary:\n{summary}\n\n")
+                f.write(f"Tree:\n{tree}\n\n")
+                f.write(f"Content:\n{content}")
+            os.replace(tmp_name, self.output)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+
+def watch(
+    reader: Readium,
+    path: Union[str, Path],
+    output: Union[str, Path],
+    debounce: float = 0.3,
+    poll_interval: float = 1.0,
+    on_update: Optional[Callable[[int], None]] = None,
+    stop: Optional[threading.Event] = None,
+) -> None:
+    """Keep ``output`` up to date with the files below ``path`` until stopped.
+
+    The output is written once at start and again after every burst of changes,
+    once no further change arrived for ``debounce`` seconds.
+
+    Args:
+        reader: Configured reader used to enumerate and load files
+        path: Directory to watch
+        output: Combined output file
+        debounce: Quiet period in seconds before changes are applied
+        poll_interval: Snapshot interval when inotify is not available
+        on_update: Called with the number of changed files after each write
+        stop: Event that ends the loop when set (otherwise runs until interrupted)
+    """
+    session = WatchSession(reader, path, output)
+    count = session.refresh()
+    session.write()
+    if on_update is not None:
+        on_update(count)
+
+    watcher = create_watcher(
+        str(session.path), reader.config.exclude_dirs, poll_interval=poll_interval
+    )
+
+    try:
+        while stop is None or not stop.is_set():
+            dirty = session.relevant(
+                watcher.wait(0.5 if stop is not None else None) or set()
+            )
+            if not dirty:
+                continue
+            # Debounce: wait for the burst of events to settle
+            while True:
+                more = watcher.wait(debounce)
+                if more is None:
+                    break
+                dirty |= session.relevant(more)
+            count = session.refresh(dirty)
+            if count:
+                session.write()
+                if on_update is not None:
+                    on_update(count)
+    finally:
+        watcher.close()
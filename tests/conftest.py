@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path_factory, monkeypatch):
+    """Keep every test's on-disk cache out of the user's real cache directory"""
+    cache_dir = tmp_path_factory.mktemp("readium-cache")
+    monkeypatch.setenv("READIUM_CACHE_DIR", str(cache_dir))
+    return cache_dir
@@ -0,0 +1,145 @@
+import shutil
+import subprocess
+
+import pytest
+from click.testing import CliRunner
+
+from readium import ReadConfig, Readium
+from readium.batch import SUMMARY_FILE, output_name, parse_sources, run_batch
+from readium.cli import main
+
+
+@pytest.fixture
+def sources(tmp_path):
+    """Two local directories and a ``file://`` git URL"""
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    alpha = tmp_path / "alpha"
+    alpha.mkdir()
+    (alpha / "a.md").write_text("# Alpha")
+    (alpha / "b.txt").write_text("alpha notes")
+    beta = tmp_path / "beta dir"
+    beta.mkdir()
+    (beta / "c.md").write_text("# Beta")
+
+    work = tmp_path / "work"
+    work.mkdir()
+    (work / "README.md").write_text("# Remote")
+    subprocess.run(["git", "init", "-q", "-b", "main", str(work)], check=True)
+    for args in (
+        ["add", "-A"],
+        ["-c", "user.name=t", "-c", "user.email=t@t", "commit", "-qm", "init"],
+    ):
+        subprocess.run(["git", "-C", str(work), *args], check=True)
+    bare = tmp_path / "remote.git"
+    subprocess.run(
+        ["git", "clone", "-q", "--bare", str(work), str(bare)],
+        check=True,
+        capture_output=True,
+    )
+    subprocess.run(
+        ["git", "-C", str(bare), "config", "uploadpack.allowFilter", "true"],
+        check=True,
+    )
+    return [str(alpha), str(beta), bare.as_uri()]
+
+
+def test_parse_sources():
+    lines = [
+        "# Docs to digest",
+        "",
+        "./docs",
+        "'/srv/my docs'",
+        "https://github.com/org/repo.git v2.0  # Pinned",
+        "   # Indented comment",
+        "https://example.com/page#section",
+    ]
+    assert parse_sources(lines) == [
+        ("./docs", None),
+        ("/srv/my docs", None),
+        ("https://github.com/org/repo.git", "v2.0"),
+        ("https://example.com/page#section", None),
+    ]
+    with pytest.raises(ValueError, match="Line 2"):
+        parse_sources(["a", "b c d"])
+
+
+def test_output_name():
+    assert output_name(1, "https://github.com/org/repo.git") == "001-org-repo.md"
+    assert output_name(12, "/srv/my docs/") == "012-my-docs.md"
+    assert output_name(3, "https://example.com/docs/") == "003-example.com-docs.md"
+
+
+def test_run_batch_writes_one_output_per_source(sources, tmp_path):
+    out = tmp_path / "out"
+    missing = str(tmp_path / "missing")
+    done = []
+    reader = Readium(ReadConfig())
+    report = run_batch(
+        reader,
+        sources + [missing],
+        out,
+        jobs=2,
+        fetch_jobs=1,
+        on_done=done.append,
+    )
+
+    assert [result.source for result in report.results] == sources + [missing]
+    assert sorted(result.source for result in done) == sorted(sources + [missing])
+    alpha, beta, remote, failed = report.results
+    assert (alpha.files, beta.files, remote.files) == (2, 1, 1)
+    assert "# Alpha" in alpha.output.read_text()
+    assert "# Beta" in beta.output.read_text()
+    assert "# Remote" in remote.output.read_text()
+    assert report.failed == [failed]
+    assert "Path does not exist" in failed.error
+    assert not failed.output.exists()
+    # The shared pools are released with the batch
+    assert reader.executor is None and reader.fetch_slots is None
+
+    summary = (out / SUMMARY_FILE).read_text()
+    assert "Sources: 4 (3 succeeded, 1 failed)" in summary
+    assert "Files processed: 4" in summary
+    assert f"FAILED  {missing}" in summary
+
+
+def test_spawned_readers_share_converter_and_caches(tmp_path):
+    config = ReadConfig(
+        use_markitdown=True, use_cache=True, cache_dir=str(tmp_path / "cache")
+    )
+    reader = Readium(config)
+    spawned = reader.spawn()
+    assert spawned.markitdown is reader.markitdown
+    assert spawned.conversion_cache is reader.conversion_cache
+    assert spawned.file_filter is not reader.file_filter
+
+
+def test_write_batch(sources, tmp_path):
+    report = Readium().write_batch(
+        [(sources[0], None), sources[1]], tmp_path / "out", jobs=1
+    )
+    assert not report.failed
+    assert [result.output.name for result in report.results] == [
+        "001-alpha.md",
+        "002-beta-dir.md",
+    ]
+
+
+def test_cli_batch(sources, tmp_path):
+    sources_file = tmp_path / "sources.txt"
+    sources_file.write_text(
+        f'"{sources[1]}"\n# Skipped\n{sources[2]} main\n{tmp_path / "missing"}\n'
+    )
+    out = tmp_path / "out"
+    runner = CliRunner()
+
+    result = runner.invoke(main, ["batch", str(sources_file), "-o", str(out)])
+    assert result.exit_code == 1
+    assert "Batch summary:" in result.output
+    assert "Sources: 3 (2 succeeded, 1 failed)" in result.output
+    assert (out / "001-beta-dir.md").exists()
+    assert list(out.glob("002-*-remote.md"))
+
+    result = runner.invoke(main, ["batch", str(sources_file)])
+    assert result.exit_code != 0
+    assert "requires an output directory" in result.output
@@ -0,0 +1,224 @@
+import json
+
+from readium import ReadConfig, Readium
+from readium.budget import MAX_CHAR_BYTES, MAX_TOKEN_CHARS, TokenBudget
+from readium.tokens import count_tokens, get_encoding
+from readium.walker import WalkEntry
+
+
+def _entry(rel_path, size):
+    return WalkEntry(rel_path, rel_path, rel_path.rsplit("/", 1)[-1], size, False)
+
+
+def test_max_token_chars_matches_encoding():
+    encoding = get_encoding()
+    longest = 0
+    for token in range(encoding.n_vocab):
+        try:
+            longest = max(longest, len(encoding.decode_single_token_bytes(token)))
+        except KeyError:
+            continue
+    assert longest <= MAX_TOKEN_CHARS
+
+
+def test_priority_order():
+    budget = TokenBudget(100, priority_paths=["src/*"])
+    items = [
+        (_entry("tests/test_a.py", 10), "text"),
+        (_entry("src/big.py", 500), "text"),
+        (_entry("src/small.py", 50), "text"),
+        (_entry("docs/guide.md", 900), "text"),
+        (_entry("pkg/README.md", 2000), "text"),
+    ]
+    ordered = [entry.rel_path for entry, _ in budget.order(items)]
+    assert ordered == [
+        "pkg/README.md",
+        "docs/guide.md",
+        "src/small.py",
+        "src/big.py",
+        "tests/test_a.py",
+    ]
+
+
+def test_admit_and_drop():
+    budget = TokenBudget(10)
+    assert budget.admit("a", 6)
+    assert not budget.admit("b", 5)
+    assert budget.admit("c", 4)
+    assert budget.exhausted
+    assert budget.dropped == ["b"]
+    assert not budget.may_fit("x")
+
+
+def test_min_tokens_bounds_plain_text():
+    per_token = MAX_CHAR_BYTES * MAX_TOKEN_CHARS
+    assert TokenBudget.min_tokens(0, "text") == 0
+    assert TokenBudget.min_tokens(1, "text") == 1
+    assert TokenBudget.min_tokens(per_token + 1, "text") == 2
+    # Nothing is known of converted documents or files never stat'ed
+    assert TokenBudget.min_tokens(10**6, "markitdown") == 0
+    assert TokenBudget.min_tokens(None, "text") == 0
+
+
+def _make_tree(root):
+    (root / "README.md").write_text("# Project\n\nShort intro.\n")
+    (root / "docs").mkdir()
+    (root / "docs" / "guide.md").write_text("guide " * 50)
+    (root / "src").mkdir()
+    (root / "src" / "core.py").write_text("def f():\n    return 1\n" * 20)
+    (root / "zz_large.txt").write_text("filler text " * 2000)
+
+
+def test_read_docs_respects_budget(tmp_path):
+    _make_tree(tmp_path)
+    readme_tokens = count_tokens((tmp_path / "README.md").read_text())
+    guide_tokens = count_tokens((tmp_path / "docs" / "guide.md").read_text())
+    core_tokens = count_tokens((tmp_path / "src" / "core.py").read_text())
+    max_tokens = readme_tokens + guide_tokens + core_tokens + 10
+
+    config = ReadConfig(
+        max_tokens=max_tokens, use_cache=False, use_git_index=False, workers=1
+    )
+    reader = Readium(config)
+    summary, tree, content = reader.read_docs(tmp_path)
+
+    used = readme_tokens + guide_tokens + core_tokens
+    assert f"Token budget: {used:,} of {max_tokens:,} tokens used" in summary
+    # zz_large.txt is too large to fit in the 10 tokens left, so it is not read
+    assert "Not read after the budget ran out: 1 files" in summary
+    assert "Dropped over budget" not in summary
+    assert f"**Total Tokens:** {used:,}" in tree
+    assert "filler text" not in content
+    # Output follows the priority order
+    assert content.index("Short intro") < content.index("guide guide")
+    assert content.index("guide guide") < content.index("def f()")
+
+
+def test_exhausted_budget_stops_reading(tmp_path, monkeypatch):
+    _make_tree(tmp_path)
+    readme_tokens = count_tokens((tmp_path / "README.md").read_text())
+    reader = Readium(
+        ReadConfig(
+            max_tokens=readme_tokens, use_cache=False, use_git_index=False, workers=1
+        )
+    )
+    processed = _track_processing(reader, monkeypatch)
+    summary, tree, content = reader.read_docs(tmp_path)
+
+    assert processed == ["README.md"]
+    assert "Not read after the budget ran out: 3 files" in summary
+
+
+def test_admitted_files_are_counted_once(tmp_path, monkeypatch):
+    _make_tree(tmp_path)
+    reader = Readium(
+        ReadConfig(max_tokens=10**6, use_cache=False, use_git_index=False, workers=1)
+    )
+    counted = []
+    real_batch = reader.count_tokens
+
+    def counting(text):
+        counted.append(text)
+        return count_tokens(text)
+
+    def counting_batch(texts):
+        counted.extend(texts)
+        return real_batch(texts)
+
+    # Candidates are counted one by one as read, the token tree counts in batches
+    monkeypatch.setattr("readium.core.count_tokens", counting)
+    monkeypatch.setattr(reader, "count_tokens", counting_batch)
+    summary, tree, content = reader.read_docs(tmp_path)
+
+    assert len(counted) == 4
+    assert "**Total Files:** 4" in tree
+
+
+def _track_processing(reader, monkeypatch):
+    processed = []
+    real_process = reader._process_file
+
+    def tracking(file_path, relative_path, *args, **kwargs):
+        processed.append(str(relative_path))
+        return real_process(file_path, relative_path, *args, **kwargs)
+
+    monkeypatch.setattr(reader, "_process_file", tracking)
+    return processed
+
+
+def test_reading_stops_when_no_candidate_can_fit(tmp_path, monkeypatch):
+    (tmp_path / "README.md").write_text("# Project\n")
+    (tmp_path / "a.txt").write_text("alpha " * 1000)
+    (tmp_path / "b.txt").write_text("bravo " * 2000)
+    readme_tokens = count_tokens("# Project\n")
+    reader = Readium(
+        ReadConfig(
+            max_tokens=readme_tokens + 5,
+            use_cache=False,
+            use_git_index=False,
+            workers=1,
+            profile=True,
+        )
+    )
+    processed = _track_processing(reader, monkeypatch)
+    summary, tree, content = reader.read_docs(tmp_path)
+
+    # The budget is not exhausted, but neither text file can fit in what is left
+    assert processed == ["README.md"]
+    assert "Not read after the budget ran out: 2 files" in summary
+    assert "Dropped over budget" not in summary
+    assert reader.stats.skipped["token_budget"] == 2
+
+
+def test_texts_too_long_for_the_budget_are_not_tokenized(tmp_path, monkeypatch):
+    (tmp_path / "README.md").write_text("# Project\n")
+    # Small enough by size to be read, too long to fit once decoded
+    (tmp_path / "b.txt").write_text("x" * (5 * MAX_CHAR_BYTES * MAX_TOKEN_CHARS))
+    reader = Readium(
+        ReadConfig(
+            max_tokens=count_tokens("# Project\n") + 5,
+            use_cache=False,
+            use_git_index=False,
+            workers=1,
+            profile=True,
+        )
+    )
+    counted = []
+    monkeypatch.setattr(
+        "readium.core.count_tokens", lambda text: counted.append(text) or 1
+    )
+    summary, tree, content = reader.read_docs(tmp_path)
+
+    assert counted == ["# Project\n"]
+    assert "Dropped over budget: 1 files (b.txt)" in summary
+    assert reader.stats.skipped["token_budget"] == 1
+
+
+def test_unread_files_keep_their_manifest_rows(tmp_path, monkeypatch):
+    source = tmp_path / "src"
+    source.mkdir()
+    _make_tree(source)
+    manifest = tmp_path / "run.json"
+    config = ReadConfig(
+        use_cache=False,
+        use_git_index=False,
+        workers=1,
+        incremental_manifest=str(manifest),
+    )
+    Readium(config).read_docs(source)
+    rows = json.loads(manifest.read_text())["files"]
+
+    readme_tokens = count_tokens((source / "README.md").read_text())
+    config.max_tokens = readme_tokens
+    reader = Readium(config)
+    summary, tree, content = reader.read_docs(source)
+    assert "Not read after the budget ran out: 3 files" in summary
+    assert json.loads(manifest.read_text())["files"] == rows
+    assert reader.manifest.removed == 0
+
+    # Nothing changed, so an unlimited run reuses every file
+    config.max_tokens = None
+    reader = Readium(config)
+    processed = _track_processing(reader, monkeypatch)
+    reader.read_docs(source)
+    assert processed == []
@@ -0,0 +1,159 @@
+import os
+import time
+from unittest.mock import Mock, patch
+
+from readium import FileRecord, ReadConfig, Readium
+from readium.cache import ConversionCache, TokenCountCache, default_cache_dir
+
+
+def test_default_cache_dir_uses_env(isolated_cache_dir):
+    assert default_cache_dir() == isolated_cache_dir
+
+
+def test_library_runs_write_no_cache_by_default(tmp_path, isolated_cache_dir):
+    (tmp_path / "a.md").write_text("# A")
+    reader = Readium()
+    reader.read_docs(tmp_path)
+    assert reader.token_cache is None
+    assert list(isolated_cache_dir.iterdir()) == []
+
+
+def test_cache_roundtrip(tmp_path):
+    cache = ConversionCache(tmp_path)
+    key = ConversionCache.make_key("abc", "markitdown-1", [".pdf"])
+    assert cache.get(key) is None
+    cache.put(key, "# Converted\r\nline")
+    assert cache.get(key) == "# Converted\r\nline"
+
+
+def test_cache_key_depends_on_settings():
+    base = ConversionCache.make_key("abc", "markitdown-1", [".pdf"])
+    assert base != ConversionCache.make_key("abd", "markitdown-1", [".pdf"])
+    assert base != ConversionCache.make_key("abc", "markitdown-2", [".pdf"])
+    assert base != ConversionCache.make_key("abc", "markitdown-1", [".html"])
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ConversionCache(tmp_path, max_size=250)
+    keys = [ConversionCache.make_key(str(i), "c", []) for i in range(3)]
+    for i, key in enumerate(keys[:2]):
+        cache.put(key, "x" * 100)
+        entry = cache._entry_path(key)
+        os.utime(entry, (time.time() - 100 + i, time.time() - 100 + i))
+    # Touch the oldest entry so the second one becomes least recently used
+    assert cache.get(keys[0]) is not None
+    cache.put(keys[2], "x" * 100)
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) is not None
+
+
+def test_cache_counts_a_rewritten_entry_once(tmp_path):
+    cache = ConversionCache(tmp_path)
+    key = ConversionCache.make_key("abc", "c", [])
+    cache.put(key, "x" * 100)
+    for _ in range(3):
+        cache.put(key, "x" * 100)
+    cache.put(key, "x" * 40)
+    assert cache._total_size == cache._scan_size() == 40
+
+
+@patch("markitdown.MarkItDown")
+def test_repeat_runs_skip_conversion(mock_markitdown, tmp_path):
+    mock_instance = Mock()
+    mock_instance.convert.return_value = Mock(text_content="Converted content")
+    mock_markitdown.return_value = mock_instance
+    (tmp_path / "doc.pdf").write_bytes(b"%PDF-1.4 fake")
+    config = ReadConfig(
+        use_markitdown=True, markitdown_extensions={".pdf"}, use_cache=True
+    )
+
+    first = Readium(config).read_docs(tmp_path)
+    second = Readium(config).read_docs(tmp_path)
+    assert mock_instance.convert.call_count == 1
+    assert first == second
+    assert "Converted content" in second[2]
+
+    # A changed document is converted again
+    (tmp_path / "doc.pdf").write_bytes(b"%PDF-1.4 changed")
+    Readium(config).read_docs(tmp_path)
+    assert mock_instance.convert.call_count == 2
+
+
+@patch("markitdown.MarkItDown")
+def test_no_cache_always_converts(mock_markitdown, tmp_path):
+    mock_instance = Mock()
+    mock_instance.convert.return_value = Mock(text_content="Converted content")
+    mock_markitdown.return_value = mock_instance
+    (tmp_path / "doc.pdf").write_bytes(b"%PDF-1.4 fake")
+    config = ReadConfig(
+        use_markitdown=True, markitdown_extensions={".pdf"}, use_cache=False
+    )
+    Readium(config).read_docs(tmp_path)
+    Readium(config).read_docs(tmp_path)
+    assert mock_instance.convert.call_count == 2
+
+
+def _counting_reader():
+    reader = Readium(ReadConfig(use_cache=True))
+    calls = []
+
+    def fake_count(texts):
+        calls.append(list(texts))
+        return [len(t) for t in texts]
+
+    reader.count_tokens = fake_count
+    return reader, calls
+
+
+def test_token_cache_only_retokenizes_changed_files(tmp_path):
+    (tmp_path / "a.md").write_text("alpha")
+    (tmp_path / "b.md").write_text("bravo bravo")
+    contents = {"a.md": "alpha", "b.md": "bravo bravo"}
+
+    def records():
+        # Each run reads fresh records; counted ones are never counted again
+        return [FileRecord(path, text) for path, text in contents.items()]
+
+    reader, calls = _counting_reader()
+    first = reader.generate_token_tree(records(), tmp_path)
+    assert calls == [["alpha", "bravo bravo"]]
+    assert (reader.token_cache.hits, reader.token_cache.misses) == (0, 2)
+
+    reader, calls = _counting_reader()
+    assert reader.generate_token_tree(records(), tmp_path) == first
+    assert calls == []
+    assert (reader.token_cache.hits, reader.token_cache.misses) == (2, 0)
+
+    (tmp_path / "b.md").write_text("bravo changed")
+    contents["b.md"] = "bravo changed"
+    reader, calls = _counting_reader()
+    reader.generate_token_tree(records(), tmp_path)
+    assert calls == [["bravo changed"]]
+    assert (reader.token_cache.hits, reader.token_cache.misses) == (1, 1)
+
+
+def test_token_cache_evicts_least_recently_used_indexes(tmp_path):
+    cache = TokenCountCache(tmp_path)
+    for n, tree in enumerate(["/a", "/b"]):
+        cache.count(
+            tree, [FileRecord("x.md", "x" * 100)], lambda texts: [1] * len(texts)
+        )
+        stamp = time.time() - 100 + n
+        os.utime(cache._index_path(tree), (stamp, stamp))
+    size = cache._index_path("/a").stat().st_size
+    # Opening the oldest index makes the other one least recently used
+    cache.open("/a")
+    cache.max_size = size * 5 // 2
+    cache.count("/c", [FileRecord("x.md", "x")], lambda texts: [1] * len(texts))
+    assert cache._index_path("/a").exists()
+    assert not cache._index_path("/b").exists()
+    assert cache._index_path("/c").exists()
+
+
+def test_token_cache_disabled(tmp_path):
+    (tmp_path / "a.md").write_text("alpha")
+    reader = Readium(ReadConfig(use_cache=False))
+    assert reader.token_cache is None
+    summary, tree, content = reader.read_docs(tmp_path)
+    assert "a.md" in tree
@@ -0,0 +1,142 @@
+import multiprocessing
+import time
+
+import pytest
+
+from readium import ReadConfig, Readium
+from readium.conversion import (
+    ConversionError,
+    ConversionTimeout,
+    MarkItDownPool,
+    WorkerStartupTimeout,
+)
+
+
+class _FakeResult:
+    def __init__(self, text):
+        self.text_content = text
+
+
+class _FakeConverter:
+    """Converter that hangs on files named 'hang*' and fails on 'bad*'"""
+
+    def convert(self, path):
+        if "hang" in path:
+            time.sleep(60)
+        if "bad" in path:
+            raise ValueError("cannot convert")
+        return _FakeResult(f"converted {path}")
+
+
+def fake_converter_factory():
+    return _FakeConverter()
+
+
+def slow_start_converter_factory():
+    # Only worker processes are slow to start
+    if multiprocessing.parent_process() is not None:
+        time.sleep(60)
+    return _FakeConverter()
+
+
+@pytest.fixture
+def pool():
+    pool = MarkItDownPool(1, timeout=2, converter_factory=fake_converter_factory)
+    yield pool
+    pool.close()
+
+
+def test_pool_converts(pool):
+    assert pool.convert("a.pdf") == "converted a.pdf"
+    assert pool.convert("b.pdf") == "converted b.pdf"
+
+
+def test_pool_reports_errors(pool):
+    with pytest.raises(ConversionError, match="cannot convert"):
+        pool.convert("bad.pdf")
+    # The worker survives ordinary conversion errors
+    assert pool.convert("ok.pdf") == "converted ok.pdf"
+
+
+def test_pool_replaces_stuck_worker(pool):
+    with pytest.raises(ConversionTimeout):
+        pool.convert("hang.pdf")
+    assert pool.convert("after.pdf") == "converted after.pdf"
+    assert len(pool._workers) == 1
+
+
+def test_pool_gives_up_when_workers_do_not_start(capsys):
+    pool = MarkItDownPool(
+        1,
+        timeout=2,
+        converter_factory=slow_start_converter_factory,
+        startup_timeout=0.5,
+    )
+    try:
+        with pytest.raises(WorkerStartupTimeout):
+            pool.convert("a.pdf")
+        assert pool._workers == []
+        # No further worker is spawned, and nothing is converted in process
+        start = time.perf_counter()
+        with pytest.raises(WorkerStartupTimeout):
+            pool.convert("hang.pdf")
+        assert time.perf_counter() - start < 0.5
+        # One warning for the whole run, not one per document
+        err = capsys.readouterr().err
+        assert err.count("MarkItDown conversion is disabled") == 1
+    finally:
+        pool.close()
+
+
+def test_readium_is_not_blocked_after_a_startup_timeout(tmp_path):
+    (tmp_path / "hang.pdf").write_bytes(b"%PDF-1.4")
+    (tmp_path / "notes.md").write_text("# Notes")
+    reader = Readium(ReadConfig(use_markitdown=True, markitdown_timeout=1))
+    reader.conversion_pool = MarkItDownPool(
+        1,
+        timeout=1,
+        converter_factory=slow_start_converter_factory,
+        startup_timeout=0.5,
+    )
+    start = time.perf_counter()
+    try:
+        summary, tree, content = reader.read_docs(tmp_path)
+    finally:
+        reader.close()
+    assert time.perf_counter() - start < 10
+    assert "# Notes" in content
+    assert "hang.pdf" not in tree
+    assert "Skipped after MarkItDown timeout: 1 files (hang.pdf)" in summary
+
+
+def test_readium_with_conversion_pool(tmp_path):
+    """Real MarkItDown conversion through a worker process"""
+    (tmp_path / "page.html").write_text(
+        "<html><body><h1>Pool Title</h1><p>Body text</p></body></html>"
+    )
+    (tmp_path / "notes.md").write_text("# Notes")
+    config = ReadConfig(use_markitdown=True, markitdown_processes=1)
+    reader = Readium(config)
+    try:
+        summary, tree, content = reader.read_docs(tmp_path)
+    finally:
+        reader.close()
+    assert "# Pool Title" in content
+    assert "<h1>" not in content
+    assert "# Notes" in content
+
+
+def test_readium_skips_timed_out_files(tmp_path):
+    (tmp_path / "hang.pdf").write_bytes(b"%PDF-1.4")
+    (tmp_path / "fine.pdf").write_bytes(b"%PDF-1.4")
+    reader = Readium(ReadConfig(use_markitdown=True, markitdown_timeout=1))
+    reader.conversion_pool = MarkItDownPool(
+        1, timeout=1, converter_factory=fake_converter_factory
+    )
+    try:
+        summary, tree, content = reader.read_docs(tmp_path)
+    finally:
+        reader.close()
+    assert "fine.pdf" in tree
+    assert "hang.pdf" not in tree
+    assert "Skipped after MarkItDown timeout: 1 files (hang.pdf)" in summary
@@ -0,0 +1,217 @@
+import threading
+import time
+from concurrent.futures import Executor, Future
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from click.testing import CliRunner
+
+from readium import ReadConfig, Readium
+from readium.cli import main
+from readium.crawl import Crawler, WebClient, normalize_url, page_path
+
+
+def _page(title, *links):
+    text = " ".join(
+        f"{title} explains how the documented tool behaves in case number {n}."
+        for n in range(12)
+    )
+    anchors = "".join(f'<li><a href="{href}">{href}</a></li>' for href in links)
+    return (
+        f"<html><head><title>{title}</title></head><body>"
+        f"<nav><ul>{anchors}</ul></nav>"
+        f"<article><h1>{title}</h1><p>{text}</p></article></body></html>"
+    )
+
+
+SITE = {
+    "index.html": _page(
+        "Home",
+        "guide/intro.html",
+        "guide/intro.html#install",
+        "/api",  # Redirected to /api/
+        "missing.html",
+        "logo.png",
+        "data.json",
+        "mailto:docs@example.com",
+        "http://elsewhere.invalid/page.html",
+    ),
+    "guide/intro.html": _page("Intro", "../index.html", "advanced.html"),
+    "guide/advanced.html": _page("Advanced", "deep.html"),
+    "guide/deep.html": _page("Deep"),
+    "api/index.html": _page("API"),
+    "logo.png": "\x89PNG",
+    "data.json": "{}",
+}
+
+
+@pytest.fixture
+def site(tmp_path):
+    """A small documentation site served over keep-alive HTTP/1.1"""
+    for rel, text in SITE.items():
+        path = tmp_path / "site" / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    stats = {"requests": [], "connections": set(), "active": 0, "max_active": 0}
+    lock = threading.Lock()
+
+    class Handler(SimpleHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=str(tmp_path / "site"), **kwargs)
+
+        def do_GET(self):
+            with lock:
+                stats["requests"].append(self.path)
+                stats["connections"].add(self.client_address)
+                stats["active"] += 1
+                stats["max_active"] = max(stats["max_active"], stats["active"])
+            try:
+                time.sleep(0.02)
+                super().do_GET()
+            finally:
+                with lock:
+                    stats["active"] -= 1
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", tmp_path / "site", stats
+    server.shutdown()
+    server.server_close()
+
+
+def test_page_path_and_normalize_url():
+    assert page_path("https://example.com/") == "index.md"
+    assert page_path("https://example.com/guide/") == "guide/index.md"
+    assert page_path("https://example.com/guide/intro.html") == "guide/intro.md"
+    assert page_path("https://example.com/search?q=a b") == "search_q_a_b.md"
+    assert normalize_url("HTTP://Example.com:80/a#frag") == "http://example.com/a"
+    assert normalize_url("https://example.com") == "https://example.com/"
+
+
+def test_crawl_follows_same_origin_links_breadth_first(site):
+    url, _, stats = site
+    config = ReadConfig(crawl=True, crawl_depth=2)
+    summary, tree, content = Readium(config).read_docs(url + "/index.html")
+
+    blocks = [line for line in content.splitlines() if line.startswith("File: ")]
+    assert blocks == [
+        "File: index.md",
+        "File: guide/intro.md",
+        "File: api/index.md",
+        "File: guide/advanced.md",
+    ]
+    assert "# Intro" in content or "Intro explains" in content
+    assert "Deep explains" not in content  # Three hops away
+    assert "Files processed: 4" in summary
+    assert "Crawl: 4 pages from 6 URLs requested" in summary
+    assert "missing.html (HTTP 404)" in summary
+    assert "Skipped URLs: 1" in summary  # data.json
+    assert "└── guide/intro.md" in tree
+    # Images, mailto and other origins are never requested; each page once
+    assert not any("logo.png" in path for path in stats["requests"])
+    assert len(stats["requests"]) == len(set(stats["requests"])) == 7
+
+
+def test_crawl_reuses_a_bounded_number_of_connections(site):
+    url, root, stats = site
+    for n in range(30):
+        (root / f"page{n}.html").write_text(_page(f"Page {n}"))
+    (root / "many.html").write_text(
+        _page("Many", *[f"page{n}.html" for n in range(30)])
+    )
+    config = ReadConfig(crawl=True, crawl_depth=1, crawl_host_connections=3)
+    crawler = Crawler(url + "/many.html", WebClient(config))
+    pages = list(crawler.crawl())
+
+    assert len(pages) == 31
+    assert [page["path"] for page in pages[:3]] == [
+        "many.md",
+        "page0.md",
+        "page1.md",
+    ]
+    assert stats["max_active"] <= 3
+    assert len(stats["connections"]) <= 3
+
+
+def test_crawl_limits_pages(site):
+    url, _, _ = site
+    config = ReadConfig(crawl=True, crawl_depth=5, crawl_max_pages=2)
+    crawler = Crawler(url + "/", WebClient(config))
+    pages = list(crawler.crawl())
+    assert [page["path"] for page in pages] == ["index.md", "guide/intro.md"]
+    assert crawler.requested == 2
+
+
+def test_crawl_from_sitemap(site):
+    url, root, stats = site
+    (root / "sitemap.xml").write_text(
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        f"<sitemap><loc>{url}/pages.xml</loc></sitemap>"
+        "</sitemapindex>"
+    )
+    (root / "pages.xml").write_text(
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        f"<url><loc>{url}/guide/deep.html</loc></url>"
+        f"<url><loc>{url}/api/</loc></url>"
+        "<url><loc>http://elsewhere.invalid/x.html</loc></url>"
+        "</urlset>"
+    )
+    config = ReadConfig(crawl=True, crawl_depth=0)
+    pages = list(Readium(config).iter_docs(url + "/sitemap.xml"))
+    assert [page["path"] for page in pages] == ["guide/deep.md", "api/index.md"]
+    assert pages[0]["source"] == url + "/guide/deep.html"
+
+
+def test_crawl_without_size_limit(site):
+    url, _, _ = site
+    config = ReadConfig(crawl=True, crawl_depth=1, max_file_size=-1)
+    pages = list(Crawler(url + "/index.html", WebClient(config)).crawl())
+    assert [page.path for page in pages] == [
+        "index.md",
+        "guide/intro.md",
+        "api/index.md",
+    ]
+
+
+def test_crawl_yields_pages_as_they_are_extracted(site):
+    url, _, stats = site
+
+    class InlineExecutor(Executor):
+        def submit(self, fn, *args, **kwargs):
+            future = Future()
+            future.set_result(fn(*args, **kwargs))
+            return future
+
+    config = ReadConfig(crawl=True, crawl_depth=1)
+    crawler = Crawler(url + "/index.html", WebClient(config), executor=InlineExecutor())
+    pages = crawler.crawl()
+    assert next(pages).path == "index.md"
+    # The seed page is out before any of its links is requested
+    assert stats["requests"] == ["/index.html"]
+    assert [page.path for page in pages] == ["guide/intro.md", "api/index.md"]
+
+
+def test_crawl_fails_on_unreachable_seed(site):
+    url, _, _ = site
+    with pytest.raises(ValueError, match="HTTP 404"):
+        Readium(ReadConfig(crawl=True)).read_docs(url + "/missing.html")
+
+
+def test_cli_crawl_writes_file_blocks(site, tmp_path):
+    url, _, _ = site
+    output = tmp_path / "docs.md"
+    result = CliRunner().invoke(
+        main, [url + "/", "--crawl", "--crawl-depth", "1", "-o", str(output)]
+    )
+    assert result.exit_code == 0, result.output
+    text = output.read_text()
+    assert text.startswith("Summary:\nPath analyzed: " + url + "/")
+    assert "File: guide/intro.md" in text
+    assert "File: guide/advanced.md" not in text
@@ -0,0 +1,71 @@
+import random
+
+from click.testing import CliRunner
+
+from readium import ReadConfig, Readium
+from readium.cli import main
+from readium.estimate import MIN_PER_STRATUM, choose_sample, extrapolate
+
+
+def test_choose_sample_covers_every_extension():
+    sizes = [(f"f{i}.py", 1000) for i in range(1000)]
+    sizes += [(f"f{i}.md", 10) for i in range(3)]
+    chosen = choose_sample(sizes, sample_size=50, seed=1)
+
+    exts = [sizes[i][0].rsplit(".", 1)[1] for i in chosen]
+    assert exts.count("md") == 3  # Fewer than MIN_PER_STRATUM: all of them
+    assert exts.count("py") == 50
+    assert chosen == sorted(chosen)
+    assert choose_sample(sizes, sample_size=50, seed=1) == chosen
+
+
+def test_extrapolate_fully_sampled_is_exact():
+    sizes = [("a.py", 10), ("b.py", 20), ("c.bin", 5)]
+    estimate = extrapolate(sizes, {0: 3, 1: 7, 2: None})
+    assert estimate.total == 10
+    assert estimate.margin == 0
+    assert estimate.files == [("a.py", 3), ("b.py", 7)]
+
+
+def test_extrapolate_interval_covers_truth():
+    rng = random.Random(7)
+    sizes = []
+    truth = {}
+    for i in range(2000):
+        size = rng.randint(100, 5000)
+        sizes.append((f"f{i}.txt", size))
+        truth[i] = int(size * rng.uniform(0.2, 0.3))
+    chosen = choose_sample(sizes, sample_size=200)
+    assert len(chosen) >= MIN_PER_STRATUM
+    estimate = extrapolate(sizes, {i: truth[i] for i in chosen})
+
+    actual = sum(truth.values())
+    assert abs(estimate.total - actual) <= estimate.margin
+    assert 0 < estimate.margin < actual * 0.05
+
+
+def test_estimate_token_tree(tmp_path):
+    for i in range(30):
+        (tmp_path / f"doc{i}.md").write_text("word " * (10 + i * 5))
+    reader = Readium(ReadConfig(use_cache=False))
+    tree = reader.estimate_token_tree(tmp_path, sample_size=10)
+
+    assert "# Directory Token Tree (estimated)" in tree
+    assert "95% confidence, 10 of 30 files tokenized" in tree
+    exact = sum(10 + i * 5 for i in range(30))
+    estimate = reader.token_estimate
+    assert estimate is not None
+    assert abs(estimate.total - exact) <= max(estimate.margin, exact * 0.05)
+
+
+def test_cli_token_estimate(tmp_path):
+    (tmp_path / "a.md").write_text("One two three four five")
+    runner = CliRunner()
+    result = runner.invoke(main, ["tokens", str(tmp_path), "--token-estimate", "fast"])
+    assert result.exit_code == 0
+    assert "Directory Token Tree (estimated)" in result.output
+    assert "a.md" in result.output
+
+    result = runner.invoke(main, [str(tmp_path), "--token-estimate", "fast"])
+    assert result.exit_code != 0
+    assert "only applies to the token report" in result.output
@@ -118,7 +118,7 @@ def test_cli_exclude_extensions(temp_dir_with_files):
 @patch("readium.core.clone_repository")
 def test_exclude_extensions_with_git(mock_clone, temp_dir_with_files):
     """Test extension exclusion with git repositories"""
-    mock_clone.side_effect = lambda url, target_dir, branch=None: None
+    mock_clone.side_effect = lambda url, target_dir, branch=None, **options: None
     config = ReadConfig(exclude_extensions={".json"})
     reader = Readium(config)
     with patch.object(reader, "_process_directory") as mock_process:
@@ -0,0 +1,83 @@
+import pathspec
+import pytest
+
+from readium import ReadConfig
+from readium.filters import (
+    EXCLUDE_PATTERN,
+    EXCLUDED_DIR,
+    EXCLUDED_EXTENSION,
+    TOO_LARGE,
+    UNSUPPORTED_EXTENSION,
+    FileFilter,
+    compile_name_patterns,
+)
+
+
+def test_name_patterns_glob_and_substring():
+    regex = compile_name_patterns({"*.log", "*.lock", ".pyc", "Thumbs.db"})
+    assert regex.match("server.log")
+    assert regex.match("poetry.lock")
+    assert regex.match("module.pyc")
+    assert regex.match("old.pyc.bak")  # Plain patterns match anywhere
+    assert regex.match("Thumbs.db")
+    assert not regex.match("logbook.md")
+    assert not regex.match("lock.py")
+    assert compile_name_patterns([]) is None
+
+
+def test_select_reasons():
+    config = ReadConfig(
+        exclude_files={"*.min.js", "secret"},
+        exclude_extensions={".JSON"},
+        max_file_size=100,
+    )
+    file_filter = FileFilter(config)
+
+    assert file_filter.select("src/app.py", 10) == ("text", None)
+    assert file_filter.select("node_modules/x/app.py", 10) == (None, EXCLUDED_DIR)
+    assert file_filter.select("node_modules/x/app.py", 10, check_dirs=False) == (
+        "text",
+        None,
+    )
+    assert file_filter.select("data.json", 10) == (None, EXCLUDED_EXTENSION)
+    assert file_filter.select("logo.png", 10) == (None, UNSUPPORTED_EXTENSION)
+    assert file_filter.select("dist.min.js", 10) == (None, EXCLUDE_PATTERN)
+    assert file_filter.select("my-secret.txt", 10) == (None, EXCLUDE_PATTERN)
+    assert file_filter.select("big.md", 101) == (None, TOO_LARGE)
+    assert file_filter.select("big.md", None) == ("text", None)
+
+
+def test_select_markitdown_extensions():
+    assert FileFilter(ReadConfig(use_markitdown=True)).select("a.pdf", 1) == (
+        "markitdown",
+        None,
+    )
+    assert FileFilter(ReadConfig()).select("a.pdf", 1) == (
+        None,
+        UNSUPPORTED_EXTENSION,
+    )
+
+
+@pytest.mark.parametrize(
+    "lines",
+    [
+        ["build/", "*.log", "/docs/*.md", "# comment", ""],
+        ["*.log", "!keep.log", "tmp/"],
+    ],
+)
+def test_gitignore_matches_pathspec(lines):
+    spec = pathspec.PathSpec.from_lines("gitwildmatch", lines)
+    file_filter = FileFilter(ReadConfig(), spec)
+    paths = [
+        "build/",
+        "src/build/",
+        "a.log",
+        "src/keep.log",
+        "keep.log",
+        "docs/intro.md",
+        "src/docs/intro.md",
+        "tmp/",
+        "README.md",
+    ]
+    for path in paths:
+        assert file_filter.ignored(path) == spec.match_file(path), path
@@ -1,5 +1,10 @@
 import os
+import shutil
+import subprocess
 from pathlib import Path
+
+import pytest
+
 from readium.core import Readium, ReadConfig
 
 def test_gitignore_respect(tmp_path):
@@ -69,3 +74,82 @@ def test_nested_gitignore(tmp_path):
     
     # With current implementation (root only), this file should be present
     assert "nested_ignored.txt" in tree
+
+
+def _git_init(path):
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    subprocess.run(["git", "init", "-q", str(path)], check=True)
+
+
+def test_git_index_honors_nested_gitignore_and_info_exclude(tmp_path):
+    """In a git checkout, files are listed by git with all its ignore rules"""
+    _git_init(tmp_path)
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "guide.md").write_text("guide")
+    (tmp_path / "docs" / "draft.md").write_text("draft")
+    (tmp_path / "docs" / ".gitignore").write_text("draft.md\n")
+    (tmp_path / "local.md").write_text("local")
+    (tmp_path / "readme.md").write_text("readme")
+    (tmp_path / ".git" / "info" / "exclude").write_text("local.md\n")
+
+    summary, tree, content = Readium(ReadConfig()).read_docs(tmp_path)
+    assert "docs/guide.md" in tree
+    assert "readme.md" in tree
+    assert "draft.md" not in tree
+    assert "local.md" not in tree
+
+    # The directory walk only knows about the root .gitignore
+    config = ReadConfig(use_git_index=False)
+    summary, tree, content = Readium(config).read_docs(tmp_path)
+    assert "draft.md" in tree
+    assert "local.md" in tree
+
+
+def test_git_index_with_target_dir_and_excluded_dirs(tmp_path):
+    _git_init(tmp_path)
+    (tmp_path / "docs" / "build").mkdir(parents=True)
+    (tmp_path / "docs" / "index.md").write_text("index")
+    (tmp_path / "docs" / "build" / "out.md").write_text("out")
+    (tmp_path / "other.md").write_text("other")
+
+    summary, tree, content = Readium(ReadConfig(target_dir="docs")).read_docs(
+        tmp_path
+    )
+    assert "index.md" in tree
+    assert "out.md" not in tree  # "build" is a default excluded directory
+    assert "other.md" not in tree
+
+
+def test_git_index_order_and_submodules(tmp_path):
+    """The git index lists files sorted by path and without submodule contents"""
+    library = tmp_path / "library"
+    _git_init(library)
+    (library / "lib.md").write_text("library docs")
+    subprocess.run(["git", "-C", str(library), "add", "lib.md"], check=True)
+    subprocess.run(
+        ["git", "-C", str(library), "-c", "user.name=t", "-c", "user.email=t@t"]
+        + ["commit", "-qm", "init"],
+        check=True,
+    )
+    repo = tmp_path / "repo"
+    _git_init(repo)
+    subprocess.run(
+        ["git", "-C", str(repo), "-c", "protocol.file.allow=always"]
+        + ["submodule", "add", "-q", str(library), "vendor"],
+        check=True,
+        capture_output=True,
+    )
+    (repo / "z.md").write_text("root file")
+    (repo / "a").mkdir()
+    (repo / "a" / "x.md").write_text("nested file")
+
+    summary, tree, content = Readium(ReadConfig()).read_docs(repo)
+    assert content.index("nested file") < content.index("root file")
+    assert "library docs" not in content
+
+    # The walk yields a directory's own files first and enters submodules
+    config = ReadConfig(use_git_index=False)
+    summary, tree, content = Readium(config).read_docs(repo)
+    assert content.index("root file") < content.index("nested file")
+    assert "library docs" in content
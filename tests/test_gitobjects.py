@@ -0,0 +1,187 @@
+import shutil
+import subprocess
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+
+from readium import ReadConfig, Readium
+from readium.gitobjects import GitTree
+
+
+def _git(cwd, *args):
+    return subprocess.run(
+        ["git", "-C", str(cwd), *args], check=True, capture_output=True, text=True
+    ).stdout
+
+
+def _commit(repo, files, message):
+    for rel, text in files.items():
+        path = repo / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    _git(repo, "add", "-A")
+    _git(repo, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-qm", message)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """A repository with a ``v1`` tag and a newer commit on top of it"""
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    repo = tmp_path / "repo"
+    subprocess.run(["git", "init", "-q", str(repo)], check=True)
+    _commit(
+        repo,
+        {
+            "README.md": "# Project v1",
+            "docs/guide.md": "# Guide v1",
+            "docs/big.md": "x" * 5000,
+            "docs/node_modules/pkg/index.js": "module.exports = 1",
+            "docs/image.png": "\x00PNG",
+            "lib/main.py": "print('v1')",
+        },
+        "v1",
+    )
+    _git(repo, "tag", "v1")
+    _commit(repo, {"docs/guide.md": "# Guide v2"}, "v2")
+    return repo
+
+
+def test_walk_lists_blobs_with_sizes(repo):
+    tree = GitTree(str(repo), "v1")
+    skipped = []
+    entries = list(
+        tree.walk(
+            "docs",
+            exclude_dirs={"node_modules"},
+            on_skip=lambda reason, rel: skipped.append(rel),
+        )
+    )
+    assert [(e.rel_path, e.size) for e in entries] == [
+        ("big.md", 5000),
+        ("guide.md", 10),
+        ("image.png", 4),
+    ]
+    assert skipped == ["node_modules/pkg/index.js"]
+    assert tree.read(entries[1].oid) == b"# Guide v1"
+    tree.close()
+
+
+def test_walk_rejects_missing_directory(repo):
+    tree = GitTree(str(repo), "HEAD")
+    assert tree.tree_id("nope") is None
+    assert tree.tree_id("README.md") is None
+    with pytest.raises(ValueError):
+        list(tree.walk("nope"))
+
+
+def test_read_is_thread_safe(repo):
+    tree = GitTree(str(repo), "HEAD")
+    entries = list(tree.walk())
+    expected = {e.oid: (repo / e.rel_path).read_bytes() for e in entries}
+    errors = []
+
+    def read_all():
+        for _ in range(20):
+            for oid, data in expected.items():
+                if tree.read(oid) != data:
+                    errors.append(oid)
+
+    threads = [threading.Thread(target=read_all) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    tree.close()
+    assert not errors
+
+
+def test_read_docs_of_a_revision_leaves_the_working_tree_alone(repo):
+    (repo / "docs" / "guide.md").write_text("# Uncommitted")
+    config = ReadConfig(max_file_size=1000, use_git_objects=True)
+    summary, tree, content = Readium(config).read_docs(str(repo), branch="v1")
+
+    assert "# Guide v1" in content
+    assert "# Project v1" in content
+    assert "# Uncommitted" not in content
+    assert "x" * 5000 not in content  # Over max_file_size
+    assert "image.png" not in tree  # Binary
+    assert "Git branch: v1" in summary
+    assert (repo / "docs" / "guide.md").read_text() == "# Uncommitted"
+    assert _git(repo, "status", "--porcelain").strip() == "M docs/guide.md"
+
+
+def test_read_docs_of_a_revision_with_target_dir(repo):
+    config = ReadConfig(target_dir="docs", use_git_objects=True)
+    summary, tree, content = Readium(config).read_docs(str(repo), branch="HEAD")
+    assert "File: guide.md" in content
+    assert "# Guide v2" in content
+    assert "print(" not in content
+
+    with pytest.raises(ValueError, match="Target directory not found"):
+        Readium(ReadConfig(target_dir="nope", use_git_objects=True)).read_docs(
+            str(repo), branch="v1"
+        )
+
+
+def test_read_docs_rejects_unknown_revision(repo):
+    with pytest.raises(ValueError, match="Unknown git revision"):
+        Readium(ReadConfig(use_git_objects=True)).read_docs(
+            str(repo), branch="no-such-branch"
+        )
+
+
+@patch("markitdown.MarkItDown")  # Imported lazily by Readium
+def test_markitdown_converts_blob_from_temporary_file(mock_markitdown, repo):
+    _commit(repo, {"docs/report.pdf": "%PDF-1.4 fake"}, "pdf")
+    converted = []
+
+    def convert(path):
+        with open(path) as f:
+            converted.append((path, f.read()))
+        return Mock(text_content="Converted report")
+
+    mock_markitdown.return_value.convert.side_effect = convert
+    config = ReadConfig(
+        use_markitdown=True,
+        markitdown_extensions={".pdf"},
+        use_cache=False,
+        use_git_objects=True,
+    )
+    summary, tree, content = Readium(config).read_docs(str(repo), branch="HEAD")
+
+    assert "Converted report" in content
+    assert converted[0][0].endswith("report.pdf")
+    assert converted[0][1] == "%PDF-1.4 fake"
+
+
+def test_git_url_is_read_without_checkout(repo, tmp_path):
+    bare = tmp_path / "repo.git"
+    subprocess.run(
+        ["git", "clone", "-q", "--bare", str(repo), str(bare)],
+        check=True,
+        capture_output=True,
+    )
+    _git(bare, "config", "uploadpack.allowFilter", "true")
+    config = ReadConfig(
+        max_file_size=1000,
+        use_cache=True,
+        repo_cache=True,
+        cache_dir=str(tmp_path / "cache"),
+        use_git_objects=True,
+    )
+    reader = Readium(config)
+    summary, tree, content = reader.read_docs(bare.as_uri(), branch="v1")
+
+    assert "# Guide v1" in content
+    assert "x" * 5000 not in content
+    assert reader.git_tree is None  # The cat-file process is stopped
+    mirror = next((tmp_path / "cache" / "repos").glob("*.git"))
+    assert not (mirror / "index").exists()
+    # The large blob was left out by the fetch and never fetched lazily
+    missing = _git(mirror, "rev-list", "--objects", "--missing=print", "--all")
+    assert [line for line in missing.splitlines() if line.startswith("?")]
+
+    with pytest.raises(ValueError, match="Error processing git repository"):
+        Readium(config).read_docs((tmp_path / "missing.git").as_uri())
@@ -0,0 +1,200 @@
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from readium import ReadConfig, Readium
+from readium.cache import HttpCache
+from readium.crawl import extract_markdown
+
+TEXT = " ".join(f"The cached guide explains behaviour number {n}." for n in range(15))
+
+
+def _html(title, body=TEXT, links=()):
+    anchors = "".join(f'<a href="{href}">{href}</a>' for href in links)
+    return (
+        f"<html><head><title>{title}</title></head><body><nav>{anchors}</nav>"
+        f"<article><h1>{title}</h1><p>{body}</p></article></body></html>"
+    ).encode()
+
+
+@pytest.fixture
+def server():
+    """Pages with an ``ETag`` or ``Last-Modified`` validator, and request logs"""
+    pages = {
+        "/etag.html": [_html("ETag page", links=["/dated.html"]), '"v1"', None],
+        "/dated.html": [_html("Dated page"), None, "Mon, 05 Oct 2026 10:00:00 GMT"],
+    }
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            requests.append(
+                (
+                    self.path,
+                    self.headers.get("If-None-Match"),
+                    self.headers.get("If-Modified-Since"),
+                )
+            )
+            body, etag, modified = pages.get(self.path, (None, None, None))
+            if body is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if (etag and self.headers.get("If-None-Match") == etag) or (
+                modified and self.headers.get("If-Modified-Since") == modified
+            ):
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            if etag:
+                self.send_header("ETag", etag)
+            if modified:
+                self.send_header("Last-Modified", modified)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", pages, requests
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_http_cache_roundtrip(tmp_path):
+    cache = HttpCache(tmp_path)
+    assert cache.get("https://example.com/") is None
+    entry = cache.put(
+        "https://example.com/", "https://example.com/home", "text/html", b"<p>", '"x"'
+    )
+    entry.extracted = {"settings": ["Title", "# Text"]}
+    cache.save(entry)
+
+    cached, body = cache.get("https://example.com/")
+    assert body == b"<p>"
+    assert (cached.final_url, cached.etag, cached.last_modified) == (
+        "https://example.com/home",
+        '"x"',
+        None,
+    )
+    assert cached.extracted == {"settings": ["Title", "# Text"]}
+    assert cached.age() < 60
+    # A new body drops the Markdown extracted from the old one
+    cache.put("https://example.com/", "https://example.com/", "text/html", b"<b>")
+    assert cache.get("https://example.com/")[0].extracted == {}
+
+
+def test_http_cache_evicts_least_recently_used(tmp_path):
+    cache = HttpCache(tmp_path)
+    urls = [f"https://example.com/{n}" for n in range(3)]
+    for n, url in enumerate(urls[:2]):
+        cache.put(url, url, "text/html", b"x" * 100)
+        stamp = time.time() - 100 + n
+        os.utime(cache._record_path(url), (stamp, stamp))
+    # Room for two pages and a half, records included
+    cache.max_size = cache._scan_size() * 5 // 4
+    # Reading the oldest page makes the second one least recently used
+    assert cache.get(urls[0]) is not None
+    cache.put(urls[2], urls[2], "text/html", b"x" * 100)
+    assert cache.get(urls[0]) is not None
+    assert cache.get(urls[1]) is None
+    assert cache.get(urls[2]) is not None
+
+
+def test_http_cache_counts_records_and_replaced_pages(tmp_path):
+    cache = HttpCache(tmp_path)
+    url = "https://example.com/"
+    entry = cache.put(url, url, "text/html", b"x" * 100)
+    entry.extracted = {"settings": ["Title", "# " + "y" * 1000]}
+    cache.save(entry)
+    # The extracted Markdown counts, and a re-fetch replaces the old page
+    assert cache._total_size == cache._scan_size() > 1100
+    for _ in range(3):
+        cache.put(url, url, "text/html", b"x" * 100)
+    assert cache._total_size == cache._scan_size() < 400
+
+
+def test_revalidation_reuses_extracted_markdown(server):
+    url, _, requests = server
+    config = ReadConfig(use_cache=True, http_cache=True)
+    with patch("readium.crawl.extract_markdown", wraps=extract_markdown) as extract:
+        first = Readium(config).read_docs(url + "/etag.html")
+        second = Readium(config).read_docs(url + "/etag.html")
+
+    assert first[2] == second[2]
+    assert "ETag page" in second[2]
+    assert extract.call_count == 1
+    assert requests == [("/etag.html", None, None), ("/etag.html", '"v1"', None)]
+
+
+def test_changed_page_is_downloaded_and_extracted_again(server):
+    url, pages, requests = server
+    config = ReadConfig(use_cache=True, http_cache=True)
+    Readium(config).read_docs(url + "/etag.html")
+    pages["/etag.html"][:2] = [_html("ETag page", body="Rewritten. " + TEXT), '"v2"']
+
+    summary, tree, content = Readium(config).read_docs(url + "/etag.html")
+    assert "Rewritten." in content
+    summary, tree, content = Readium(config).read_docs(url + "/etag.html")
+    assert requests[-1] == ("/etag.html", '"v2"', None)
+
+
+def test_crawl_revalidates_every_page(server):
+    url, _, requests = server
+    config = ReadConfig(crawl=True, use_cache=True, http_cache=True)
+    with patch("readium.crawl.extract_markdown", wraps=extract_markdown) as extract:
+        Readium(config).read_docs(url + "/etag.html")
+        summary, tree, content = Readium(config).read_docs(url + "/etag.html")
+
+    assert "File: dated.md" in content
+    assert extract.call_count == 2  # Once per page, on the first run only
+    assert requests[-2:] == [
+        ("/etag.html", '"v1"', None),
+        ("/dated.html", None, "Mon, 05 Oct 2026 10:00:00 GMT"),
+    ]
+    assert "2 revalidated (304), 0 downloaded, 2 extractions reused" in summary
+
+
+def test_ttl_and_offline_serve_from_cache_without_requests(server):
+    url, _, requests = server
+    Readium(ReadConfig(use_cache=True, http_cache=True)).read_docs(url + "/etag.html")
+    count = len(requests)
+
+    fresh = Readium(ReadConfig(use_cache=True, http_cache_ttl=3600)).read_docs(
+        url + "/etag.html"
+    )
+    offline = Readium(ReadConfig(use_cache=True, offline=True)).read_docs(
+        url + "/etag.html"
+    )
+    assert "ETag page" in fresh[2] and "ETag page" in offline[2]
+    assert len(requests) == count
+
+    with pytest.raises(ValueError, match="not in the HTTP cache"):
+        Readium(ReadConfig(use_cache=True, offline=True)).read_docs(url + "/dated.html")
+    with pytest.raises(ValueError, match="Offline mode needs the cache"):
+        Readium(ReadConfig(offline=True)).read_docs(url + "/a.html")
+    assert len(requests) == count
+
+
+def test_cached_read_without_size_limit(server):
+    url, _, requests = server
+    config = ReadConfig(use_cache=True, http_cache=True, max_file_size=-1)
+    summary, tree, content = Readium(config).read_docs(url + "/etag.html")
+    assert "ETag page" in content
+    # Served again from the cache after revalidation
+    summary, tree, content = Readium(config).read_docs(url + "/etag.html")
+    assert "ETag page" in content
+    assert requests[-1] == ("/etag.html", '"v1"', None)
@@ -0,0 +1,70 @@
+import json
+import os
+
+from readium import ReadConfig, Readium
+
+
+def _make_tree(root):
+    (root / "docs").mkdir()
+    (root / "README.md").write_text("# Readme\n")
+    (root / "docs" / "guide.md").write_text("# Guide\n")
+    (root / "docs" / "api.md").write_text("# API\n")
+    (root / "blob.txt").write_bytes(b"\x00\x01binary")
+
+
+def _run(source, manifest, mocker=None):
+    reader = Readium(ReadConfig(workers=1, incremental_manifest=str(manifest)))
+    spy = mocker.spy(reader, "_process_file") if mocker else None
+    result = reader.read_docs(source)
+    processed = sorted(c.args[1] for c in spy.call_args_list) if spy else None
+    return result, processed, reader.manifest
+
+
+def test_second_run_reuses_unchanged_files(tmp_path, mocker):
+    source = tmp_path / "src"
+    source.mkdir()
+    _make_tree(source)
+    manifest = tmp_path / "run.json"
+
+    first, processed, _ = _run(source, manifest, mocker)
+    assert processed == ["README.md", "blob.txt", "docs/api.md", "docs/guide.md"]
+    assert first == Readium(ReadConfig(workers=1)).read_docs(source)
+
+    second, processed, state = _run(source, manifest, mocker)
+    assert processed == []
+    assert second == first
+    assert state.reused == 4
+
+
+def test_changed_added_and_deleted_files(tmp_path, mocker):
+    source = tmp_path / "src"
+    source.mkdir()
+    _make_tree(source)
+    manifest = tmp_path / "run.json"
+    _run(source, manifest)
+
+    (source / "docs" / "guide.md").write_text("# Guide, revised\n")
+    (source / "docs" / "new.md").write_text("# New\n")
+    (source / "docs" / "api.md").unlink()
+    # Touched without a content change: served from its block
+    stat = (source / "README.md").stat()
+    os.utime(source / "README.md", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    (summary, tree, content), processed, state = _run(source, manifest, mocker)
+    assert processed == ["docs/guide.md", "docs/new.md"]
+    assert state.removed == 1
+    assert "Guide, revised" in content
+    assert "# API" not in content
+    assert (summary, tree, content) == Readium(ReadConfig(workers=1)).read_docs(source)
+
+    files = json.loads(manifest.read_text())["files"]
+    assert sorted(files) == [
+        "README.md",
+        "blob.txt",
+        "docs/guide.md",
+        "docs/new.md",
+    ]
+    assert files["blob.txt"][3] is None
+    # Blocks of deleted or replaced content are removed
+    blocks = list((tmp_path / "run.json.blocks").glob("*/*.md"))
+    assert len(blocks) == 3
@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+from readium import ReadConfig, Readium
+from readium.utils.concurrency import ordered_map
+
+
+@pytest.fixture
+def many_files(tmp_path):
+    """Create a nested tree with enough files to keep several workers busy"""
+    for d in range(5):
+        sub = tmp_path / f"dir{d}" / "nested"
+        sub.mkdir(parents=True)
+        for i in range(20):
+            (sub / f"file{i}.md").write_text(f"# File {d}-{i}\n" + "text " * i)
+        (tmp_path / f"dir{d}" / "data.bin").write_bytes(b"\x00\x01\x02" * 100)
+    (tmp_path / "README.md").write_text("# Root")
+    return tmp_path
+
+
+def test_parallel_output_matches_serial(many_files):
+    """Parallel processing must produce exactly the serial output"""
+    serial = Readium(ReadConfig(workers=1)).read_docs(many_files)
+    parallel = Readium(ReadConfig(workers=8)).read_docs(many_files)
+    assert parallel == serial
+    assert "Files processed: 101" in serial[0]
+    assert "data.bin" not in serial[1]
+
+
+def test_worker_count():
+    assert Readium(ReadConfig(workers=4)).worker_count() == 4
+    assert Readium(ReadConfig(workers=0)).worker_count() == 1
+    assert Readium(ReadConfig()).worker_count() >= 1
+
+
+def test_ordered_map_preserves_order():
+    def slow_identity(x):
+        # Later items finish first
+        time.sleep((10 - x) * 0.001)
+        return x
+
+    assert list(ordered_map(slow_identity, range(10), workers=4)) == list(range(10))
+    assert list(ordered_map(slow_identity, iter(range(10)), workers=1)) == list(
+        range(10)
+    )
+
+
+def test_in_process_conversions_do_not_overlap(tmp_path):
+    for i in range(8):
+        (tmp_path / f"doc{i}.pdf").write_bytes(b"%PDF-1.4")
+    active = []
+    overlapped = []
+
+    class Converter:
+        def convert(self, path):
+            active.append(path)
+            overlapped.append(len(active) > 1)
+            time.sleep(0.01)
+            active.remove(path)
+            return type("Result", (), {"text_content": f"converted {path}"})()
+
+    reader = Readium(ReadConfig(workers=8, use_markitdown=True))
+    reader.markitdown = Converter()
+    summary, tree, content = reader.read_docs(tmp_path)
+    assert content.count("converted ") == 8
+    assert not any(overlapped)
@@ -133,6 +133,30 @@ def test_should_process_file(sample_files):
     assert reader.should_process_file(sample_files / "code.py")
 
 
+def test_each_file_opened_once(temp_dir):
+    """Text files are stat'ed during the walk and opened a single time"""
+    (temp_dir / "crlf.md").write_bytes(b"line one\r\nline two\r\n")
+    (temp_dir / "blob.txt").write_bytes(b"\x00\x01\x02binary")
+    (temp_dir / "sub").mkdir()
+    (temp_dir / "sub" / "a.py").write_text("print('a')")
+
+    opened = []
+    real_open = open
+
+    def tracking_open(file, *args, **kwargs):
+        opened.append(Path(file).name)
+        return real_open(file, *args, **kwargs)
+
+    reader = Readium(ReadConfig(workers=1, use_cache=False))
+    with patch("builtins.open", side_effect=tracking_open):
+        summary, tree, content = reader.read_docs(temp_dir)
+
+    assert sorted(opened) == ["a.py", "blob.txt", "crlf.md"]
+    assert "line one\nline two\n" in content
+    assert "blob.txt" not in tree
+    assert "Files processed: 2" in summary
+
+
 def test_read_docs_local(sample_files):
     """Test reading documentation from local directory"""
     reader = Readium()
@@ -169,7 +193,7 @@ def test_read_docs_git(mock_clone, temp_dir):
     mock_clone.assert_called_once()
 
 
-@patch("readium.core.MarkItDown")  # Cambiamos el path del patch
+@patch("markitdown.MarkItDown")  # Imported lazily by Readium
 def test_read_docs_with_markitdown(mock_markitdown, sample_files, sample_pdf):
     """Test reading documentation with MarkItDown integration"""
     # Configurar el mock
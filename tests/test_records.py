@@ -0,0 +1,90 @@
+import sys
+
+import pytest
+
+from readium import FileRecord, ReadConfig, Readium
+from readium.records import FILE, WEB
+
+
+def test_record_reads_like_a_dict():
+    record = FileRecord("docs/a.md", "# A", size=3)
+    assert record["path"] == "docs/a.md" and record["content"] == "# A"
+    assert dict(record) == {"path": "docs/a.md", "content": "# A"}
+    assert record.get("title") is None
+    assert "title" not in record
+    assert (record.size, record.tokens, record.kind) == (3, None, FILE)
+    assert not hasattr(record, "__dict__")
+
+    page = FileRecord("index.md", "Text", kind=WEB, title="Home", source="https://x/")
+    assert dict(page) == {
+        "path": "index.md",
+        "content": "Text",
+        "title": "Home",
+        "source": "https://x/",
+    }
+    with pytest.raises(ValueError, match="content or a loader"):
+        FileRecord("empty.md")
+
+
+def test_record_loads_content_lazily():
+    loads = []
+
+    def load():
+        loads.append(1)
+        return "stored text"
+
+    record = FileRecord("a.md", loader=load)
+    assert not record.loaded and loads == []
+    assert record.content == "stored text"
+    assert record["content"] == "stored text"
+    assert record.loaded and len(loads) == 1
+    record.release()
+    assert not record.loaded
+    assert record.content == "stored text" and len(loads) == 2
+    # Records without a loader keep their content
+    eager = FileRecord("b.md", "text")
+    eager.release()
+    assert eager.loaded
+
+
+def test_iter_docs_yields_records(tmp_path):
+    (tmp_path / "a.md").write_text("# Alpha\n")
+    (tmp_path / "b.txt").write_text("bravo")
+    records = list(Readium(ReadConfig(workers=1)).iter_docs(tmp_path))
+    assert all(isinstance(record, FileRecord) for record in records)
+    sizes = {record.path: record.size for record in records}
+    assert sizes == {"a.md": 8, "b.txt": 5}
+    assert {record.kind for record in records} == {FILE}
+
+
+def test_unchanged_files_load_from_the_manifest_on_demand(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "a.md").write_text("# Alpha\n")
+    config = ReadConfig(incremental_manifest=str(tmp_path / "run.json"))
+    first = Readium(config).read_docs(source)
+
+    records = list(Readium(config).iter_docs(source))
+    assert [record.path for record in records] == ["a.md"]
+    assert not records[0].loaded
+    assert records[0].content == "# Alpha\n"
+    assert Readium(config).read_docs(source) == first
+
+
+def test_output_records_token_counts(tmp_path, monkeypatch):
+    (tmp_path / "a.md").write_text("one two three")
+    reader = Readium(ReadConfig(use_cache=False))
+    seen = []
+    real_tree = reader.generate_token_tree
+
+    def tree(files, base_path, **kwargs):
+        result = real_tree(files, base_path, **kwargs)
+        seen.extend(files)
+        return result
+
+    monkeypatch.setattr(reader, "generate_token_tree", tree)
+    reader.read_docs(tmp_path)
+    assert [record.tokens for record in seen] == [
+        reader.estimate_tokens("one two three")
+    ]
+    assert sys.getsizeof(seen[0]) < sys.getsizeof({"path": "", "content": ""})
@@ -0,0 +1,58 @@
+import subprocess
+import sys
+
+import pytest
+
+# Generous budget for `import readium.cli`, in microseconds; markitdown alone
+# used to take about a second
+IMPORT_BUDGET_US = 500_000
+
+HEAVY_MODULES = ["markitdown", "trafilatura", "tiktoken", "pathspec", "rich.table"]
+
+
+def _import_times(code):
+    """Run ``code`` under ``-X importtime``; return {module: cumulative us}"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            times[name.strip()] = int(cumulative)
+        except ValueError:
+            continue  # Header line
+    return times
+
+
+def test_cli_import_is_lazy():
+    times = _import_times("import readium.cli")
+    for module in HEAVY_MODULES:
+        assert module not in times, f"{module} imported at start-up"
+    assert times["readium.cli"] < IMPORT_BUDGET_US
+
+
+@pytest.mark.parametrize(
+    "code, absent",
+    [
+        (
+            "from readium import Readium; Readium().read_docs({path!r})",
+            ["markitdown", "trafilatura", "pathspec", "rich"],
+        ),
+        (
+            "from readium import Readium, ReadConfig; "
+            "Readium(ReadConfig(use_markitdown=True)).read_docs({path!r})",
+            ["trafilatura", "pathspec"],
+        ),
+    ],
+)
+def test_run_imports_only_what_it_needs(tmp_path, code, absent):
+    (tmp_path / "README.md").write_text("# Readme")
+    times = _import_times(code.format(path=str(tmp_path)))
+    for module in absent:
+        assert module not in times, f"{module} imported without being needed"
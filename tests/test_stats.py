@@ -0,0 +1,88 @@
+import json
+
+from click.testing import CliRunner
+
+from readium import ReadConfig, Readium
+from readium.cli import main
+from readium.stats import STAGES, RunStats
+
+
+def _make_tree(root):
+    (root / "docs").mkdir()
+    (root / "docs" / "guide.md").write_text("# Guide\n")
+    (root / "docs" / "blob.txt").write_bytes(b"\x00\x01\x02")
+    (root / "docs" / "image.png").write_bytes(b"png")
+    (root / "docs" / "huge.md").write_text("x" * 2048)
+    (root / "debug.log").write_text("log")
+    (root / ".gitignore").write_text("*.log\n")
+    (root / "node_modules").mkdir()
+    (root / "node_modules" / "pkg.js").write_text("js")
+
+
+def test_stats_disabled_by_default(tmp_path):
+    _make_tree(tmp_path)
+    reader = Readium(ReadConfig(use_cache=False, use_git_index=False))
+    reader.read_docs(tmp_path)
+    assert reader.stats is None
+
+
+def test_profile_counts_skips_by_reason(tmp_path):
+    _make_tree(tmp_path)
+    config = ReadConfig(
+        use_cache=False, use_git_index=False, max_file_size=1024, profile=True
+    )
+    reader = Readium(config)
+    summary, tree, content = reader.read_docs(tmp_path)
+
+    stats = reader.stats
+    assert stats is not None
+    assert stats.skipped == {
+        "binary": 1,
+        "gitignore": 1,
+        "too_large": 1,
+        "unsupported_extension": 2,  # image.png and .gitignore
+    }
+    assert stats.pruned_dirs == {"excluded_dir": 1}
+    assert stats.files_seen == 5
+    assert stats.files_processed == 1
+    assert stats.bytes_read == len("# Guide\n") + 3
+    assert stats.wall_seconds > 0
+    assert set(stats.stage_seconds) == set(STAGES)
+    assert stats.stage_seconds["tokenize"] > 0
+
+    data = json.loads(json.dumps(stats.to_dict()))
+    assert data["files_processed"] == 1
+    assert len(data["slowest_files"]) == 5
+
+
+def test_slowest_files_keeps_top_n():
+    stats = RunStats(top_n=2)
+    for rel_path, seconds in [("a", 0.1), ("b", 0.5), ("c", 0.3), ("d", 0.01)]:
+        stats.file_done(rel_path, seconds, processed=True)
+    assert stats.slowest_files == [("b", 0.5), ("c", 0.3)]
+    assert stats.files_seen == 4
+
+
+def test_cli_profile_and_stats_json(tmp_path):
+    _make_tree(tmp_path)
+    output = tmp_path / "out.md"
+    stats_file = tmp_path / "stats.json"
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        [
+            str(tmp_path / "docs"),
+            "-o",
+            str(output),
+            "--no-cache",
+            "--profile",
+            "--stats-json",
+            str(stats_file),
+        ],
+    )
+    assert result.exit_code == 0
+    assert "Stage times" in result.output
+    assert "binary" in result.output
+    data = json.loads(stats_file.read_text())
+    assert data["files_processed"] == 2
+    assert data["skipped"]["binary"] == 1
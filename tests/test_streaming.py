@@ -0,0 +1,60 @@
+from click.testing import CliRunner
+
+from readium import ReadConfig, Readium
+from readium.cli import main
+
+
+def _make_tree(root):
+    (root / "docs").mkdir()
+    (root / "README.md").write_text("# Readme\r\nWindows line")
+    (root / "docs" / "guide.md").write_text("# Guide\n\nSome text.\n")
+    (root / "docs" / "empty.txt").write_text("")
+    (root / "script.py").write_text("print('hi')\n")
+
+
+def test_iter_docs_yields_files(tmp_path):
+    _make_tree(tmp_path)
+    reader = Readium(ReadConfig(workers=1))
+    records = list(reader.iter_docs(tmp_path))
+    paths = sorted(r["path"] for r in records)
+    assert paths == ["README.md", "docs/empty.txt", "docs/guide.md", "script.py"]
+    by_path = {r["path"]: r["content"] for r in records}
+    assert by_path["docs/guide.md"] == "# Guide\n\nSome text.\n"
+
+
+def test_write_docs_matches_read_docs(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    _make_tree(source)
+    output = tmp_path / "out.md"
+
+    summary, tree, content = Readium(ReadConfig(workers=2)).read_docs(source)
+    streamed = Readium(ReadConfig(workers=2)).write_docs(source, output)
+
+    assert streamed == (summary, tree)
+    expected = f"Summary:\n{summary}\n\nTree:\n{tree}\n\nContent:\n{content}"
+    assert output.read_text(encoding="utf-8") == expected
+    # The temporary content file is cleaned up
+    assert [p.name for p in tmp_path.iterdir() if p.name.startswith(".readium-")] == []
+
+
+def test_write_docs_empty_directory(tmp_path):
+    source = tmp_path / "empty"
+    source.mkdir()
+    output = tmp_path / "out.md"
+    summary, tree = Readium().write_docs(source, output)
+    assert "Files processed: 0" in summary
+    assert output.read_text().endswith("Content:\n")
+
+
+def test_cli_output_streams_to_file(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    _make_tree(source)
+    output = tmp_path / "cli.md"
+    result = CliRunner().invoke(main, [str(source), "-o", str(output)])
+    assert result.exit_code == 0
+    assert "Results saved to" in result.output
+    text = output.read_text()
+    assert text.startswith("Summary:\nPath analyzed:")
+    assert "File: docs/guide.md" in text
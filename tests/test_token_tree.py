@@ -1,12 +1,16 @@
+import io
+import json
 import tempfile
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 from click.testing import CliRunner
+from rich.console import Console
 
-from readium import ReadConfig, Readium
+from readium import FileRecord, ReadConfig, Readium
 from readium.cli import main
+from readium.tokentree import build_token_tree, render, render_markdown, render_rich
 
 
 @pytest.fixture
@@ -39,16 +43,25 @@ def test_estimate_tokens_tiktoken():
     assert reader.estimate_tokens("") == 0
 
 
+def test_count_tokens_batch_matches_single():
+    """Batched counting must agree with counting texts one by one"""
+    reader = Readium(ReadConfig(workers=4))
+    texts = ["", "hello world", "# Title\n" * 50, "<|endoftext|> marker"] * 100
+    assert reader.count_tokens(texts) == [reader.estimate_tokens(t) for t in texts]
+
+
 def test_generate_token_tree(temp_dir_with_files):
     """Test token tree generation"""
     config = ReadConfig(show_token_tree=True)
     reader = Readium(config)
-    with patch.object(reader, "estimate_tokens", return_value=100):
+    with patch.object(
+        reader, "count_tokens", side_effect=lambda texts: [100] * len(texts)
+    ):
         files = [
-            {"path": "README.md", "content": "Test content"},
-            {"path": "docs/guide.md", "content": "Guide content"},
-            {"path": "docs/api.md", "content": "API content"},
-            {"path": "src/main.py", "content": "Python code"},
+            FileRecord("README.md", "Test content"),
+            FileRecord("docs/guide.md", "Guide content"),
+            FileRecord("docs/api.md", "API content"),
+            FileRecord("src/main.py", "Python code"),
         ]
         token_tree = reader.generate_token_tree(files, temp_dir_with_files)
         assert "# Directory Token Tree" in token_tree
@@ -61,6 +74,7 @@ def test_generate_token_tree(temp_dir_with_files):
         assert "100" in token_tree
         assert "Total Files:" in token_tree
         assert "Total Tokens:" in token_tree
+        assert [record.tokens for record in files] == [100] * 4
 
 
 def test_read_docs_with_token_tree(temp_dir_with_files):
@@ -108,3 +122,87 @@ def test_url_with_token_tree():
         summary, tree, content = reader.read_docs("https://example.com/docs")
         assert "Token Tree generated" in summary
         assert "# Directory Token Tree" in tree
+
+
+def test_build_and_render_token_tree():
+    """Aggregation is separate from the markdown, JSON and CSV renderers"""
+    tree = build_token_tree(
+        [("src/b.py", 5), ("README.md", 1200), ("src/a.py", 7), ("docs/x.md", 3)]
+    )
+    assert [d.path for d in tree.directories] == [".", "docs", "src"]
+    assert tree.directories[2].files == [("a.py", 7), ("b.py", 5)]
+    assert (tree.total_files, tree.total_tokens) == (4, 1215)
+
+    assert render_markdown(tree) == (
+        "# Directory Token Tree\n\n"
+        "| Directory | Files | Token Count |\n"
+        "|-----------|-------|------------|\n"
+        "| **.** | 1 | 1,200 |\n"
+        "| └─ README.md | | 1200 |\n"
+        "| **docs** | 1 | 3 |\n"
+        "| └─ x.md | | 3 |\n"
+        "| **src** | 2 | 12 |\n"
+        "| └─ a.py | | 7 |\n"
+        "| └─ b.py | | 5 |\n"
+        "\n**Total Files:** 4  \n"
+        "**Total Tokens:** 1,215\n"
+    )
+    data = json.loads(render(tree, "json"))
+    assert data["total_tokens"] == 1215
+    assert data["directories"][2] == {
+        "path": "src",
+        "tokens": 12,
+        "files": [{"name": "a.py", "tokens": 7}, {"name": "b.py", "tokens": 5}],
+    }
+    assert render(tree, "csv").splitlines() == [
+        "directory,file,tokens",
+        ".,README.md,1200",
+        "docs,x.md,3",
+        "src,a.py,7",
+        "src,b.py,5",
+    ]
+    with pytest.raises(ValueError, match="Unknown token tree format"):
+        render(tree, "yaml")
+
+    console = Console(file=io.StringIO(), width=80)
+    render_rich(tree, console)
+    table = console.file.getvalue()
+    assert "Directory Token Tree" in table and "└─ README.md" in table
+
+
+def test_plain_runs_do_not_draw_rich_tables(temp_dir_with_files, capsys):
+    """The token tree is aggregated, not printed, unless a report is asked for"""
+    reader = Readium(ReadConfig())
+    summary, tree, content = reader.read_docs(temp_dir_with_files)
+    assert capsys.readouterr().out == ""
+    assert reader.token_tree is not None
+    assert reader.token_tree.total_files == 4
+    assert render_markdown(reader.token_tree).strip() in tree
+
+
+def test_cli_token_formats(temp_dir_with_files):
+    """Off a terminal the table falls back to Markdown; JSON and CSV on request"""
+    runner = CliRunner()
+    result = runner.invoke(main, ["tokens", str(temp_dir_with_files)])
+    assert result.output.startswith("# Directory Token Tree")
+    assert "Processed 4 files." not in result.output  # No Rich table
+
+    result = runner.invoke(
+        main, ["tokens", str(temp_dir_with_files), "--token-format", "json"]
+    )
+    assert result.exit_code == 0, result.output
+    data = json.loads(result.output)
+    assert data["total_files"] == 4
+    assert [d["path"] for d in data["directories"]] == [".", "docs", "src"]
+
+    result = runner.invoke(
+        main, ["tokens", str(temp_dir_with_files), "--token-format", "csv"]
+    )
+    assert result.output.splitlines()[:2] == [
+        "directory,file,tokens",
+        f".,README.md,{data['directories'][0]['tokens']}",
+    ]
+
+    result = runner.invoke(main, [str(temp_dir_with_files), "--token-format", "csv"])
+    assert result.exit_code != 0
+    assert "only applies to the token report" in result.output
@@ -0,0 +1,79 @@
+import os
+
+import pathspec
+
+from readium.walker import walk_files
+
+
+def _make_tree(root):
+    for rel in [
+        "a.md",
+        "b.txt",
+        "docs/intro.md",
+        "docs/api/ref.md",
+        "node_modules/pkg/index.js",
+        "build/out.txt",
+        "src/main.py",
+        "src/debug.log",
+    ]:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(rel)
+
+
+def test_walk_matches_os_walk_order(tmp_path):
+    _make_tree(tmp_path)
+    expected = []
+    for root, dirs, files in os.walk(tmp_path):
+        dirs[:] = [d for d in dirs if d != "node_modules"]
+        rel_root = os.path.relpath(root, tmp_path)
+        for name in files:
+            expected.append(os.path.normpath(os.path.join(rel_root, name)))
+
+    entries = list(walk_files(str(tmp_path), exclude_dirs={"node_modules"}))
+    assert [e.rel_path for e in entries] == expected
+    assert all(e.path == os.path.join(tmp_path, e.rel_path) for e in entries)
+    assert all(e.size == len(e.rel_path.replace(os.sep, "/")) for e in entries)
+
+
+def test_walk_prunes_ignored_directories(tmp_path):
+    _make_tree(tmp_path)
+    spec = pathspec.PathSpec.from_lines("gitwildmatch", ["build/", "*.log"])
+    seen = []
+
+    rel_paths = [
+        e.rel_path
+        for e in walk_files(str(tmp_path), ignore=spec.match_file, log=seen.append)
+    ]
+
+    assert os.path.join("build", "out.txt") not in rel_paths
+    assert os.path.join("src", "debug.log") not in rel_paths
+    assert os.path.join("node_modules", "pkg", "index.js") in rel_paths
+    assert "Ignoring directory via .gitignore: build" in seen
+
+
+def test_walk_without_stat(tmp_path):
+    _make_tree(tmp_path)
+    entries = list(walk_files(str(tmp_path), with_stat=False))
+    assert all(e.size is None and e.mtime_ns is None for e in entries)
+
+
+def test_walk_reports_skips(tmp_path):
+    _make_tree(tmp_path)
+    spec = pathspec.PathSpec.from_lines("gitwildmatch", ["build/", "*.log"])
+    skipped = []
+
+    list(
+        walk_files(
+            str(tmp_path),
+            exclude_dirs={"node_modules"},
+            ignore=spec.match_file,
+            on_skip=lambda reason, rel_path: skipped.append((reason, rel_path)),
+        )
+    )
+
+    assert sorted(skipped) == [
+        ("excluded_dir", "node_modules/"),
+        ("gitignore", "build/"),
+        ("gitignore", os.path.join("src", "debug.log")),
+    ]
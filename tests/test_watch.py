@@ -0,0 +1,224 @@
+import os
+import shutil
+import subprocess
+import threading
+import time
+
+import pytest
+
+from readium import ReadConfig, Readium
+from readium.watch import (
+    _EVENT_HEADER,
+    IN_Q_OVERFLOW,
+    RESCAN,
+    InotifyWatcher,
+    PollingWatcher,
+    WatchSession,
+    watch,
+)
+
+
+def _make_tree(root):
+    (root / "docs").mkdir()
+    (root / "README.md").write_text("# Readme\n")
+    (root / "docs" / "guide.md").write_text("# Guide\n")
+    (root / ".gitignore").write_text("secret.md\n")
+    (root / "secret.md").write_text("hidden")
+
+
+def _one_shot(source, output):
+    Readium(ReadConfig(workers=1)).write_docs(source, output)
+    return output.read_text(encoding="utf-8")
+
+
+def test_session_matches_one_shot_and_reloads_only_changes(tmp_path, mocker):
+    source = tmp_path / "src"
+    source.mkdir()
+    _make_tree(source)
+    reader = Readium(ReadConfig(workers=1))
+    session = WatchSession(reader, source, tmp_path / "out.md")
+
+    assert session.refresh() == 2
+    session.write()
+    assert (tmp_path / "out.md").read_text() == _one_shot(source, tmp_path / "a.md")
+
+    spy = mocker.spy(reader, "load_file")
+    (source / "docs" / "guide.md").write_text("# Guide, revised\n")
+    (source / "docs" / "new.md").write_text("# New\n")
+    (source / "README.md").unlink()
+    assert session.refresh() == 3
+    assert sorted(c.args[0].rel_path for c in spy.call_args_list) == [
+        "docs/guide.md",
+        "docs/new.md",
+    ]
+    session.write()
+    assert (tmp_path / "out.md").read_text() == _one_shot(source, tmp_path / "b.md")
+
+    assert session.refresh() == 0
+
+
+def test_refresh_looks_only_at_dirty_paths(tmp_path, mocker):
+    source = tmp_path / "src"
+    source.mkdir()
+    _make_tree(source)
+    reader = Readium(ReadConfig(workers=1))
+    session = WatchSession(reader, source, tmp_path / "out.md")
+    session.refresh()
+
+    walk = mocker.spy(reader, "iter_candidates")
+    load = mocker.spy(reader, "load_file")
+    guide = source / "docs" / "guide.md"
+    guide.write_text("# Guide, revised\n")
+    (source / "docs" / "new.md").write_text("# New\n")
+    (source / "README.md").unlink()
+    dirty = {str(guide), str(source / "docs" / "new.md"), str(source / "README.md")}
+    assert session.refresh(dirty) == 3
+    assert walk.call_count == 0
+    assert sorted(c.args[0].rel_path for c in load.call_args_list) == [
+        "docs/guide.md",
+        "docs/new.md",
+    ]
+    session.write()
+    assert (tmp_path / "out.md").read_text() == _one_shot(source, tmp_path / "a.md")
+
+    # The files of a new directory are only known after a walk
+    (source / "api").mkdir()
+    (source / "api" / "index.md").write_text("# API\n")
+    assert session.refresh({str(source / "api")}) == 1
+    assert walk.call_count == 1
+    session.write()
+    assert (tmp_path / "out.md").read_text() == _one_shot(source, tmp_path / "b.md")
+
+
+def test_relevant_drops_ignored_paths(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    _make_tree(source)
+    (source / "node_modules").mkdir()
+    session = WatchSession(Readium(ReadConfig(workers=1)), source, tmp_path / "o.md")
+    session.refresh()
+
+    guide = str(source / "docs" / "guide.md")
+    assert session.relevant(
+        {
+            guide,
+            str(source / "secret.md"),
+            str(source / "node_modules" / "x.md"),
+            str(tmp_path / "o.md"),
+            str(tmp_path / "elsewhere.md"),
+        }
+    ) == {guide}
+    # Deleted files are still known
+    assert session.relevant({str(source / "README.md")}) == {str(source / "README.md")}
+
+
+def test_session_follows_the_git_index(tmp_path, mocker):
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    source = tmp_path / "src"
+    source.mkdir()
+    subprocess.run(["git", "init", "-q", str(source)], check=True)
+    _make_tree(source)
+    (source / "docs" / ".gitignore").write_text("draft.md\n")
+    reader = Readium(ReadConfig(workers=1))
+    session = WatchSession(reader, source, tmp_path / "out.md")
+    session.refresh()
+
+    draft = str(source / "docs" / "draft.md")
+    added = str(source / "docs" / "added.md")
+    (source / "docs" / "draft.md").write_text("draft")
+    (source / "docs" / "added.md").write_text("# Added\n")
+    # Nested .gitignore files only apply through git
+    assert session.relevant({draft, added}) == {added}
+
+    walk = mocker.spy(reader, "iter_candidates")
+    assert session.refresh({added}) == 1
+    assert walk.call_count == 0
+    session.write()
+    assert (tmp_path / "out.md").read_text() == _one_shot(source, tmp_path / "a.md")
+
+
+def test_session_skips_its_own_output(tmp_path):
+    _make_tree(tmp_path)
+    session = WatchSession(Readium(ReadConfig()), tmp_path, tmp_path / "out.md")
+    session.refresh()
+    session.write()
+    assert session.refresh() == 0
+    assert "out.md" not in session.render()[1]
+
+
+def test_rescan_reloads_files_with_unchanged_stat(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    _make_tree(source)
+    session = WatchSession(Readium(ReadConfig(workers=1)), source, tmp_path / "o.md")
+    session.refresh()
+
+    # A change whose event was lost and that kept size and mtime
+    guide = source / "docs" / "guide.md"
+    st = guide.stat()
+    guide.write_text("# Gu1de\n")
+    os.utime(guide, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert session.refresh() == 0
+    assert session.refresh({RESCAN}) == 1
+    assert "# Gu1de" in session.render()[2]
+
+
+def test_inotify_overflow_reports_rescan(tmp_path, mocker):
+    try:
+        watcher = InotifyWatcher(str(tmp_path))
+    except OSError:
+        pytest.skip("inotify not available")
+    try:
+        overflow = _EVENT_HEADER.pack(-1, IN_Q_OVERFLOW, 0, 0)
+        mocker.patch("readium.watch.os.read", return_value=overflow)
+        assert watcher._read_events() == {RESCAN}
+    finally:
+        watcher.close()
+
+
+@pytest.mark.parametrize("kind", ["inotify", "polling"])
+def test_watchers_report_changes(tmp_path, kind):
+    (tmp_path / "sub").mkdir()
+    if kind == "inotify":
+        try:
+            watcher = InotifyWatcher(str(tmp_path))
+        except OSError:
+            pytest.skip("inotify not available")
+    else:
+        watcher = PollingWatcher(str(tmp_path), interval=0.05)
+    try:
+        assert watcher.wait(0.1) is None
+        (tmp_path / "sub" / "a.md").write_text("a")
+        changed = watcher.wait(2)
+        assert str(tmp_path / "sub" / "a.md") in changed
+    finally:
+        watcher.close()
+
+
+def test_watch_rewrites_output(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    _make_tree(source)
+    output = tmp_path / "out.md"
+    stop = threading.Event()
+    updates = []
+    thread = threading.Thread(
+        target=watch,
+        args=(Readium(ReadConfig(workers=1)), source, output),
+        kwargs={"debounce": 0.05, "on_update": updates.append, "stop": stop},
+    )
+    thread.start()
+    try:
+        deadline = time.monotonic() + 10
+        while not updates and time.monotonic() < deadline:
+            time.sleep(0.02)
+        (source / "docs" / "guide.md").write_text("# Guide, live\n")
+        while len(updates) < 2 and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        stop.set()
+        thread.join(5)
+
+    assert updates[:2] == [2, 1]
+    assert "Guide, live" in output.read_text()
@@ -73,3 +73,41 @@ def test_exclude_dir_empty_value(monkeypatch):
     result = runner.invoke(main, [".", "-x", ""])
     # Should fail or print an error message
     assert result.exit_code != 0 or "exclude-dir" in result.output.lower()
+
+
+def test_watch_requires_output(tmp_path):
+    runner = CliRunner()
+    result = runner.invoke(main, ["watch", str(tmp_path)])
+    assert result.exit_code != 0
+    assert "requires an output file" in result.output
+
+
+def test_watch_runs_until_interrupted(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_watch(reader, path, output, on_update=None):
+        calls.append((path, output))
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr("readium.watch.watch", fake_watch)
+    runner = CliRunner()
+    result = runner.invoke(main, ["watch", str(tmp_path), "-o", "out.md"])
+    assert result.exit_code == 0
+    assert calls == [(str(tmp_path), "out.md")]
+
+
+def test_max_tokens_and_priority_reach_config(monkeypatch):
+    captured = {}
+
+    def fake_read_docs(self, path, branch=None):
+        captured["config"] = self.config
+        return ("summary", "tree", "content")
+
+    monkeypatch.setattr("readium.core.Readium.read_docs", fake_read_docs)
+    runner = CliRunner()
+    result = runner.invoke(
+        main, [".", "--max-tokens", "500", "--priority", "src/*", "--priority", "*.md"]
+    )
+    assert result.exit_code == 0
+    assert captured["config"].max_tokens == 500
+    assert captured["config"].priority_paths == ["src/*", "*.md"]